@@ -0,0 +1,136 @@
+import json                                      # Lottie animations are JSON documents
+import os                                        # Asset and cache paths
+import threading                                 # Background refresh bookkeeping
+import time                                      # Refresh interval for cached downloads
+from collections import OrderedDict              # Bounded in-memory cache
+from concurrent.futures import ThreadPoolExecutor
+
+# ----------- CONSTANTS -----------
+# Animations bundled with the app: <ASSET_DIR>/<name>.json always wins over the network
+ASSET_DIR = os.getenv("RESUMEBOT_ASSET_DIR", os.path.join("assets", "lottie"))
+# Downloaded copies of remote animations
+CACHE_DIR = os.path.join(os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache")), "assets")
+# Seconds before a downloaded copy is refreshed in the background (default 1 day)
+REFRESH_SECONDS = float(os.getenv("RESUMEBOT_ASSET_REFRESH", 24 * 3600))
+# Connect/read timeout for remote fetches
+FETCH_TIMEOUT = float(os.getenv("RESUMEBOT_ASSET_TIMEOUT", 3))
+# Set RESUMEBOT_OFFLINE=1 to never touch the network
+OFFLINE = os.getenv("RESUMEBOT_OFFLINE", "").lower() in ("1", "true", "yes", "on")
+# Seconds to wait before retrying a failed download
+RETRY_SECONDS = 60
+# Maximum number of animations kept in memory
+MEMORY_ENTRIES = 32
+# Total size of downloaded copies on disk; the least recently refreshed ones are deleted beyond it
+CACHE_MAX_BYTES = int(os.getenv("RESUMEBOT_ASSET_CACHE_BYTES", 16 * 1024 * 1024))
+
+_memory = OrderedDict()          # name -> (parsed animation, download time or None if bundled)
+_memory_lock = threading.Lock()
+_in_flight = set()               # names currently being fetched
+_failed_at = {}                  # name -> time of the last failed fetch
+_fetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="asset-fetch")
+
+
+def _remember(name, animation, downloaded_at=None):
+    with _memory_lock:
+        _memory[name] = (animation, downloaded_at)
+        _memory.move_to_end(name)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _fetch(name, url):
+    """Background task: downloads an animation and stores it in the disk and memory caches."""
+    try:
+        import requests
+        r = requests.get(url, timeout=FETCH_TIMEOUT)
+        r.raise_for_status()
+        animation = r.json()
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = os.path.join(CACHE_DIR, f"{name}.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(animation, f)
+        os.replace(tmp_path, os.path.join(CACHE_DIR, f"{name}.json"))
+        _remember(name, animation, time.time())
+        _trim_cache(keep=f"{name}.json")
+    except Exception:
+        # Keep serving whatever we already have and retry after RETRY_SECONDS
+        with _memory_lock:
+            _failed_at[name] = time.time()
+    finally:
+        with _memory_lock:
+            _in_flight.discard(name)
+
+
+def _trim_cache(keep):
+    """Deletes the least recently refreshed downloads until the cache is within CACHE_MAX_BYTES."""
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".json"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+    total = sum(size for _, size, _, _ in entries)
+    for _, size, path, filename in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        if filename == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def refresh_in_background(name, url):
+    """Schedules a remote fetch unless one is already running or we are offline."""
+    if OFFLINE or not url:
+        return
+    with _memory_lock:
+        if name in _in_flight or time.time() - _failed_at.get(name, 0) < RETRY_SECONDS:
+            return
+        _in_flight.add(name)
+    _fetcher.submit(_fetch, name, url)
+
+
+def load_lottie(name, url=None):
+    """Returns a Lottie animation without doing network I/O on the calling thread.
+
+    Looks in memory, then the bundled asset directory, then the download cache.
+    A missing or stale download is (re)fetched in the background, and None is
+    returned until a copy is available. Downloads served from memory are checked
+    for staleness too, so they are refreshed without a restart.
+    """
+    with _memory_lock:
+        entry = _memory.get(name)
+        if entry is not None:
+            _memory.move_to_end(name)
+    if entry is not None:
+        animation, downloaded_at = entry
+        if downloaded_at is not None and time.time() - downloaded_at > REFRESH_SECONDS:
+            refresh_in_background(name, url)
+        return animation
+
+    bundled = _read_json(os.path.join(ASSET_DIR, f"{name}.json"))
+    if bundled is not None:
+        _remember(name, bundled)
+        return bundled
+
+    cached_path = os.path.join(CACHE_DIR, f"{name}.json")
+    cached = _read_json(cached_path)
+    if cached is not None:
+        downloaded_at = os.path.getmtime(cached_path)
+        _remember(name, cached, downloaded_at)
+        if time.time() - downloaded_at > REFRESH_SECONDS:
+            refresh_in_background(name, url)
+        return cached
+
+    refresh_in_background(name, url)
+    return None
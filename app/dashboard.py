@@ -1,24 +1,27 @@
 import streamlit as st
 from streamlit_lottie import st_lottie
-import requests
+import hashlib
+from app.assets import load_lottie
+from app.session import get_session
 
-# Function to load a Lottie animation from a given URL
-def load_lottie_url(url):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None  # Return None if the request fails
-    return r.json()  # Return the JSON animation if successful
+DASHBOARD_ANIMATION_URL = "https://assets4.lottiefiles.com/packages/lf20_cg3eqk.json"
+
+# Function to load a Lottie animation from a given URL.
+# Served from bundled files or the local cache; never blocks on the network.
+def load_lottie_url(url, name=None):
+    return load_lottie(name or hashlib.sha256(url.encode()).hexdigest()[:16], url)
 
 # Function to render the dashboard page
 def dashboard():
-    # Display a personalized welcome message using the session state's username
+    # Display a personalized welcome message using the session's username
     st.markdown(
-        f"<h2 style='text-align: center; color: #1a73e8;'>Welcome, {st.session_state.username}!</h2>",
+        f"<h2 style='text-align: center; color: #1a73e8;'>Welcome, {get_session().username}!</h2>",
         unsafe_allow_html=True
     )
     
     # Load and display a Lottie animation on the dashboard
-    animation = load_lottie_url("https://assets4.lottiefiles.com/packages/lf20_cg3eqk.json")
+    # (the copy bundled at assets/lottie/dashboard.json is used before the network)
+    animation = load_lottie_url(DASHBOARD_ANIMATION_URL, name="dashboard")
     if animation:
         st_lottie(animation, height=300, key="dashboard_animation")
     
@@ -1,16 +1,5 @@
-import sqlite3
-
-DB_PATH = "users.db"
+from app.db import DB_PATH, init_db  # noqa: F401
 
 def create_users_table():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        email TEXT UNIQUE,
-        password TEXT,
-        profile_picture TEXT
-    )''')
-    conn.commit()
-    conn.close()
+    """Creates the users table if it doesn't already exist (see app/db.py for the schema)."""
+    init_db()
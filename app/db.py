@@ -0,0 +1,315 @@
+import hashlib                                   # Password hashing
+import os                                        # Database path from environment variables
+import queue                                     # Idle connections waiting to be reused
+import sqlite3                                   # SQLite database
+import threading                                 # Pool bookkeeping is shared across sessions
+import time                                      # Pool wait-time statistics
+from datetime import datetime                    # Upload timestamps
+from contextlib import contextmanager
+from app import metrics                          # Per-helper timings and pool counters
+
+# ----------- CONSTANTS -----------
+DB_PATH = os.getenv("RESUMEBOT_DB", "resume_bot.db")
+# Maximum number of open connections per database file
+POOL_SIZE = int(os.getenv("RESUMEBOT_DB_POOL_SIZE", 8))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = float(os.getenv("RESUMEBOT_DB_POOL_TIMEOUT", 10))
+
+# Applied to every new connection. WAL lets readers run while a writer commits,
+# and busy_timeout makes writers wait for the lock instead of failing at once.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+# ----------- SCHEMA -----------
+# Each entry upgrades the schema by one version (tracked in PRAGMA user_version).
+# Never edit an applied migration; append a new one instead.
+MIGRATIONS = [
+    # 1: the users table created by the original login page
+    '''CREATE TABLE IF NOT EXISTS users (
+           username TEXT,
+           email TEXT PRIMARY KEY,
+           phone TEXT,
+           password TEXT,
+           profile_picture TEXT)''',
+    # 2: upload history, one row per user and distinct file
+    '''CREATE TABLE IF NOT EXISTS uploads (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           email TEXT NOT NULL,
+           file_hash TEXT NOT NULL,
+           filename TEXT,
+           uploaded_at TEXT,
+           UNIQUE (email, file_hash));
+       CREATE INDEX IF NOT EXISTS idx_uploads_email_id ON uploads (email, id)''',
+    # 3: results of background LLM jobs (app/jobs.py)
+    '''CREATE TABLE IF NOT EXISTS jobs (
+           id TEXT PRIMARY KEY,
+           kind TEXT,
+           key TEXT,
+           status TEXT,
+           result TEXT,
+           error TEXT,
+           created_at REAL,
+           finished_at REAL)''',
+    # 4: bulk ingestion checkpoints and generated question sets (app/ingest.py)
+    '''CREATE TABLE IF NOT EXISTS ingested_resumes (
+           owner TEXT NOT NULL,
+           digest TEXT NOT NULL,
+           filename TEXT,
+           status TEXT,
+           model TEXT,
+           questions TEXT,
+           error TEXT,
+           pages INTEGER,
+           extract_seconds REAL,
+           llm_seconds REAL,
+           updated_at REAL,
+           PRIMARY KEY (owner, digest))''',
+    # 5: outgoing email, delivered in the background by app/outbox.py
+    '''CREATE TABLE IF NOT EXISTS outbox (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           recipient TEXT NOT NULL,
+           subject TEXT,
+           body TEXT,
+           status TEXT NOT NULL,
+           attempts INTEGER DEFAULT 0,
+           next_attempt_at REAL,
+           claimed_at REAL,
+           created_at REAL,
+           sent_at REAL,
+           last_error TEXT);
+       CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)''',
+    # 6: expired jobs are deleted by finish time (app/jobs.py)
+    "CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)",
+    # 7: outbox messages that are useless after a deadline, such as OTPs (app/outbox.py)
+    "ALTER TABLE outbox ADD COLUMN expires_at REAL",
+]
+
+# ----------- STATEMENTS -----------
+# Kept as constants so every call reuses the same text and hits sqlite3's
+# per-connection prepared statement cache.
+SQL_INSERT_USER = "INSERT INTO users (username, password, email, phone, profile_picture) VALUES (?, ?, ?, ?, ?)"
+SQL_VALIDATE_USER = "SELECT username, email, phone, profile_picture FROM users WHERE email=? AND password=?"
+SQL_EMAIL_EXISTS = "SELECT 1 FROM users WHERE email=?"
+SQL_UPDATE_PASSWORD = "UPDATE users SET password=? WHERE email=?"
+SQL_UPDATE_PHONE = "UPDATE users SET phone=? WHERE email=?"
+SQL_UPDATE_PICTURE = "UPDATE users SET profile_picture=? WHERE email=?"
+SQL_INSERT_UPLOAD = ("INSERT INTO uploads (email, file_hash, filename, uploaded_at) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT (email, file_hash) DO NOTHING")
+SQL_UPLOADS_PAGE = ("SELECT id, filename, uploaded_at FROM uploads WHERE email=? AND id<? "
+                    "ORDER BY id DESC LIMIT ?")
+SQL_COUNT_UPLOADS = "SELECT COUNT(*) FROM uploads WHERE email=?"
+SQL_CLEAR_UPLOADS = "DELETE FROM uploads WHERE email=?"
+
+
+def migrate(conn, migrations):
+    """Applies any migrations newer than the database's user_version."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, statement in enumerate(migrations[version:], start=version + 1):
+        # Schema change and version bump commit together or not at all
+        conn.executescript(f"BEGIN; {statement}; PRAGMA user_version={number}; COMMIT;")
+
+
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections to one database file."""
+
+    def __init__(self, path, size=POOL_SIZE, migrations=(), timeout=POOL_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self.acquisitions = 0
+        self.waits = 0            # Acquisitions that had to wait for another session
+        self.wait_seconds = 0.0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Run migrations once, before any session can use the pool
+        conn = self._open()
+        self._opened = 1
+        migrate(conn, list(migrations))
+        self._idle.put(conn)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        # Reserve the slot before opening, so concurrent sessions cannot open more than size
+        with self._lock:
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        began = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free database connection for {self.path} after {self.timeout}s")
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += time.perf_counter() - began
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Lends a connection for one transaction: commits on success, rolls back on error."""
+        conn = self._acquire()
+        with self._lock:
+            self.acquisitions += 1
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def stats(self):
+        """Returns pool usage counters."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "size": self.size,
+                "open": self._opened,
+                "idle": self._idle.qsize(),
+                "acquisitions": self.acquisitions,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+            }
+
+    def close(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+
+# ----------- SHARED POOLS -----------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=DB_PATH, migrations=None):
+    """Returns the process-wide pool for a database file, creating and migrating it on first use."""
+    key = os.path.abspath(path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(path, migrations=MIGRATIONS if migrations is None else migrations)
+            _pools[key] = pool
+            metrics.register_collector("db_pool", pool.stats, db=os.path.splitext(os.path.basename(key))[0])
+        return pool
+
+
+@contextmanager
+def connection():
+    """Lends a connection to the main application database."""
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def init_db():
+    """Creates or upgrades the application schema."""
+    get_pool()
+
+
+# ----------- USERS -----------
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+@metrics.timed("db.add_user")
+def add_user(username, password, email, phone, password_hash=None):
+    """Registers a new user with a hashed password (pass password_hash if it was hashed already)."""
+    with connection() as conn:
+        conn.execute(SQL_INSERT_USER, (username, password_hash or hash_password(password), email, phone, None))
+
+
+@metrics.timed("db.validate_user")
+def validate_user(email, password):
+    """Returns (username, email, phone, profile_picture) for valid credentials, else None."""
+    with connection() as conn:
+        return conn.execute(SQL_VALIDATE_USER, (email, hash_password(password))).fetchone()
+
+
+@metrics.timed("db.email_exists")
+def email_exists(email):
+    """Checks if an email is already registered."""
+    with connection() as conn:
+        return conn.execute(SQL_EMAIL_EXISTS, (email,)).fetchone() is not None
+
+
+@metrics.timed("db.update_password")
+def update_password(email, new_password):
+    """Updates a user's password."""
+    with connection() as conn:
+        conn.execute(SQL_UPDATE_PASSWORD, (hash_password(new_password), email))
+
+
+@metrics.timed("db.update_phone")
+def update_phone(email, new_phone):
+    """Updates a user's phone number."""
+    with connection() as conn:
+        conn.execute(SQL_UPDATE_PHONE, (new_phone, email))
+
+
+@metrics.timed("db.set_profile_picture")
+def set_profile_picture(email, path):
+    """Stores the path of a user's profile picture."""
+    with connection() as conn:
+        conn.execute(SQL_UPDATE_PICTURE, (path, email))
+
+
+# ----------- UPLOAD HISTORY -----------
+@metrics.timed("db.record_upload")
+def record_upload(email, file_hash, filename):
+    """Records an upload; uploading the same file again does not add a duplicate entry."""
+    with connection() as conn:
+        conn.execute(SQL_INSERT_UPLOAD, (email, file_hash, filename,
+                                         datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+
+@metrics.timed("db.list_uploads")
+def list_uploads(email, before_id=None, limit=10):
+    """Returns up to `limit` (id, filename, uploaded_at) rows, newest first, older than before_id.
+
+    Pass the id of the last row of one page as before_id to get the next page.
+    """
+    with connection() as conn:
+        return conn.execute(SQL_UPLOADS_PAGE, (email, before_id or 2 ** 63 - 1, limit)).fetchall()
+
+
+@metrics.timed("db.count_uploads")
+def count_uploads(email):
+    """Returns how many distinct files a user has uploaded."""
+    with connection() as conn:
+        return conn.execute(SQL_COUNT_UPLOADS, (email,)).fetchone()[0]
+
+
+@metrics.timed("db.clear_uploads")
+def clear_uploads(email):
+    """Deletes a user's upload history."""
+    with connection() as conn:
+        conn.execute(SQL_CLEAR_UPLOADS, (email,))
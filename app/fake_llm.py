@@ -0,0 +1,79 @@
+import asyncio                                   # Async variant of invoke
+import hashlib                                   # Deterministic canned responses
+import random                                    # Injected failures
+import threading                                 # Call counters are shared across threads
+import time                                      # Simulated latency
+
+
+class ResourceExhausted(Exception):
+    """Quota error with the same name and status code as google.api_core.exceptions.ResourceExhausted."""
+    code = 429
+
+
+class FakeMessage:
+    """Minimal stand-in for a LangChain AIMessage / AIMessageChunk."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def __repr__(self):
+        return f"FakeMessage({self.content!r})"
+
+
+class FakeLLM:
+    """Deterministic local stand-in for ChatGoogleGenerativeAI in tests and benchmarks.
+
+    Supports invoke(), ainvoke() and stream(). Responses depend only on the prompt,
+    so caches and coalescing behave exactly as with the real model. latency is the
+    simulated round trip in seconds; failure_rate injects quota errors shaped
+    like the ones Gemini raises.
+    """
+
+    def __init__(self, model="fake-gemini", latency=0.05, first_token_latency=None, failure_rate=0.0,
+                 chunk_words=4, seed=0):
+        self.model = model
+        self.latency = latency
+        self.first_token_latency = latency / 2 if first_token_latency is None else first_token_latency
+        self.failure_rate = failure_rate
+        self.chunk_words = chunk_words
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _maybe_fail(self):
+        with self._lock:
+            self.calls += 1
+            fail = self.failure_rate and self._random.random() < self.failure_rate
+        if fail:
+            raise ResourceExhausted("429 fake quota exceeded")
+
+    def respond(self, prompt):
+        """Returns the canned response for a prompt."""
+        text = str(prompt)
+        tag = hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+        if "interview questions" in text:
+            return "\n".join(f"{i}. Fake interview question {i} ({tag})?" for i in range(1, 11))
+        return (f"Relevance: the answer addresses the question ({tag}).\n"
+                "Clarity: clear and well structured.\n"
+                "Improvement: add a concrete example with measurable results.")
+
+    def invoke(self, prompt, **kwargs):
+        self._maybe_fail()
+        time.sleep(self.latency)
+        return FakeMessage(self.respond(prompt))
+
+    async def ainvoke(self, prompt, **kwargs):
+        self._maybe_fail()
+        await asyncio.sleep(self.latency)
+        return FakeMessage(self.respond(prompt))
+
+    def stream(self, prompt, **kwargs):
+        self._maybe_fail()
+        words = self.respond(prompt).split(" ")
+        chunks = [" ".join(words[i:i + self.chunk_words]) for i in range(0, len(words), self.chunk_words)]
+        time.sleep(self.first_token_latency)
+        per_chunk = max(0.0, self.latency - self.first_token_latency) / max(1, len(chunks) - 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(per_chunk)
+            yield FakeMessage(chunk + (" " if i < len(chunks) - 1 else ""))
@@ -0,0 +1,100 @@
+import base64                                    # Inline thumbnails as data URIs
+import hashlib                                   # Content-addressed file names
+import io                                        # Decode uploaded bytes in memory
+import os                                        # Image directory from environment variables
+import threading                                 # Unique temporary file names per writer
+from functools import lru_cache                  # Memoize data URIs of thumbnails
+
+# ----------- CONSTANTS -----------
+IMAGE_DIR = os.getenv("RESUMEBOT_IMAGE_DIR", os.path.join("uploads", "images"))
+DEFAULT_AVATAR_URL = "https://cdn-icons-png.flaticon.com/512/3135/3135715.png"
+# Longest side of the stored (capped) original
+MAX_DIMENSION = 1024
+# Square thumbnail edge, in pixels, for each place a profile picture is shown
+THUMBNAIL_SIZES = {"sidebar": 100, "profile": 140}
+IMAGE_FORMAT = "WEBP"
+IMAGE_EXTENSION = "webp"
+IMAGE_QUALITY = 80
+
+
+def _path(digest, suffix=""):
+    return os.path.join(IMAGE_DIR, f"{digest}{suffix}.{IMAGE_EXTENSION}")
+
+
+def thumbnail_path(digest, view):
+    """Returns the on-disk path of a thumbnail for a view ("sidebar" or "profile")."""
+    return _path(digest, f"_{THUMBNAIL_SIZES[view]}")
+
+
+def is_processed(digest):
+    """True when every derived asset for this image already exists on disk."""
+    return bool(digest) and all(os.path.exists(thumbnail_path(digest, view)) for view in THUMBNAIL_SIZES)
+
+
+def _save(img, path):
+    # Written under a temporary name and renamed, so readers never see a half-written file
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        img.save(partial, IMAGE_FORMAT, quality=IMAGE_QUALITY)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def process_image(data):
+    """Decodes an uploaded image once and stores a capped original plus fixed-size thumbnails.
+
+    Files are named by the SHA-256 of the uploaded bytes, so the same picture is only
+    processed once no matter who uploads it. Returns that digest.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if is_processed(digest):
+        return digest
+
+    from PIL import Image, ImageOps  # Pillow is only needed when a new picture arrives
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        img.thumbnail((MAX_DIMENSION, MAX_DIMENSION))
+        _save(img, _path(digest))
+        for view, size in THUMBNAIL_SIZES.items():
+            _save(ImageOps.fit(img, (size, size)), thumbnail_path(digest, view))
+    return digest
+
+
+def from_stored(value):
+    """Turns a stored profile_picture value into an image digest (or None).
+
+    Older rows hold a path to a full-size file; those are processed on first use.
+    A missing or unreadable file means no picture, never a failed login.
+    """
+    if not value:
+        return None
+    if is_processed(value):
+        return value
+    try:
+        with open(value, "rb") as f:
+            return process_image(f.read())
+    except Exception:
+        return None
+
+
+def image_src(digest, view):
+    """Returns a thumbnail path usable with st.image, or the default avatar URL."""
+    if digest and os.path.exists(thumbnail_path(digest, view)):
+        return thumbnail_path(digest, view)
+    return DEFAULT_AVATAR_URL
+
+
+@lru_cache(maxsize=256)
+def _data_uri(path):
+    with open(path, "rb") as f:
+        return f"data:image/{IMAGE_EXTENSION};base64," + base64.b64encode(f.read()).decode("ascii")
+
+
+def image_data_uri(digest, view):
+    """Returns a thumbnail as a small data URI for use in raw HTML, or the default avatar URL."""
+    src = image_src(digest, view)
+    return src if src == DEFAULT_AVATAR_URL else _data_uri(src)
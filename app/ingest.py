@@ -0,0 +1,217 @@
+import argparse                                  # Command-line options
+import glob                                      # Scan folders for PDFs
+import os                                        # Worker counts from environment variables
+import sys                                       # Exit status
+import threading                                 # Progress output from worker threads
+import time                                      # Per-file and total timings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from app import db, metrics, pdf_extract         # Checkpoints, stage timings, PDF parsing
+from app.resume_cache import file_digest, get_resume_cache
+
+# ----------- CONSTANTS -----------
+# Processes extracting PDF text (one whole file per task)
+EXTRACT_WORKERS = int(os.getenv("RESUMEBOT_INGEST_EXTRACT_WORKERS", os.cpu_count() or 1))
+# Threads generating question sets; the shared token bucket still caps the request rate
+LLM_WORKERS = int(os.getenv("RESUMEBOT_INGEST_LLM_WORKERS", 8))
+
+SQL_DONE_DIGESTS = "SELECT digest FROM ingested_resumes WHERE owner=? AND status='done'"
+SQL_SAVE_INGESTED = ("INSERT OR REPLACE INTO ingested_resumes (owner, digest, filename, status, model, questions, "
+                     "error, pages, extract_seconds, llm_seconds, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+@dataclass
+class IngestResult:
+    """Outcome of one file in a batch."""
+    path: str
+    digest: str
+    status: str = "pending"          # done | error | skipped (already ingested or a duplicate)
+    pages: int = 0
+    cached_text: bool = False        # Text came from the resume cache, no extraction needed
+    extract_seconds: float = 0.0
+    llm_seconds: float = 0.0
+    error: str = None
+
+
+def find_pdfs(paths):
+    """Returns the PDF files among the given paths, searching folders recursively."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)
+                            + glob.glob(os.path.join(path, "**", "*.PDF"), recursive=True))
+        else:
+            found.append(path)
+    return found
+
+
+def _digest_file(path):
+    with open(path, "rb") as f:
+        return file_digest(f.read())
+
+
+# ----------- EXTRACTION PROCESSES -----------
+def _init_extract_worker():
+    # Each process parses whole files, so pages are not fanned out to a second pool
+    pdf_extract.WORKERS = 1
+
+
+def _extract_file(path):
+    with open(path, "rb") as f:
+        return pdf_extract.extract_pdf(f.read())
+
+
+# ----------- BATCH -----------
+def ingest(paths, owner, llm, extract_workers=EXTRACT_WORKERS, llm_workers=LLM_WORKERS, on_result=None):
+    """Extracts, generates questions for and stores every PDF under paths; returns IngestResults.
+
+    Text is extracted on a process pool and question sets are generated on a thread
+    pool as soon as each file's text is ready. Each finished file is checkpointed in
+    the ingested_resumes table, recorded in the owner's upload history and added to
+    the resume similarity index, so uploading it later on the dashboard reuses its
+    questions. A rerun skips files already done; extracted text and model responses
+    of files that were in progress come back from the resume and LLM caches.
+    """
+    from app.llm import generate_questions, model_name
+    from app.resume_index import get_resume_index
+    from app.resume_prep import prepare_resume
+
+    model = model_name(llm)
+    cache = get_resume_cache()
+    with db.connection() as conn:
+        done = {row[0] for row in conn.execute(SQL_DONE_DIGESTS, (owner,))}
+
+    results, pending, seen = [], [], set()
+    for path in find_pdfs(paths):
+        result = IngestResult(path, _digest_file(path))
+        results.append(result)
+        if result.digest in done or result.digest in seen:
+            result.status = "skipped"
+        else:
+            seen.add(result.digest)
+            pending.append(result)
+
+    output_lock = threading.Lock()
+
+    def save(result, questions=None):
+        with db.connection() as conn:
+            conn.execute(SQL_SAVE_INGESTED, (owner, result.digest, os.path.basename(result.path), result.status,
+                                             model, questions, result.error, result.pages,
+                                             result.extract_seconds, result.llm_seconds, time.time()))
+        if on_result is not None:
+            with output_lock:
+                on_result(result)
+
+    def fail(result, exc):
+        result.status = "error"
+        result.error = str(exc) or type(exc).__name__
+        save(result)
+
+    def generate(result, text):
+        began = time.perf_counter()
+        try:
+            if not text.strip():
+                raise ValueError("no text found in the PDF")
+            with metrics.span("ingest.questions"):
+                questions = generate_questions(llm, prepare_resume(text).text)
+        except Exception as exc:
+            result.llm_seconds = time.perf_counter() - began
+            fail(result, exc)
+            return
+        result.llm_seconds = time.perf_counter() - began
+        db.record_upload(owner, result.digest, os.path.basename(result.path))
+        get_resume_index().add(text, model, questions)
+        result.status = "done"
+        save(result, questions)
+
+    with ProcessPoolExecutor(max_workers=max(1, extract_workers), initializer=_init_extract_worker) as processes, \
+            ThreadPoolExecutor(max_workers=max(1, llm_workers), thread_name_prefix="ingest") as threads:
+        cached, extracting = [], {}
+        for result in pending:
+            text = cache.get(result.digest)
+            if text is not None:
+                result.cached_text = True
+                cached.append((result, text))
+            else:
+                extracting[processes.submit(_extract_file, result.path)] = result
+        # Worker processes are forked above, before any generation thread starts
+        generating = [threads.submit(generate, result, text) for result, text in cached]
+        for future in as_completed(extracting):
+            result = extracting[future]
+            try:
+                extraction = future.result()
+            except Exception as exc:
+                fail(result, exc)
+                continue
+            result.pages = len(extraction.pages)
+            result.extract_seconds = extraction.elapsed
+            metrics.observe("stage_seconds", extraction.elapsed, stage="ingest.extract")
+            if extraction.stopped_reason != "time_budget":
+                cache.put(result.digest, extraction.text)
+            generating.append(threads.submit(generate, result, extraction.text))
+        for future in generating:
+            future.result()
+    return results
+
+
+# ----------- COMMAND LINE -----------
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def print_file(result):
+    name = os.path.basename(result.path)
+    if result.status == "error":
+        print(f"  ✗ {name}: {result.error}")
+        return
+    extract = "cached text" if result.cached_text else f"{result.pages} pages in {result.extract_seconds:.2f} s"
+    print(f"  ✓ {name}: {extract}, questions in {result.llm_seconds:.2f} s")
+
+
+def print_summary(results, wall, llm):
+    counts = {status: sum(r.status == status for r in results) for status in ("done", "skipped", "error")}
+    processed = counts["done"] + counts["error"]
+    print(f"\n{len(results)} files: {counts['done']} ingested, {counts['skipped']} skipped, {counts['error']} failed "
+          f"in {wall:.1f} s ({processed / wall if wall else 0:.2f} files/s)")
+    finished = [r for r in results if r.status == "done"]
+    extracted = [r.extract_seconds for r in finished if not r.cached_text]
+    for label, values in (("extract", extracted), ("questions", [r.llm_seconds for r in finished])):
+        if values:
+            print(f"  {label:<10} p50 {_percentile(values, 0.5):.2f} s  p99 {_percentile(values, 0.99):.2f} s  "
+                  f"max {max(values):.2f} s")
+    stats = llm.stats()
+    print(f"  model calls {stats['calls']}, retries {stats['retries']}, "
+          f"rate limit waits {stats['rate_limit_waits']} ({stats['rate_limit_wait_seconds']:.1f} s)")
+
+
+def main(argv=None):
+    """Preloads a folder of resume PDFs for a recruiter account."""
+    parser = argparse.ArgumentParser(description="Bulk-ingest resume PDFs: extract text, generate questions, "
+                                                 "store them in the app database.")
+    parser.add_argument("paths", nargs="+", help="PDF files or folders (searched recursively)")
+    parser.add_argument("--owner", required=True, help="email of the account the resumes are recorded for")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS, help="PDF extraction processes")
+    parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS, help="concurrent question generations")
+    parser.add_argument("--rate", type=float, help="model requests per second (default: RESUMEBOT_LLM_RATE)")
+    parser.add_argument("--fake-llm", action="store_true", help="use the local fake model (no API key needed)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake model round trip in seconds")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from app.llm_client import TokenBucket, create_llm, BURST
+
+    load_dotenv()
+    if args.fake_llm:
+        os.environ["RESUMEBOT_FAKE_LLM"] = "1"
+        os.environ["RESUMEBOT_FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    llm = create_llm(limiter=TokenBucket(args.rate, BURST) if args.rate is not None else None)
+
+    began = time.perf_counter()
+    results = ingest(args.paths, args.owner, llm, args.extract_workers, args.llm_workers, on_result=print_file)
+    print_summary(results, time.perf_counter() - began, llm)
+    return 1 if any(r.status == "error" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+import argparse                                  # Command-line batch scoring
+import glob                                      # Job description library files
+import math                                      # Smoothed IDF
+import os                                        # Library path from environment variables
+import re                                        # Tokenization
+import threading                                 # Library is shared by every session
+import unicodedata                               # Fold ligatures and full-width forms from PDFs
+from dataclasses import dataclass, field
+# NumPy is imported inside the functions that need it, so the login page does not load it
+
+# ----------- CONSTANTS -----------
+# Folder of job descriptions (one .txt or .md file each; the first line is the title)
+JD_DIR = os.getenv("RESUMEBOT_JD_DIR", os.path.join("assets", "job_descriptions"))
+# Weight of skill coverage vs. keyword (TF-IDF cosine) similarity in the final score
+SKILL_WEIGHT = 0.6
+
+# Canonical skill -> spellings found in resumes and job descriptions (matched as whole tokens/phrases)
+SKILLS = {
+    "python": ["python"], "java": ["java"], "javascript": ["javascript", "js", "es6"],
+    "typescript": ["typescript"], "c++": ["c++", "cpp"], "c#": ["c#", "csharp"], "go": ["golang"],
+    "rust": ["rust"], "kotlin": ["kotlin"], "swift": ["swift"], "scala": ["scala"], "php": ["php"],
+    "ruby": ["ruby"], "sql": ["sql"], "bash": ["bash", "shell scripting"],
+    "django": ["django"], "flask": ["flask"], "fastapi": ["fastapi"], "spring": ["spring", "spring boot"],
+    "node.js": ["node.js", "nodejs"], "react": ["react", "react.js", "reactjs"],
+    "angular": ["angular"], "vue": ["vue", "vue.js"], "html": ["html", "html5"], "css": ["css", "css3"],
+    "streamlit": ["streamlit"], ".net": ["dotnet", "asp.net"],
+    "rest apis": ["rest apis", "rest api", "restful"], "graphql": ["graphql"], "grpc": ["grpc"],
+    "postgresql": ["postgresql", "postgres"], "mysql": ["mysql"], "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"], "elasticsearch": ["elasticsearch"], "kafka": ["kafka"], "rabbitmq": ["rabbitmq"],
+    "spark": ["spark", "pyspark"], "hadoop": ["hadoop"], "airflow": ["airflow"], "dbt": ["dbt"],
+    "snowflake": ["snowflake"], "bigquery": ["bigquery"],
+    "aws": ["aws", "amazon web services"], "gcp": ["gcp", "google cloud"], "azure": ["azure"],
+    "docker": ["docker"], "kubernetes": ["kubernetes", "k8s"], "terraform": ["terraform"],
+    "ansible": ["ansible"], "jenkins": ["jenkins"], "ci/cd": ["ci/cd", "cicd", "continuous integration"],
+    "git": ["git", "github", "gitlab"], "linux": ["linux", "unix"],
+    "prometheus": ["prometheus"], "grafana": ["grafana"],
+    "pandas": ["pandas"], "numpy": ["numpy"], "scikit-learn": ["scikit-learn", "sklearn"],
+    "tensorflow": ["tensorflow"], "pytorch": ["pytorch", "torch"], "keras": ["keras"],
+    "machine learning": ["machine learning", "ml"], "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"], "computer vision": ["computer vision", "opencv"],
+    "llms": ["llm", "llms", "large language models", "langchain"], "statistics": ["statistics", "statistical"],
+    "tableau": ["tableau"], "power bi": ["power bi", "powerbi"], "excel": ["excel"],
+    "data visualization": ["data visualization", "dashboards"], "a/b testing": ["a/b testing", "experimentation"],
+    "selenium": ["selenium"], "cypress": ["cypress"], "pytest": ["pytest"], "junit": ["junit"],
+    "test automation": ["test automation", "automated testing"], "microservices": ["microservices"],
+    "system design": ["system design", "distributed systems"], "agile": ["agile", "scrum"],
+    "jira": ["jira"], "figma": ["figma"], "product analytics": ["product analytics", "mixpanel", "amplitude"],
+}
+STOP_WORDS = frozenset("""a an and are as at be by for from has have in is it its of on or our that the their
+this to was we were will with you your they them he she i my me us all any can may must should would
+about into over under more most other some such than then there these those also using used use work
+working experience years year including within across per etc""".split())
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokens(text):
+    """Lowercase word tokens; keeps skill spellings such as c++, c#, node.js and ci/cd intact."""
+    return _TOKEN.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+# Lookup tables for skill spellings of one and several tokens
+_SKILL_INDEX = {skill: i for i, skill in enumerate(SKILLS)}
+_SPELLINGS = {}
+for _skill, _spellings in SKILLS.items():
+    for _spelling in _spellings:
+        _SPELLINGS[tuple(tokens(_spelling)) or (_spelling,)] = _skill
+_MAX_SPELLING = max(len(key) for key in _SPELLINGS)
+
+
+def extract_skills(text_or_tokens):
+    """Returns the canonical skills mentioned in a text."""
+    words = tokens(text_or_tokens) if isinstance(text_or_tokens, str) else text_or_tokens
+    found = set()
+    for n in range(1, _MAX_SPELLING + 1):
+        for i in range(len(words) - n + 1):
+            skill = _SPELLINGS.get(tuple(words[i:i + n]))
+            if skill is not None:
+                found.add(skill)
+    return found
+
+
+def keywords(words):
+    """Keyword terms of a document: non-stop-word unigrams and bigrams."""
+    kept = [w for w in words if w not in STOP_WORDS and not w.isdigit() and len(w) > 1]
+    return kept + [f"{a} {b}" for a, b in zip(kept, kept[1:])]
+
+
+@dataclass
+class JobDescription:
+    title: str
+    text: str
+    source: str = ""
+
+
+@dataclass
+class Document:
+    """Tokenized text with its skill set and keyword counts."""
+    skills: set
+    terms: dict
+
+    @classmethod
+    def from_text(cls, text):
+        words = tokens(text)
+        terms = {}
+        for term in keywords(words):
+            terms[term] = terms.get(term, 0) + 1
+        return cls(extract_skills(words), terms)
+
+
+@dataclass
+class ScoreMatrix:
+    """Scores of every resume (rows) against every job description (columns), 0-100."""
+    scores: object                   # ndarray (resumes x jds)
+    skill_coverage: object           # fraction of each JD's skills found in each resume
+    keyword_similarity: object       # TF-IDF cosine similarity
+    resume_skills: list = field(default_factory=list)
+    jd_skills: list = field(default_factory=list)
+
+    def ranked(self, resume=0, top=None):
+        """Returns [(jd index, score, matched skills, missing skills)] for one resume, best first."""
+        import numpy as np
+        order = np.argsort(-self.scores[resume], kind="stable")[:top]
+        return [(int(j), float(self.scores[resume, j]),
+                 sorted(self.resume_skills[resume] & self.jd_skills[j]),
+                 sorted(self.jd_skills[j] - self.resume_skills[resume])) for j in order]
+
+
+def _skill_matrix(documents):
+    import numpy as np
+    matrix = np.zeros((len(documents), len(SKILLS)), dtype=np.float32)
+    for row, document in enumerate(documents):
+        matrix[row, [_SKILL_INDEX[s] for s in document.skills]] = 1.0
+    return matrix
+
+
+def score_documents(resumes, jds, skill_weight=SKILL_WEIGHT):
+    """Scores tokenized resumes against tokenized job descriptions in one batch.
+
+    The keyword vocabulary is the job descriptions' terms only, since no other term
+    can contribute to a dot product; resume norms still count all of a resume's terms.
+    """
+    import numpy as np
+
+    vocabulary = {}
+    for jd in jds:
+        for term in jd.terms:
+            vocabulary.setdefault(term, len(vocabulary))
+    # Smoothed IDF over every document in the batch
+    df = np.zeros(len(vocabulary), dtype=np.float32)
+    for document in list(resumes) + list(jds):
+        columns = [vocabulary[t] for t in document.terms if t in vocabulary]
+        df[columns] += 1
+    total = len(resumes) + len(jds)
+    idf = np.log((1 + total) / (1 + df)) + 1
+    default_idf = math.log(1 + total) + 1     # For resume terms no job description uses (df counted as 0)
+
+    def weighted(documents):
+        """Sublinear TF-IDF rows over the vocabulary, plus each document's full L2 norm."""
+        matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+        norms = np.zeros(len(documents), dtype=np.float32)
+        for row, document in enumerate(documents):
+            inside = [(vocabulary[t], c) for t, c in document.terms.items() if t in vocabulary]
+            outside = np.array([c for t, c in document.terms.items() if t not in vocabulary], dtype=np.float32)
+            if inside:
+                columns, counts = zip(*inside)
+                columns = np.array(columns)
+                matrix[row, columns] = (1 + np.log(np.array(counts, dtype=np.float32))) * idf[columns]
+            outside_sq = float((((1 + np.log(outside)) * default_idf) ** 2).sum()) if outside.size else 0.0
+            norms[row] = math.sqrt(float((matrix[row] ** 2).sum()) + outside_sq)
+        return matrix, norms
+
+    resume_matrix, resume_norms = weighted(resumes)
+    jd_matrix, jd_norms = weighted(jds)
+    keyword_similarity = (resume_matrix @ jd_matrix.T) / np.maximum(np.outer(resume_norms, jd_norms), 1e-9)
+
+    resume_skills, jd_skills = _skill_matrix(resumes), _skill_matrix(jds)
+    required = jd_skills.sum(axis=1)
+    coverage = (resume_skills @ jd_skills.T) / np.maximum(required, 1)
+    # A job description that names no known skill is scored on keywords alone
+    weight = np.where(required > 0, skill_weight, 0.0)
+    scores = 100 * (weight * coverage + (1 - weight) * keyword_similarity)
+    return ScoreMatrix(scores, coverage, keyword_similarity,
+                       [r.skills for r in resumes], [j.skills for j in jds])
+
+
+def score_matrix(resume_texts, jds, skill_weight=SKILL_WEIGHT):
+    """Scores resume texts against JobDescriptions (or plain texts); see score_documents."""
+    jd_texts = [jd.text if isinstance(jd, JobDescription) else jd for jd in jds]
+    return score_documents([Document.from_text(t) for t in resume_texts],
+                           [Document.from_text(t) for t in jd_texts], skill_weight)
+
+
+# ----------- JOB DESCRIPTION LIBRARY -----------
+def parse_job_descriptions(text, source=""):
+    """Splits pasted text into job descriptions separated by lines of '---'; first line is the title."""
+    jds = []
+    for block in re.split(r"^\s*-{3,}\s*$", text, flags=re.MULTILINE):
+        block = block.strip()
+        if block:
+            jds.append(JobDescription(block.splitlines()[0].lstrip("# ").strip(), block, source))
+    return jds
+
+
+class JobLibrary:
+    """Job descriptions loaded from a folder, tokenized once and shared by every session."""
+
+    def __init__(self, directory=JD_DIR):
+        self.directory = directory
+        self.jds = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.txt")) + glob.glob(os.path.join(directory, "*.md"))):
+            with open(path, encoding="utf-8") as f:
+                self.jds.extend(parse_job_descriptions(f.read(), os.path.basename(path)))
+        self.documents = [Document.from_text(jd.text) for jd in self.jds]
+
+    def score(self, resume_texts, extra=()):
+        """Scores resumes against the library plus any extra JobDescriptions; returns (jds, ScoreMatrix)."""
+        jds = list(self.jds) + list(extra)
+        documents = self.documents + [Document.from_text(jd.text) for jd in extra]
+        return jds, score_documents([Document.from_text(t) for t in resume_texts], documents)
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_job_library():
+    """Returns the process-wide job description library."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = JobLibrary()
+        return _library
+
+
+# ----------- COMMAND LINE -----------
+def main(argv=None):
+    """Scores a folder of resume PDFs/texts against the job description library and prints a ranking."""
+    import csv
+    import sys
+    import time
+    from app.resume_cache import load_pdf
+
+    parser = argparse.ArgumentParser(description="Score resumes against a job description library.")
+    parser.add_argument("resumes", nargs="+", help="resume files (.pdf or .txt) or folders of them")
+    parser.add_argument("--jds", default=JD_DIR, help="folder of job descriptions (.txt/.md)")
+    parser.add_argument("--top", type=int, default=3, help="best matches to list per resume")
+    parser.add_argument("--csv", help="also write the full score matrix to this CSV file")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for entry in args.resumes:
+        if os.path.isdir(entry):
+            paths += sorted(glob.glob(os.path.join(entry, "*.pdf")) + glob.glob(os.path.join(entry, "*.txt")))
+        else:
+            paths.append(entry)
+
+    began = time.perf_counter()
+    texts = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        if not path.lower().endswith(".pdf"):
+            texts.append(data.decode("utf-8", "replace"))
+            continue
+        # Text cut short by the time budget is scored but never cached, so the next run reads the whole file
+        text, extraction = load_pdf(data)
+        if extraction is not None and extraction.stopped_reason == "time_budget":
+            print(f"{os.path.basename(path)}: only {len(extraction.pages)} of {extraction.total_pages} pages "
+                  "read within the time budget", file=sys.stderr)
+        texts.append(text)
+    extracted = time.perf_counter()
+    library = JobLibrary(args.jds)
+    jds, matrix = library.score(texts)
+    scored = time.perf_counter()
+
+    for row, path in enumerate(paths):
+        ranking = ", ".join(f"{jds[j].title} {score:.0f}" for j, score, _, _ in matrix.ranked(row, args.top))
+        print(f"{os.path.basename(path)}: {ranking}")
+    print(f"\n{len(paths)} resumes x {len(jds)} job descriptions: text in {extracted - began:.2f} s, "
+          f"scoring in {scored - extracted:.3f} s", file=sys.stderr)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["resume"] + [jd.title for jd in jds])
+            for row, path in enumerate(paths):
+                writer.writerow([path] + [f"{score:.1f}" for score in matrix.scores[row]])
+
+
+if __name__ == "__main__":
+    main()
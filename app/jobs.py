@@ -0,0 +1,181 @@
+import hashlib                                   # Coalescing keys
+import json                                      # Results are persisted as JSON
+import logging                                   # Persistence failures
+import os                                        # Worker count from environment variables
+import threading                                 # Job table is shared across sessions
+import time                                      # Job timestamps
+import uuid                                      # Job ids stored in session state
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app import db                               # Completed jobs are persisted here
+from app import metrics                          # Queue counters in the performance panel
+
+# ----------- CONSTANTS -----------
+WORKERS = int(os.getenv("RESUMEBOT_JOB_WORKERS", 8))
+# Finished jobs kept in memory; older ones are still readable from the database
+MAX_JOBS_IN_MEMORY = 500
+# Days a finished job (candidate answers and their feedback) is kept in the database
+JOB_TTL_DAYS = float(os.getenv("RESUMEBOT_JOB_TTL_DAYS", 7))
+# Seconds between deletions of expired jobs
+PURGE_INTERVAL = 3600
+
+SQL_SAVE_JOB = ("INSERT OR REPLACE INTO jobs (id, kind, key, status, result, error, created_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+SQL_LOAD_JOB = "SELECT id, kind, key, status, result, error, created_at, finished_at FROM jobs WHERE id=?"
+SQL_PURGE_JOBS = "DELETE FROM jobs WHERE finished_at < ?"
+
+log = logging.getLogger(__name__)
+
+
+def job_key(kind, *parts):
+    """Builds the coalescing key for a job from its kind and inputs."""
+    digest = hashlib.sha256("\x00".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f"{kind}:{digest}"
+
+
+class Job:
+    """One unit of background work; its fields are read by the UI on each rerun."""
+
+    def __init__(self, kind, key):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = "queued"          # queued -> running -> done | error
+        self.chunks = []                # Streamed output so far
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def partial(self):
+        return "".join(self.chunks)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+
+class JobQueue:
+    """Runs jobs on a thread pool and coalesces identical jobs that are still in flight."""
+
+    def __init__(self, workers=WORKERS, ttl_days=JOB_TTL_DAYS):
+        self.ttl_days = ttl_days
+        self._purged_at = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()      # id -> Job
+        self._in_flight = {}            # key -> Job
+        self.submitted = 0
+        self.coalesced = 0
+        self.persist_errors = 0
+
+    def submit(self, kind, key, fn, *args, **kwargs):
+        """Queues fn(*args, **kwargs) and returns its Job.
+
+        If a job with the same key is already queued or running, that job is returned
+        instead of starting a second one. fn may return a value or an iterator of text
+        chunks; chunks are exposed through job.partial while the job runs.
+        """
+        with self._lock:
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                self.coalesced += 1
+                return existing
+            job = Job(kind, key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self.submitted += 1
+            self._forget_old()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        try:
+            result = fn(*args, **kwargs)
+            if hasattr(result, "__next__"):
+                for chunk in result:
+                    job.chunks.append(chunk)
+                result = job.partial
+            job.result = result
+            job.status = "done"
+        except Exception as exc:
+            job.error = str(exc) or type(exc).__name__
+            job.status = "error"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+            self._persist(job)
+
+    def _persist(self, job):
+        try:
+            with db.connection() as conn:
+                conn.execute(SQL_SAVE_JOB, (job.id, job.kind, job.key, job.status,
+                                            json.dumps(job.result), job.error,
+                                            job.created_at, job.finished_at))
+                if job.finished_at - self._purged_at > PURGE_INTERVAL:
+                    self._purged_at = job.finished_at
+                    conn.execute(SQL_PURGE_JOBS, (job.finished_at - self.ttl_days * 86400,))
+        except Exception:
+            # The in-memory copy is still available to this process
+            log.warning("could not persist %s job %s", job.kind, job.id, exc_info=True)
+            metrics.inc("jobs_persist_errors_total", kind=job.kind)
+            with self._lock:
+                self.persist_errors += 1
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(self._jobs) - MAX_JOBS_IN_MEMORY)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Returns a job by id from memory or, once finished and forgotten, from the database."""
+        if not job_id:
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        with db.connection() as conn:
+            row = conn.execute(SQL_LOAD_JOB, (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = Job(row[1], row[2])
+        job.id, job.status, job.error, job.created_at, job.finished_at = row[0], row[3], row[5], row[6], row[7]
+        job.result = json.loads(row[4]) if row[4] else None
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+                "in_memory": len(self._jobs),
+                "persist_errors": self.persist_errors,
+            }
+
+
+# ----------- SHARED INSTANCE -----------
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """Returns the process-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            metrics.register_collector("jobs", _queue.stats)
+        return _queue
+
+
+def submit(kind, key, fn, *args, **kwargs):
+    return get_queue().submit(kind, key, fn, *args, **kwargs)
+
+
+def get_job(job_id):
+    return get_queue().get(job_id)
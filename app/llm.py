@@ -0,0 +1,204 @@
+import asyncio                                      # Concurrent batch grading
+import os                                           # Settings from environment variables
+import threading                                    # Latency log is shared across sessions
+import time                                         # Time-to-first-token and total latency
+from collections import deque                       # Bounded latency log
+from app.llm_cache import get_llm_cache, make_key   # Persistent LLM response cache
+from app.prompts import get_prompt                  # Versioned, precompiled prompt templates
+from app import metrics                             # Stage histograms and token counters
+from app.resume_prep import count_tokens            # Token estimate when the model reports no usage
+
+# Maximum number of feedback calls in flight at once when grading a batch of answers
+GRADE_CONCURRENCY = int(os.getenv("RESUMEBOT_GRADE_CONCURRENCY", 5))
+
+# Most recent per-call latency records, newest last
+LATENCY_LOG_SIZE = 500
+_latency_log = deque(maxlen=LATENCY_LOG_SIZE)
+_latency_lock = threading.Lock()
+
+def model_name(llm):
+    """Returns the model name of a LangChain chat model or model router (used in cache keys)."""
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+
+
+def for_task(llm, task):
+    """Returns what to call for a task: the router's route for it (see app/llm_router.py), or llm itself."""
+    route = getattr(llm, "for_task", None)
+    return route(task) if route is not None else llm
+
+
+def answered_by(model, default):
+    """Name of the model that produced the last response of a route, for the latency log."""
+    return getattr(model, "answered_by", None) or default
+
+
+def run_prompt(llm, prompt_name, task, bypass_cache=False, **inputs):
+    """Runs a registered prompt through the LLM, serving repeated identical prompts from the cache."""
+    template = get_prompt(prompt_name)
+    cache = get_llm_cache()
+    name = model_name(llm)
+    key = make_key(name, template.template, inputs)
+    if not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    began = time.perf_counter()
+    prompt = template.format(**inputs)
+    model = for_task(llm, task)
+    message = model.invoke(prompt)
+    response = message.content if hasattr(message, "content") else str(message)
+    elapsed = time.perf_counter() - began
+    record_latency(task, answered_by(model, name), elapsed, elapsed, False, *token_usage(message, prompt, response))
+    cache.put(key, name, response)
+    return response
+
+
+def token_usage(message, prompt, response):
+    """Returns (prompt_tokens, response_tokens), preferring the usage the model reports."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    return (usage.get("input_tokens") or count_tokens(prompt),
+            usage.get("output_tokens") or count_tokens(response))
+
+
+def record_latency(task, model, ttft, total, cached, prompt_tokens=0, response_tokens=0):
+    """Records one call's time-to-first-token, total latency and token counts.
+
+    Entries go to the latency log and to the metrics histograms; cache hits are
+    timed under a separate stage and use no tokens.
+    """
+    with _latency_lock:
+        _latency_log.append({
+            "task": task,
+            "model": model,
+            "ttft": ttft,
+            "total": total,
+            "cached": cached,
+            "prompt_tokens": prompt_tokens,
+            "response_tokens": response_tokens,
+            "at": time.time(),
+        })
+    metrics.observe("stage_seconds", total, stage=f"llm.{task}.cached" if cached else f"llm.{task}")
+    if cached:
+        return
+    metrics.observe("llm_ttft_seconds", ttft, task=task)
+    metrics.observe("llm_prompt_tokens", prompt_tokens, metrics.TOKEN_BUCKETS, task=task)
+    metrics.observe("llm_response_tokens", response_tokens, metrics.TOKEN_BUCKETS, task=task)
+    metrics.inc("llm_tokens_total", prompt_tokens, task=task, kind="prompt")
+    metrics.inc("llm_tokens_total", response_tokens, task=task, kind="response")
+
+
+def recent_latencies(task=None):
+    """Returns the recorded latency entries, optionally only those for one task."""
+    with _latency_lock:
+        return [entry for entry in _latency_log if task is None or entry["task"] == task]
+
+
+def stream_prompt(llm, prompt_name, task, bypass_cache=False, **inputs):
+    """Yields the response to a registered prompt chunk by chunk as the model produces it.
+
+    Cache hits are yielded as a single chunk. The full response is cached once the
+    stream finishes, and the call's latency is recorded under the given task name.
+    """
+    began = time.perf_counter()
+    template = get_prompt(prompt_name)
+    cache = get_llm_cache()
+    name = model_name(llm)
+    key = make_key(name, template.template, inputs)
+    if not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            elapsed = time.perf_counter() - began
+            record_latency(task, name, elapsed, elapsed, cached=True)
+            yield cached
+            return
+
+    prompt = template.format(**inputs)
+    model = for_task(llm, task)
+    parts = []
+    ttft = None
+    last = None
+    for chunk in model.stream(prompt):
+        if getattr(chunk, "usage_metadata", None):
+            last = chunk
+        text = chunk.content if hasattr(chunk, "content") else str(chunk)
+        if not text:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - began
+        parts.append(text)
+        yield text
+
+    total = time.perf_counter() - began
+    response = "".join(parts)
+    record_latency(task, answered_by(model, name), ttft if ttft is not None else total, total, False,
+                   *token_usage(last, prompt, response))
+    cache.put(key, name, response)
+
+
+def stream_questions(llm, resume_text, bypass_cache=False):
+    """Streams interview questions for a resume."""
+    return stream_prompt(llm, "questions", "questions", bypass_cache, resume_text=resume_text)
+
+
+def stream_feedback(llm, question, answer, bypass_cache=False):
+    """Streams feedback on a candidate's answer to a question."""
+    return stream_prompt(llm, "feedback", "feedback", bypass_cache, question=question, answer=answer)
+
+
+def generate_questions(llm, resume_text, bypass_cache=False):
+    """Generates interview questions for a resume."""
+    return run_prompt(llm, "questions", "questions", bypass_cache, resume_text=resume_text)
+
+
+def get_feedback(llm, question, answer, bypass_cache=False):
+    """Generates feedback on a candidate's answer to a question."""
+    return run_prompt(llm, "feedback", "feedback", bypass_cache, question=question, answer=answer)
+
+
+# ----------- BATCH GRADING -----------
+async def _grade_one(llm, question, answer, semaphore, bypass_cache):
+    """Grades one answer, holding a semaphore slot only while the model is being called."""
+    template = get_prompt("feedback")
+    cache = get_llm_cache()
+    name = model_name(llm)
+    inputs = {"question": question, "answer": answer}
+    key = make_key(name, template.template, inputs)
+    began = time.perf_counter()
+    if not bypass_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            elapsed = time.perf_counter() - began
+            record_latency("feedback_batch", name, elapsed, elapsed, cached=True)
+            return {"question": question, "answer": answer, "feedback": cached, "error": None}
+
+    prompt = template.format(**inputs)
+    model = for_task(llm, "feedback_batch")
+    try:
+        async with semaphore:
+            message = await model.ainvoke(prompt)
+    except Exception as exc:
+        return {"question": question, "answer": answer, "feedback": None, "error": str(exc)}
+    feedback = message.content if hasattr(message, "content") else str(message)
+    elapsed = time.perf_counter() - began
+    record_latency("feedback_batch", answered_by(model, name), elapsed, elapsed, False,
+                   *token_usage(message, prompt, feedback))
+    cache.put(key, name, feedback)
+    return {"question": question, "answer": answer, "feedback": feedback, "error": None}
+
+
+async def agrade_answers(llm, pairs, max_concurrency=GRADE_CONCURRENCY, bypass_cache=False):
+    """Grades (question, answer) pairs concurrently; results come back in input order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    return await asyncio.gather(*(
+        _grade_one(llm, question, answer, semaphore, bypass_cache) for question, answer in pairs
+    ))
+
+
+def grade_answers(llm, pairs, max_concurrency=GRADE_CONCURRENCY, bypass_cache=False):
+    """Grades a batch of answers in roughly the time of one round trip.
+
+    Each result is a dict with question, answer, feedback and error (None on success),
+    so one failed call does not lose the feedback for the others.
+    """
+    return asyncio.run(agrade_answers(llm, pairs, max_concurrency, bypass_cache))
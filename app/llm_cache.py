@@ -0,0 +1,145 @@
+import hashlib                                   # Cache keys
+import json                                      # Stable serialization of prompt inputs
+import os                                        # Cache settings from environment variables
+import threading                                 # Sessions share one cache across threads
+import time                                      # TTL and LRU bookkeeping
+from app.db import get_pool                      # Pooled SQLite connections
+from app import metrics                          # Cache counters in the performance panel
+
+# ----------- CONSTANTS -----------
+CACHE_DIR = os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache"))
+LLM_CACHE_DB = os.path.join(CACHE_DIR, "llm_responses.db")
+# Entries older than this are treated as missing (default 7 days)
+TTL_SECONDS = float(os.getenv("RESUMEBOT_LLM_CACHE_TTL", 7 * 24 * 3600))
+# Total size of cached responses before least recently used entries are evicted (default 64 MB)
+MAX_BYTES = int(os.getenv("RESUMEBOT_LLM_CACHE_BYTES", 64 * 1024 * 1024))
+# Set RESUMEBOT_LLM_CACHE=off to always call the model
+ENABLED = os.getenv("RESUMEBOT_LLM_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+LLM_CACHE_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS llm_responses (
+           key TEXT PRIMARY KEY,
+           model TEXT,
+           response TEXT,
+           size INTEGER,
+           created_at REAL,
+           last_used REAL)''',
+    "CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)",
+]
+
+
+def normalize_input(value):
+    """Collapses whitespace so trivially different inputs share a cache entry."""
+    return " ".join(str(value).split())
+
+
+def template_hash(template):
+    """Returns a short hash of a prompt template's text."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def make_key(model, template, inputs):
+    """Builds the cache key from model name, template hash and normalized inputs."""
+    normalized = {name: normalize_input(value) for name, value in sorted(inputs.items())}
+    payload = json.dumps([model, template_hash(template), normalized], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of LLM responses with TTL, LRU eviction and a size cap."""
+
+    def __init__(self, db_path=LLM_CACHE_DB, ttl=TTL_SECONDS, max_bytes=MAX_BYTES, enabled=ENABLED):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _db(self):
+        """Returns the pooled connection source for the cache database."""
+        return get_pool(self.db_path, migrations=LLM_CACHE_MIGRATIONS)
+
+    def get(self, key):
+        """Returns the cached response for a key, or None if missing, expired or bypassed."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock, self._db().connection() as conn:
+            row = conn.execute("SELECT response, created_at FROM llm_responses WHERE key=?",
+                               (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM llm_responses WHERE key=?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE llm_responses SET last_used=? WHERE key=?", (now, key))
+            self.hits += 1
+            return response
+
+    def put(self, key, model, response):
+        """Stores a response and evicts least recently used entries above the size cap."""
+        if not self.enabled:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._db().connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO llm_responses "
+                         "(key, model, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, model, response, size, now, now))
+            # Drop expired entries, then trim the oldest-used ones until we fit the cap
+            conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute("SELECT key, size FROM llm_responses ORDER BY last_used").fetchall()
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM llm_responses WHERE key=?", (old_key,))
+                    total -= old_size
+                    self.evictions += 1
+
+    def clear(self):
+        """Removes every cached response."""
+        with self._lock, self._db().connection() as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def stats(self):
+        """Returns hit/miss counters and current size."""
+        with self._lock, self._db().connection() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# ----------- SHARED INSTANCE -----------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Returns the process-wide LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+            metrics.register_collector("llm_cache", _cache.stats)
+        return _cache
@@ -0,0 +1,217 @@
+import asyncio                                   # Async entry point used by batch grading
+import os                                        # Limits from environment variables
+import random                                    # Backoff jitter
+import threading                                 # Shared limiter and in-flight table
+import time                                      # Token bucket refill and backoff sleeps
+from concurrent.futures import Future
+
+# ----------- CONSTANTS -----------
+# Process-wide request rate towards the model (requests per second) and burst size
+RATE_PER_SECOND = float(os.getenv("RESUMEBOT_LLM_RATE", 5))
+BURST = int(os.getenv("RESUMEBOT_LLM_BURST", 10))
+# Retries on quota/transient errors, with full-jitter exponential backoff
+MAX_RETRIES = int(os.getenv("RESUMEBOT_LLM_RETRIES", 4))
+BASE_DELAY = 0.5
+MAX_DELAY = 20.0
+
+# google.api_core exception classes that mean "try again later", matched by name so the
+# package stays an optional import
+RETRYABLE_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+                    "InternalServerError", "BadGateway", "GatewayTimeout"}
+
+
+def _status_code(exc):
+    """HTTP status of an API error (google.api_core's code, or an HTTP client's status_code), if any."""
+    for value in (getattr(exc, "code", None), getattr(exc, "status_code", None),
+                  getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc):
+    """True for quota, rate-limit and transient server/network errors (HTTP 429 and 5xx).
+
+    Wrapped errors are classified by their cause, so a client that re-raises an
+    API error under its own type is still retried.
+    """
+    while exc is not None:
+        if isinstance(exc, (TimeoutError, ConnectionError)):
+            return True
+        if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__):
+            return True
+        status = _status_code(exc)
+        if status is not None:
+            return status == 429 or 500 <= status < 600
+        exc = exc.__cause__
+    return False
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full-jitter exponential backoff: a random delay up to base * 2**attempt, capped."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Blocking token-bucket rate limiter shared by every caller in the process."""
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self):
+        """Takes one token, sleeping until one is available."""
+        if self.rate <= 0:
+            return
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter():
+    """Returns the process-wide token bucket used by every wrapped model."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket()
+        return _shared_limiter
+
+
+class ResilientLLM:
+    """Wraps a LangChain chat model with request coalescing, rate limiting and retries.
+
+    invoke() calls with the same prompt that overlap in time share one model call.
+    Every call first takes a token from the shared bucket, and quota or transient
+    errors are retried with jittered exponential backoff. stream() is rate limited
+    and retried only until the first chunk arrives, so no text is ever repeated.
+    """
+
+    def __init__(self, llm, limiter=None, max_retries=MAX_RETRIES, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        self.llm = llm
+        self.model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+        self.limiter = limiter or get_shared_limiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._in_flight = {}             # (prompt, kwargs) -> Future shared by coalesced callers
+        self.metrics = {"calls": 0, "coalesced": 0, "retries": 0, "failures": 0, "streams": 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.metrics[name] += amount
+
+    def _with_retries(self, call):
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                return call()
+            except Exception as exc:
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+                attempt += 1
+
+    def invoke(self, prompt, **kwargs):
+        """Calls the model once per distinct in-flight prompt and call options and returns its message."""
+        key = (str(prompt), repr(sorted(kwargs.items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.metrics["calls"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(self._with_retries(lambda: self.llm.invoke(prompt, **kwargs)))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    async def ainvoke(self, prompt, **kwargs):
+        """Async invoke; runs the coalesced, rate-limited call on a worker thread."""
+        return await asyncio.to_thread(self.invoke, prompt, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        """Yields chunks from the model, retrying only failures that happen before the first chunk."""
+        self._count("streams")
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            started = False
+            try:
+                for chunk in self.llm.stream(prompt, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as exc:
+                if started or attempt >= self.max_retries or not is_retryable(exc):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+                attempt += 1
+
+    def stats(self):
+        """Returns coalescing/retry counters and rate limiter waits."""
+        with self._lock:
+            stats = dict(self.metrics)
+        stats["in_flight"] = len(self._in_flight)
+        stats["rate_limit_waits"] = self.limiter.waits
+        stats["rate_limit_wait_seconds"] = self.limiter.wait_seconds
+        return stats
+
+
+def create_llm(get_api_key=None, limiter=None):
+    """Builds the model router over the candidates in RESUMEBOT_LLM_MODELS, each wrapped in ResilientLLM.
+
+    Local fake models stand in for every candidate when RESUMEBOT_FAKE_LLM is set. get_api_key
+    is called only when real models are used; it defaults to reading GOOGLE_API_KEY.
+    """
+    from app.llm_router import TIMEOUT, ModelRouter, parse_models
+
+    models = parse_models()
+    if os.getenv("RESUMEBOT_FAKE_LLM"):
+        from app.fake_llm import FakeLLM
+        latency = float(os.getenv("RESUMEBOT_FAKE_LLM_LATENCY", 0.5))
+        clients = [FakeLLM(model=f"fake-{name}", latency=latency) for name, _ in models]
+    else:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        api_key = get_api_key() if get_api_key else os.getenv("GOOGLE_API_KEY")
+        # The wrapper owns retries, so keep the client's own retry loop short. The request timeout
+        # matches the router's, so a call the router gave up on does not keep a worker busy.
+        clients = [ChatGoogleGenerativeAI(model=name, api_key=api_key, max_retries=1, timeout=TIMEOUT)
+                   for name, _ in models]
+    wrapped = [ResilientLLM(client, limiter) for client in clients]
+    return ModelRouter(wrapped, prices={w.model: price for w, (_, price) in zip(wrapped, models)})
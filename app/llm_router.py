@@ -0,0 +1,277 @@
+import asyncio                                   # Timeouts on async calls
+import os                                        # Routing settings from environment variables
+import queue                                     # Hand-off of streamed chunks from the worker thread
+import threading                                 # Shared statistics and stream workers
+import time                                      # Latency, cost window
+from collections import deque                    # Recent spend for the hourly budget
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from app.resume_prep import count_tokens         # Token estimate for cost accounting
+
+# ----------- CONSTANTS -----------
+# Candidate models in order of preference, each with its price in USD per million tokens, e.g.
+# "gemini-2.0-flash:0.40,gemini-2.0-flash-lite:0.30"; the first is the primary model
+MODELS = os.getenv("RESUMEBOT_LLM_MODELS", "gemini-2.0-flash:0.40")
+# Seconds a call (or a stream's next chunk) may take before the router falls back to another model;
+# also the request timeout of each client, so abandoned calls do not run on
+TIMEOUT = float(os.getenv("RESUMEBOT_LLM_TIMEOUT", 30))
+# USD per rolling hour; once spent, calls go to the cheapest healthy model (0 disables the budget)
+HOURLY_BUDGET = float(os.getenv("RESUMEBOT_LLM_HOURLY_BUDGET", 0))
+# Models whose recent error rate exceeds this are only used when nothing else is left
+MAX_ERROR_RATE = 0.5
+# Weight of the newest observation in the latency and error rate moving averages
+EWMA_ALPHA = 0.2
+# Every PROBE_EVERY-th call of a task goes to the least recently used candidate, so a model
+# that was slow or failing once gets measured again
+PROBE_EVERY = 20
+
+# "quality" tasks use the first healthy model in preference order; "fastest" tasks use the model
+# with the lowest expected latency. Short feedback calls go to the fastest model.
+TASK_POLICIES = {
+    "questions": "quality",
+    "feedback": "fastest",
+    "feedback_batch": "fastest",
+}
+
+
+def parse_models(spec=MODELS):
+    """Parses "name:price,name" into [(name, USD per million tokens)]."""
+    models = []
+    for item in spec.split(","):
+        name, _, price = item.strip().partition(":")
+        if name:
+            models.append((name, float(price) if price else 0.0))
+    return models
+
+
+class _ModelStats:
+    """Moving averages and counters for one model."""
+
+    def __init__(self, name, price):
+        self.name = name
+        self.price = price              # USD per million tokens
+        self.latency = {}               # task -> EWMA seconds
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.tokens = 0
+        self.cost = 0.0
+        self.last_used = 0.0
+
+    def expected_latency(self, task):
+        # Untried models look instant, so each one is measured before the averages decide
+        return self.latency.get(task, 0.0) * (1 + 4 * self.error_rate)
+
+
+class ModelRouter:
+    """Picks a model per task from observed latency, error rate and an hourly cost budget.
+
+    Each candidate is a wrapped chat model (see ResilientLLM). for_task(task) returns
+    a route with the usual invoke(), ainvoke() and stream() methods; a call that fails
+    or exceeds the timeout is retried on the next candidate. Streams fall back only
+    until the first chunk arrives, so no text is repeated.
+
+    model is the primary (first) candidate's name, which cache and job keys use: a
+    response from any candidate is reused, and entries written before routing still match.
+    """
+
+    def __init__(self, models, prices=None, timeout=TIMEOUT, hourly_budget=HOURLY_BUDGET, policies=None):
+        self.models = {getattr(m, "model", None) or type(m).__name__: m for m in models}
+        prices = prices or {}
+        self.timeout = timeout
+        self.hourly_budget = hourly_budget
+        self.policies = dict(TASK_POLICIES, **(policies or {}))
+        self.model = next(iter(self.models))
+        self._lock = threading.Lock()
+        self._stats = {name: _ModelStats(name, prices.get(name, 0.0)) for name in self.models}
+        self._task_calls = {}
+        self._spend = deque()           # (time, USD) of calls in the last hour
+        self._executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-route")
+        self.fallbacks = 0
+
+    def for_task(self, task):
+        return _Route(self, task)
+
+    # ----------- ROUTING -----------
+    def _over_budget(self, now):
+        while self._spend and self._spend[0][0] < now - 3600:
+            self._spend.popleft()
+        return self.hourly_budget > 0 and sum(cost for _, cost in self._spend) >= self.hourly_budget
+
+    def candidates(self, task):
+        """Returns the model names to try for a task, best first."""
+        with self._lock:
+            stats = list(self._stats.values())
+            calls = self._task_calls[task] = self._task_calls.get(task, 0) + 1
+            healthy = [s for s in stats if s.error_rate <= MAX_ERROR_RATE]
+            unhealthy = [s for s in stats if s.error_rate > MAX_ERROR_RATE]
+            if self._over_budget(time.time()):
+                healthy.sort(key=lambda s: s.price)
+            elif self.policies.get(task, "quality") == "fastest":
+                healthy.sort(key=lambda s: s.expected_latency(task))
+            if len(stats) > 1 and calls % PROBE_EVERY == 0:
+                probe = min(stats, key=lambda s: s.last_used)
+                healthy = [probe] + [s for s in healthy if s is not probe]
+                unhealthy = [s for s in unhealthy if s is not probe]
+            unhealthy.sort(key=lambda s: s.error_rate)
+        return [s.name for s in healthy + unhealthy]
+
+    def record(self, name, task, seconds, ok, tokens=0, timed_out=False):
+        """Updates a model's latency and error rate averages, counters and spend."""
+        now = time.time()
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            stats.last_used = now
+            stats.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - stats.error_rate)
+            if ok:
+                previous = stats.latency.get(task)
+                stats.latency[task] = seconds if previous is None else previous + EWMA_ALPHA * (seconds - previous)
+                cost = tokens * stats.price / 1e6
+                stats.tokens += tokens
+                stats.cost += cost
+                self._spend.append((now, cost))
+            else:
+                stats.failures += 1
+                stats.timeouts += timed_out
+
+    # ----------- STATISTICS -----------
+    def route_stats(self, name):
+        """Latency averages, error rate, counters and cost of one candidate model."""
+        with self._lock:
+            s = self._stats[name]
+            values = {"calls": s.calls, "failures": s.failures, "timeouts": s.timeouts,
+                      "error_rate": s.error_rate, "tokens": s.tokens, "cost_usd": s.cost}
+            values.update({f"latency_{task}_seconds": latency for task, latency in s.latency.items()})
+        return values
+
+    def stats(self):
+        """Client counters summed over the candidates, plus fallbacks and spend in the last hour.
+
+        Rate limiter waits are counted once per limiter, since the candidates usually share one.
+        """
+        totals, limiters = {}, {}
+        for model in self.models.values():
+            for key, value in model.stats().items():
+                if not key.startswith("rate_limit_"):
+                    totals[key] = totals.get(key, 0) + value
+            limiter = getattr(model, "limiter", None)
+            if limiter is not None:
+                limiters[id(limiter)] = limiter
+        totals["rate_limit_waits"] = sum(limiter.waits for limiter in limiters.values())
+        totals["rate_limit_wait_seconds"] = sum(limiter.wait_seconds for limiter in limiters.values())
+        with self._lock:
+            self._over_budget(time.time())
+            totals["fallbacks"] = self.fallbacks
+            totals["spend_last_hour_usd"] = sum(cost for _, cost in self._spend)
+        totals["hourly_budget_usd"] = self.hourly_budget
+        return totals
+
+
+class _Route:
+    """One task's view of the router; answered_by names the model that produced the last response."""
+
+    def __init__(self, router, task):
+        self.router = router
+        self.task = task
+        self.model = router.model
+        self.answered_by = None
+
+    def _attempts(self):
+        names = self.router.candidates(self.task)
+        for i, name in enumerate(names):
+            if i:
+                with self.router._lock:
+                    self.router.fallbacks += 1
+            yield name, self.router.models[name], i == len(names) - 1
+
+    def _done(self, name, began, prompt, response):
+        self.answered_by = name
+        self.router.record(name, self.task, time.perf_counter() - began, True,
+                           count_tokens(str(prompt)) + count_tokens(response))
+
+    def invoke(self, prompt, **kwargs):
+        for name, model, last in self._attempts():
+            began = time.perf_counter()
+            future = self.router._executor.submit(model.invoke, prompt, **kwargs)
+            try:
+                message = future.result(timeout=self.router.timeout)
+            except FutureTimeout:
+                # Drops the call if it has not started; a running one ends at the client's own timeout
+                future.cancel()
+                self.router.record(name, self.task, 0.0, False, timed_out=True)
+                if last:
+                    raise TimeoutError(f"{name} did not answer within {self.router.timeout:g} s") from None
+                continue
+            except Exception:
+                self.router.record(name, self.task, 0.0, False)
+                if last:
+                    raise
+                continue
+            self._done(name, began, prompt, getattr(message, "content", str(message)))
+            return message
+
+    async def ainvoke(self, prompt, **kwargs):
+        for name, model, last in self._attempts():
+            began = time.perf_counter()
+            try:
+                message = await asyncio.wait_for(model.ainvoke(prompt, **kwargs), self.router.timeout)
+            except asyncio.TimeoutError:
+                self.router.record(name, self.task, 0.0, False, timed_out=True)
+                if last:
+                    raise TimeoutError(f"{name} did not answer within {self.router.timeout:g} s") from None
+                continue
+            except Exception:
+                self.router.record(name, self.task, 0.0, False)
+                if last:
+                    raise
+                continue
+            self._done(name, began, prompt, getattr(message, "content", str(message)))
+            return message
+
+    def stream(self, prompt, **kwargs):
+        for name, model, last in self._attempts():
+            began = time.perf_counter()
+            chunks = queue.Queue()
+            # Set once nobody reads the chunks any more (timeout, fallback, or the caller stopped)
+            abandoned = threading.Event()
+
+            def pump(model=model, chunks=chunks, abandoned=abandoned):
+                stream = model.stream(prompt, **kwargs)
+                try:
+                    for chunk in stream:
+                        if abandoned.is_set():
+                            return
+                        chunks.put((True, chunk))
+                    chunks.put((True, None))
+                except Exception as exc:
+                    chunks.put((False, exc))
+                finally:
+                    # Closing the generator closes the client's stream, which stops the download
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+
+            threading.Thread(target=pump, name="llm-stream", daemon=True).start()
+            parts = []
+            try:
+                while True:
+                    try:
+                        ok, item = chunks.get(timeout=self.router.timeout)
+                    except queue.Empty:
+                        self.router.record(name, self.task, 0.0, False, timed_out=True)
+                        if parts or last:
+                            raise TimeoutError(f"{name} stopped streaming for {self.router.timeout:g} s") from None
+                        break
+                    if not ok:
+                        self.router.record(name, self.task, 0.0, False)
+                        if parts or last:
+                            raise item
+                        break
+                    if item is None:
+                        self._done(name, began, prompt, "".join(parts))
+                        return
+                    parts.append(getattr(item, "content", str(item)))
+                    yield item
+            finally:
+                abandoned.set()
@@ -1,115 +1,64 @@
 # ----------- IMPORTS -----------
 # Importing necessary libraries
 import streamlit as st                    # Streamlit for building web apps
-import sqlite3                            # SQLite for database operations
-import hashlib                            # Hashlib for password hashing (security)
 import os                                 # OS module for interacting with the file system
 import random                             # Random module for generating random numbers (e.g., OTPs)
-from PIL import Image                     # PIL (Pillow) for image handling and processing
 import re                                 # Regular expressions for pattern matching (e.g., email/phone validation)
-from streamlit_oauth import OAuth2Component
 from utils import *
+from app import db                        # Pooled data-access layer
+from app import images                    # Profile picture thumbnails
+from app import outbox                    # Background OTP email delivery
+from app.session import get_session       # Typed per-session state
 import random, time
 
-# ----------- CONSTANTS -----------
-PROFILE_PICTURE_PATH = './profile_pictures/'  # Directory to store profile images
 # ----------- DATABASE SETUP -----------
+# All queries go through the pooled data-access layer in app/db.py
 def create_users_table():
-    """Creates the users table if it doesn't already exist."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    username TEXT, 
-                    email TEXT PRIMARY KEY,  
-                    phone TEXT, 
-                    password TEXT, 
-                    profile_picture TEXT)''')
-    conn.commit()
-    conn.close()
-
-def add_user(username, password, email, phone):
+    """Creates or upgrades the database schema."""
+    db.init_db()
+
+def add_user(username, password, email, phone, password_hash=None):
     """Registers a new user with hashed password."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    c.execute("INSERT INTO users (username, password, email, phone, profile_picture) VALUES (?, ?, ?, ?, ?)", 
-              (username, hashed_password, email, phone, None))
-    conn.commit()
-    conn.close()
+    db.add_user(username, password, email, phone, password_hash)
 
 def validate_user(email, password):
     """Validates user credentials against stored hashed password."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    c.execute("SELECT username, email, phone, profile_picture FROM users WHERE email=? AND password=?", 
-              (email, hashed_password))
-    result = c.fetchone()
-    conn.close()
-    return result
+    return db.validate_user(email, password)
 
 def email_exists(email):
     """Checks if an email is already registered."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute("SELECT email FROM users WHERE email=?", (email,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
+    return db.email_exists(email)
 
 def update_password(new_password):
     """Updates the password for the logged-in user."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(new_password.encode()).hexdigest()
-    c.execute("UPDATE users SET password=? WHERE email=?", 
-              (hashed_password, st.session_state.email))
-    conn.commit()
-    conn.close()
+    db.update_password(get_session().email, new_password)
 
 def update_phone(new_phone):
     """Updates the phone number for the logged-in user."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute("UPDATE users SET phone=? WHERE email=?", (new_phone, st.session_state.email))
-    conn.commit()
-    conn.close()
-    st.session_state.phone = new_phone  # Update session state too
+    session = get_session()
+    db.update_phone(session.email, new_phone)
+    session.phone = new_phone  # Update session state too
 
 # ----------- PROFILE PICTURE -----------
-if not os.path.exists(PROFILE_PICTURE_PATH):
-    os.makedirs(PROFILE_PICTURE_PATH)  # Ensure directory exists
-
 def upload_profile_picture(email):
     """Handles uploading and saving profile pictures."""
     uploaded_file = st.file_uploader("Upload Profile Picture", type=["jpg", "jpeg", "png"])
     if uploaded_file is not None:
-        img = Image.open(uploaded_file)
-        img_path = os.path.join(PROFILE_PICTURE_PATH, f"{email}.jpg")
-        img.save(img_path)
+        # Decode once, cap the size and store thumbnails named by the image's content hash
+        try:
+            image_id = images.process_image(uploaded_file.getvalue())
+        except Exception:
+            st.error("❌ Could not read that image.")
+            return None
 
-        # Save the image path in the database
-        conn = sqlite3.connect("resume_bot.db")
-        c = conn.cursor()
-        c.execute("UPDATE users SET profile_picture=? WHERE email=?", (img_path, email))
-        conn.commit()
-        conn.close()
+        # Save the image id in the database
+        db.set_profile_picture(email, image_id)
 
         # Also update session state
-        st.session_state.profile_picture = img_path
+        get_session().profile_image = image_id
 
         st.success("✅ Profile picture uploaded and saved!")
-        return img_path
-    return None
-
-    """Handles uploading and saving profile pictures."""
-    uploaded_file = st.file_uploader("Upload Profile Picture", type=["jpg", "jpeg", "png"])
-    if uploaded_file is not None:
-        img = Image.open(uploaded_file)
-        img_path = os.path.join(PROFILE_PICTURE_PATH, f"{email}.jpg")
-        img.save(img_path)
-        st.success("Profile picture uploaded!")
-        return img_path
+        return image_id
     return None
 
 # ----------- UI PAGES -----------
@@ -126,36 +75,36 @@ def sidebar_navigation():
 
 def show_dashboard():
     """Displays user dashboard with profile info and logout."""
+    session = get_session()
     st.title("📊 Dashboard")
-    st.success(f"Welcome, {st.session_state.username}!")
+    st.success(f"Welcome, {session.username}!")
 
     # Display profile picture
-    img_path = os.path.join(PROFILE_PICTURE_PATH, f"{st.session_state.email}.jpg")
-    if os.path.exists(img_path):
-        st.image(img_path, width=150, caption="Profile Picture")
+    if session.profile_image:
+        st.image(images.image_src(session.profile_image, "profile"), caption="Profile Picture")
     else:
         st.info("No profile picture uploaded yet.")
 
     # Show email and phone
-    st.markdown(f"""**Email:** {st.session_state.email}  
-**Phone:** {st.session_state.phone}""")
+    st.markdown(f"""**Email:** {session.email}  
+**Phone:** {session.phone}""")
 
     # Logout button
     if st.button("🔒 Logout"):
-        for key in ["logged_in", "username", "email", "phone"]:
-            st.session_state.pop(key, None)
+        st.session_state.clear()
         st.success("Logged out.")
         st.rerun()
 
-    upload_profile_picture(st.session_state.email)
+    upload_profile_picture(session.email)
 
 def show_profile():
     """Displays user profile information."""
+    session = get_session()
     st.title("👤 Profile")
-    st.markdown(f"**Username:** {st.session_state.username}")
-    st.markdown(f"**Email:** {st.session_state.email}")
-    st.markdown(f"**Phone:** {st.session_state.phone}")
-    upload_profile_picture(st.session_state.email)
+    st.markdown(f"**Username:** {session.username}")
+    st.markdown(f"**Email:** {session.email}")
+    st.markdown(f"**Phone:** {session.phone}")
+    upload_profile_picture(session.email)
 
 def show_settings():
     """Allows user to update password and phone number."""
@@ -185,6 +134,7 @@ def show_settings():
 # ----------- LOGIN & REGISTER UI -----------
 def login():
     create_users_table()
+    session = get_session()
 
     # Stylish Animated UI
     st.markdown("""
@@ -236,11 +186,11 @@ def login():
             if submitted:
                 result = validate_user(email, password)
                 if result:
-                    st.session_state.logged_in = True
-                    st.session_state.username = result[0]
-                    st.session_state.email = result[1]
-                    st.session_state.phone = result[2]
-                    st.session_state.profile_picture = result[3]
+                    session.logged_in = True
+                    session.username = result[0]
+                    session.email = result[1]
+                    session.phone = result[2]
+                    session.profile_image = images.from_stored(result[3])
                     st.success("✅ Login successful!")
                     st.rerun()
                 else:
@@ -275,23 +225,27 @@ def login():
                     st.error("❌ Email already exists.")
                 else:
                     otp = str(random.randint(100000, 999999))
-                    st.session_state.generated_otp = otp
-                    st.session_state.temp_user = (username, password1, email, phone)
-                    otp_placeholder.success(f"✅ OTP Sent: {otp} (Simulated)")
-
-        if "generated_otp" in st.session_state:
+                    session.generated_otp = otp
+                    # Only the hash is kept while the OTP is pending, never the plaintext password
+                    session.pending_user = (username, db.hash_password(password1), email, phone)
+                    if outbox.enabled():
+                        send_otp_email(email, otp)  # Queued; delivered in the background
+                        otp_placeholder.success(f"✅ OTP sent to {email}")
+                    else:
+                        otp_placeholder.success(f"✅ OTP Sent: {otp} (Simulated)")
+
+        if session.generated_otp:
             user_otp = st.text_input("📨 Enter OTP sent to your email (Simulated)")
             if st.button("Verify & Register"):
-                if user_otp == st.session_state.generated_otp:
-                    u, p, e, ph = st.session_state.temp_user
-                    add_user(u, p, e, ph)
+                if user_otp == session.generated_otp:
+                    u, password_hash, e, ph = session.pending_user
+                    add_user(u, None, e, ph, password_hash)
                     st.success("✅ Registered! Please login.")
-                    for k in ["generated_otp", "temp_user"]:
-                        st.session_state.pop(k, None)
+                    session.generated_otp = session.pending_user = None
 
 # ----------- MAIN -----------
 if __name__ == "__main__":
-    if "logged_in" in st.session_state and st.session_state.logged_in:
+    if get_session().logged_in:
         sidebar_navigation()
     else:
         login()
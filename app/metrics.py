@@ -0,0 +1,257 @@
+import functools                                # Decorator form of span()
+import math                                     # Infinite upper bucket
+import os                                       # Export settings from environment variables
+import re                                       # Metric name sanitizing
+import tempfile                                 # Atomic export file writes
+import threading                                # Metrics are shared by every session in the process
+import time                                     # Span timing and the export loop
+from contextlib import contextmanager
+
+# ----------- CONSTANTS -----------
+PREFIX = "resumebot"
+# Histogram upper bounds: seconds for stage timings, tokens for prompt/response sizes
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+# Prometheus text file written in the background when set (e.g. for node_exporter's textfile collector)
+METRICS_FILE = os.getenv("RESUMEBOT_METRICS_FILE")
+EXPORT_INTERVAL = float(os.getenv("RESUMEBOT_METRICS_INTERVAL", 15))
+
+HELP = {
+    "stage_seconds": "Time spent in each instrumented stage (PDF extraction, LLM calls, DB helpers, pages).",
+    "llm_ttft_seconds": "Time to the first streamed token of an LLM call.",
+    "llm_prompt_tokens": "Prompt tokens per LLM call.",
+    "llm_response_tokens": "Response tokens per LLM call.",
+    "llm_tokens_total": "Prompt and response tokens sent to and received from the model.",
+    "outbox_delivery_seconds": "Time from queueing an email to the SMTP server accepting it.",
+    "outbox_messages_total": "Outbox delivery attempts by outcome (sent, retry, failed, expired).",
+    "jobs_persist_errors_total": "Finished background jobs that could not be saved to the database.",
+}
+
+_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+class Histogram:
+    """Fixed-bucket histogram with sum, count and max, safe to update from any thread."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.bounds = tuple(buckets) + (math.inf,)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = next(i for i, bound in enumerate(self.bounds) if value <= bound)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            self.max = max(self.max, value)
+
+    def snapshot(self):
+        """Returns a consistent copy of the bucket counts, sum, count and max."""
+        with self._lock:
+            return {"bounds": self.bounds, "counts": list(self.counts), "sum": self.sum,
+                    "count": self.count, "max": self.max}
+
+    def quantile(self, q):
+        """Estimates a quantile by linear interpolation inside the bucket that contains it."""
+        snap = self.snapshot()
+        if not snap["count"]:
+            return None
+        rank = q * snap["count"]
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(snap["bounds"], snap["counts"]):
+            if count and seen + count >= rank:
+                upper = min(bound, snap["max"])
+                return lower + (upper - lower) * max(0.0, rank - seen) / count
+            seen += count
+            lower = bound
+        return snap["max"]
+
+
+# ----------- REGISTRY -----------
+_histograms = {}        # (name, labels) -> Histogram
+_counters = {}          # (name, labels) -> number
+_collectors = {}        # (name, labels) -> zero-argument function returning a dict of numbers
+_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name, value, buckets=STAGE_BUCKETS, **labels):
+    """Adds a value to the histogram with the given name and labels, creating it on first use."""
+    key = _key(name, labels)
+    histogram = _histograms.get(key)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(key, Histogram(buckets))
+    histogram.observe(value)
+
+
+def inc(name, amount=1, **labels):
+    """Adds to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+@contextmanager
+def span(stage):
+    """Times the enclosed block into the stage_seconds histogram, also when it raises."""
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("stage_seconds", time.perf_counter() - began, stage=stage)
+
+
+def timed(stage):
+    """Decorator that runs a function inside span(stage)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def register_collector(name, fn, **labels):
+    """Exports the numeric values of fn() (e.g. a cache's stats()) as gauges named <name>_<key>."""
+    with _lock:
+        _collectors[_key(name, labels)] = fn
+
+
+def histograms(name=None):
+    """Returns {(name, labels): Histogram}, optionally for one metric name only."""
+    with _lock:
+        return {key: h for key, h in _histograms.items() if name is None or key[0] == name}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def collect():
+    """Calls every registered collector; returns {(name, labels): {key: number}}."""
+    with _lock:
+        collectors = dict(_collectors)
+    results = {}
+    for key, fn in collectors.items():
+        try:
+            values = fn()
+        except Exception:
+            continue
+        results[key] = {k: float(v) for k, v in values.items() if isinstance(v, (int, float))}
+    return results
+
+
+def reset():
+    """Forgets every histogram and counter (collectors stay registered)."""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# ----------- PROMETHEUS EXPORT -----------
+def _metric_name(name):
+    return f"{PREFIX}_{_NAME_CHARS.sub('_', name)}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text():
+    """Renders every histogram, counter and collector in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        hist_items = sorted(_histograms.items())
+        counter_items = sorted(_counters.items())
+
+    typed = set()
+    for (name, labels), histogram in hist_items:
+        metric = _metric_name(name)
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} histogram")
+        snap = histogram.snapshot()
+        cumulative = 0
+        for bound, count in zip(snap["bounds"], snap["counts"]):
+            cumulative += count
+            lines.append(f"{metric}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+        lines.append(f"{metric}_sum{_labels(labels)} {_number(snap['sum'])}")
+        lines.append(f"{metric}_count{_labels(labels)} {snap['count']}")
+
+    for (name, labels), value in counter_items:
+        metric = _metric_name(name)
+        if metric not in typed:
+            typed.add(metric)
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+
+    # Collector values become gauges; series of one metric must be listed together
+    gauges = {}
+    for (name, labels), values in sorted(collect().items()):
+        for key, value in values.items():
+            gauges.setdefault(_metric_name(f"{name}_{key}"), []).append((labels, value))
+    for metric, series in sorted(gauges.items()):
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(f"{metric}{_labels(labels)} {_number(value)}" for labels, value in series)
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path=METRICS_FILE):
+    """Writes the metrics to a file atomically, so scrapers never read a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".prom")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+_exporter = None
+
+
+def start_exporter(path=METRICS_FILE, interval=EXPORT_INTERVAL):
+    """Starts a daemon thread that rewrites the export file every interval seconds (once per process)."""
+    global _exporter
+    if not path:
+        return None
+    with _lock:
+        if _exporter is not None:
+            return _exporter
+
+        def run():
+            while True:
+                try:
+                    write_textfile(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+
+        _exporter = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+        _exporter.start()
+        return _exporter
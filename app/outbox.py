@@ -0,0 +1,396 @@
+import logging                                   # Sender errors
+import os                                        # SMTP and outbox settings from environment variables
+import random                                    # Retry backoff jitter
+import smtplib                                   # Outgoing mail
+import threading                                 # Background sender threads
+import time                                      # Retry schedule, idle connections, delivery latency
+from dataclasses import dataclass
+from email.message import EmailMessage
+from app import db                               # Messages are persisted in the outbox table
+from app import metrics                          # Delivery latency and queue depth in the performance panel
+
+# ----------- CONSTANTS -----------
+# Sender threads, each holding one SMTP connection open across batches
+SENDERS = int(os.getenv("RESUMEBOT_OUTBOX_SENDERS", 2))
+# Messages claimed and sent over one connection per round
+BATCH_SIZE = int(os.getenv("RESUMEBOT_OUTBOX_BATCH", 20))
+# Delivery attempts before a message is marked failed; retries back off exponentially with jitter
+MAX_ATTEMPTS = int(os.getenv("RESUMEBOT_OUTBOX_MAX_ATTEMPTS", 6))
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 300.0
+# Seconds between checks for retries that became due (new messages wake the senders at once)
+POLL_INTERVAL = 1.0
+# An SMTP connection unused for this long is closed; the next batch opens a new one
+IDLE_SECONDS = float(os.getenv("RESUMEBOT_SMTP_IDLE_SECONDS", 30))
+# Messages left "sending" this long (e.g. by a crashed process or a failed status write) are queued again.
+# Senders renew their claims while working through a batch, so a slow server does not make them stale.
+STALE_SECONDS = 300
+CLAIM_RENEW_SECONDS = STALE_SECONDS / 4
+# Days sent and failed messages are kept (without their bodies) for the delivery statistics
+RETENTION_DAYS = float(os.getenv("RESUMEBOT_OUTBOX_RETENTION_DAYS", 7))
+# Seconds between re-queueing stale claims and deleting expired messages
+MAINTENANCE_INTERVAL = 60
+
+# OTP mail that cannot be delivered within this many seconds is given up on, since the code has expired
+OTP_TTL_SECONDS = 300
+OTP_SUBJECT = "Your OTP for ResumeBot"
+OTP_BODY = "Your OTP is: {otp}\nIt expires in {minutes} minutes."
+EXPIRED_ERROR = "expired before delivery"
+
+SQL_ENQUEUE = ("INSERT INTO outbox (recipient, subject, body, status, attempts, next_attempt_at, created_at, expires_at) "
+               "VALUES (?, ?, ?, 'queued', 0, ?, ?, ?)")
+SQL_CLAIM = ("UPDATE outbox SET status='sending', claimed_at=?1 WHERE id IN "
+             "(SELECT id FROM outbox WHERE status='queued' AND next_attempt_at<=?1 AND (expires_at IS NULL OR expires_at>?1) "
+             "ORDER BY next_attempt_at, id LIMIT ?2) "
+             "RETURNING id, recipient, subject, body, attempts, created_at, expires_at")
+SQL_RENEW_CLAIM = "UPDATE outbox SET claimed_at=? WHERE id=? AND status='sending'"
+# Bodies hold one-time passwords, so they are dropped as soon as a message is sent or given up on
+SQL_SENT = "UPDATE outbox SET status='sent', attempts=?, sent_at=?, last_error=NULL, body=NULL WHERE id=?"
+SQL_RESCHEDULE = ("UPDATE outbox SET status=?1, attempts=?2, next_attempt_at=?3, last_error=?4, "
+                  "body=CASE WHEN ?1='failed' THEN NULL ELSE body END WHERE id=?5")
+SQL_REQUEUE_STALE = "UPDATE outbox SET status='queued' WHERE status='sending' AND claimed_at<?"
+SQL_EXPIRE = ("UPDATE outbox SET status='failed', body=NULL, last_error=? "
+              "WHERE status='queued' AND expires_at<=?")
+SQL_PURGE = "DELETE FROM outbox WHERE status IN ('sent', 'failed') AND created_at<?"
+SQL_COUNT_BY_STATUS = "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+SQL_OLDEST_QUEUED = "SELECT MIN(created_at) FROM outbox WHERE status='queued'"
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class SMTPSettings:
+    """Where and as whom to send mail; read from the environment when the outbox starts."""
+    host: str = "smtp.gmail.com"
+    port: int = 465
+    use_ssl: bool = True
+    starttls: bool = False
+    username: str = None
+    password: str = None
+    sender: str = None
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls):
+        sender = os.getenv("EMAIL_SENDER")
+        return cls(host=os.getenv("RESUMEBOT_SMTP_HOST", "smtp.gmail.com"),
+                   port=int(os.getenv("RESUMEBOT_SMTP_PORT", 465)),
+                   use_ssl=os.getenv("RESUMEBOT_SMTP_SSL", "1") != "0",
+                   starttls=os.getenv("RESUMEBOT_SMTP_STARTTLS", "0") == "1",
+                   username=os.getenv("RESUMEBOT_SMTP_USER", sender),
+                   password=os.getenv("EMAIL_PASSWORD"),
+                   sender=sender)
+
+    @property
+    def configured(self):
+        return bool(self.sender)
+
+
+def enabled():
+    """True when a sender address is configured, so OTPs are emailed rather than shown on screen."""
+    return SMTPSettings.from_env().configured
+
+
+def retry_delay(attempts, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Exponential backoff with jitter after the given number of failed attempts."""
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+def is_permanent(exc):
+    """True for errors a retry cannot fix: 5xx replies other than a failed login."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return False  # Usually a configuration problem; keep the mail until it is fixed
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+class SMTPConnection:
+    """One SMTP session (TLS handshake and login done once) reused for many messages."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._smtp = None
+        self.last_used = 0.0
+        self.connects = 0
+
+    def _connect(self):
+        s = self.settings
+        with metrics.span("smtp.connect"):
+            smtp = (smtplib.SMTP_SSL if s.use_ssl else smtplib.SMTP)(s.host, s.port, timeout=s.timeout)
+            try:
+                if s.starttls:
+                    smtp.starttls()
+                if s.username and s.password:
+                    smtp.login(s.username, s.password)
+            except Exception:
+                smtp.close()
+                raise
+        self._smtp = smtp
+        self.connects += 1
+
+    def send(self, message):
+        """Sends one message, reconnecting once if the server closed the idle connection."""
+        for attempt in range(2):
+            if self._smtp is None:
+                self._connect()
+            try:
+                self._smtp.send_message(message)
+                self.last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                if attempt:
+                    raise
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                raise  # The server refused this message; the session itself is still usable
+            except (OSError, smtplib.SMTPException):
+                self.close()  # The session is in an unknown state; start the next message on a new one
+                raise
+
+    def close_if_idle(self, idle_seconds=IDLE_SECONDS):
+        if self._smtp is not None and time.monotonic() - self.last_used > idle_seconds:
+            self.close()
+
+    def close(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (OSError, smtplib.SMTPException):
+            smtp.close()
+
+    @property
+    def connected(self):
+        return self._smtp is not None
+
+
+class Outbox:
+    """Persistent email queue delivered by background threads over reused SMTP connections.
+
+    enqueue() only inserts a row, so pages never wait on the mail server. Sender
+    threads claim due messages in batches, send each batch over a connection they
+    keep open, and reschedule failures with exponential backoff until MAX_ATTEMPTS.
+    Queued mail survives restarts and is picked up when the outbox starts again.
+    """
+
+    def __init__(self, settings=None, senders=SENDERS, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS,
+                 retry_base=RETRY_BASE_DELAY, poll_interval=POLL_INTERVAL, idle_seconds=IDLE_SECONDS,
+                 retention_days=RETENTION_DAYS):
+        self.settings = settings or SMTPSettings.from_env()
+        self.senders = max(1, senders)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self.idle_seconds = idle_seconds
+        self.retention_days = retention_days
+        self._maintained_at = 0.0
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._connections = []
+        self.batches = 0
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self.errors = 0
+
+    # ----------- QUEUEING -----------
+    def enqueue(self, recipient, subject, body, ttl=None):
+        """Stores a message for delivery and wakes a sender; returns the message id.
+
+        A message with a ttl that is still undelivered after ttl seconds is marked failed.
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with db.connection() as conn:
+            message_id = conn.execute(SQL_ENQUEUE, (recipient, subject, body, now, now, expires_at)).lastrowid
+        self._wake.set()
+        return message_id
+
+    def send_otp(self, recipient, otp):
+        body = OTP_BODY.format(otp=otp, minutes=round(OTP_TTL_SECONDS / 60))
+        return self.enqueue(recipient, OTP_SUBJECT, body, ttl=OTP_TTL_SECONDS)
+
+    # ----------- SENDER THREADS -----------
+    def start(self):
+        """Starts the sender threads (once), first re-queueing mail a crashed process left claimed."""
+        with self._lock:
+            if self._threads:
+                return self
+            self._maintain()
+            for i in range(self.senders):
+                thread = threading.Thread(target=self._run, name=f"outbox-{i}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stops the sender threads after their current batch and closes their connections."""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        connection = SMTPConnection(self.settings)
+        with self._lock:
+            self._connections.append(connection)
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if time.time() - self._maintained_at > MAINTENANCE_INTERVAL:
+                        self._maintain()
+                    batch = self._claim()
+                    if batch:
+                        self._deliver(connection, batch)
+                        continue
+                    connection.close_if_idle(self.idle_seconds)
+                except Exception:
+                    # E.g. "database is locked" while recording a batch: its messages stay claimed
+                    # until they go stale and are queued again, and this thread keeps sending
+                    log.warning("outbox sender %s failed", threading.current_thread().name, exc_info=True)
+                    with self._lock:
+                        self.errors += 1
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            connection.close()
+
+    def _maintain(self):
+        """Re-queues mail left claimed too long, fails expired mail and deletes mail past the retention period."""
+        now = time.time()
+        self._maintained_at = now
+        with db.connection() as conn:
+            conn.execute(SQL_REQUEUE_STALE, (now - STALE_SECONDS,))
+            expired = conn.execute(SQL_EXPIRE, (EXPIRED_ERROR, now)).rowcount
+            conn.execute(SQL_PURGE, (now - self.retention_days * 86400,))
+        if expired:
+            metrics.inc("outbox_messages_total", expired, outcome="expired")
+            with self._lock:
+                self.failed += expired
+
+    def _claim(self):
+        now = time.time()
+        try:
+            with db.connection() as conn:
+                return conn.execute(SQL_CLAIM, (now, self.batch_size)).fetchall()
+        except Exception:
+            return []  # Database busy or unavailable; try again on the next round
+
+    def _message(self, recipient, subject, body):
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self.settings.sender
+        message["To"] = recipient
+        message.set_content(body)
+        return message
+
+    def _renew_claims(self, message_ids):
+        """Marks claimed messages as still being worked on, so they do not go stale mid-batch."""
+        now = time.time()
+        try:
+            with db.connection() as conn:
+                conn.executemany(SQL_RENEW_CLAIM, [(now, message_id) for message_id in message_ids])
+        except Exception:
+            log.warning("could not renew outbox claims", exc_info=True)
+
+    def _deliver(self, connection, batch):
+        sent, rescheduled = [], []
+        renewed = time.monotonic()
+        for position, (message_id, recipient, subject, body, attempts, created_at, expires_at) in enumerate(batch):
+            if time.monotonic() - renewed > CLAIM_RENEW_SECONDS:
+                self._renew_claims([row[0] for row in batch[position:]])
+                renewed = time.monotonic()
+            if expires_at is not None and time.time() >= expires_at:
+                rescheduled.append(("failed", attempts, None, EXPIRED_ERROR, message_id))
+                metrics.inc("outbox_messages_total", outcome="expired")
+                continue
+            attempts += 1
+            try:
+                connection.send(self._message(recipient, subject, body))
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                retry_at = time.time() + retry_delay(attempts, self.retry_base)
+                if attempts >= self.max_attempts or is_permanent(exc):
+                    rescheduled.append(("failed", attempts, None, error, message_id))
+                    metrics.inc("outbox_messages_total", outcome="failed")
+                elif expires_at is not None and retry_at >= expires_at:
+                    rescheduled.append(("failed", attempts, None, f"{error} ({EXPIRED_ERROR})", message_id))
+                    metrics.inc("outbox_messages_total", outcome="expired")
+                else:
+                    rescheduled.append(("queued", attempts, retry_at, error, message_id))
+                    metrics.inc("outbox_messages_total", outcome="retry")
+                continue
+            now = time.time()
+            sent.append((attempts, now, message_id))
+            metrics.observe("outbox_delivery_seconds", now - created_at)
+            metrics.inc("outbox_messages_total", outcome="sent")
+        with db.connection() as conn:
+            conn.executemany(SQL_SENT, sent)
+            conn.executemany(SQL_RESCHEDULE, rescheduled)
+        with self._lock:
+            self.batches += 1
+            self.sent += len(sent)
+            self.retries += sum(row[0] == "queued" for row in rescheduled)
+            self.failed += sum(row[0] == "failed" for row in rescheduled)
+
+    # ----------- MONITORING -----------
+    def depth(self):
+        """Returns {status: message count} for the whole outbox table."""
+        with db.connection() as conn:
+            return dict(conn.execute(SQL_COUNT_BY_STATUS).fetchall())
+
+    def wait_until_empty(self, timeout=30):
+        """Blocks until nothing is queued or being sent (retries included); True if that happened in time."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            depth = self.depth()
+            if not depth.get("queued") and not depth.get("sending"):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def stats(self):
+        """Queue depth by status, age of the oldest queued message and sender counters."""
+        depth = self.depth()
+        with db.connection() as conn:
+            oldest = conn.execute(SQL_OLDEST_QUEUED).fetchone()[0]
+        with self._lock:
+            return {
+                "queued": depth.get("queued", 0),
+                "sending": depth.get("sending", 0),
+                "sent_total": depth.get("sent", 0),
+                "failed_total": depth.get("failed", 0),
+                "oldest_queued_seconds": time.time() - oldest if oldest else 0.0,
+                "batches": self.batches,
+                "sent": self.sent,
+                "retries": self.retries,
+                "failed": self.failed,
+                "errors": self.errors,
+                "connections_opened": sum(c.connects for c in self._connections),
+                "connections_open": sum(c.connected for c in self._connections),
+            }
+
+
+# ----------- SHARED INSTANCE -----------
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox():
+    """Returns the process-wide outbox, starting its sender threads on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox().start()
+            metrics.register_collector("outbox", _outbox.stats)
+        return _outbox
+
+
+def start():
+    """Starts delivering queued mail at app startup, if a sender is configured (once per process)."""
+    return get_outbox() if enabled() else None
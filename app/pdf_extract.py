@@ -0,0 +1,133 @@
+import io                                        # Wrap raw bytes for the PDF reader
+import os                                        # CPU count and environment variables
+import threading                                 # Guard creation of the shared process pool
+import time                                      # Wall-clock budget and per-page timings
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+
+# ----------- CONSTANTS -----------
+# Stop after this many pages (resumes are short; portfolios can be huge)
+MAX_PAGES = int(os.getenv("RESUMEBOT_PDF_MAX_PAGES", 50))
+# Stop after this many seconds of wall-clock time and return what we have
+TIME_BUDGET_SECONDS = float(os.getenv("RESUMEBOT_PDF_TIME_BUDGET", 10))
+# Number of worker processes used for page extraction
+WORKERS = int(os.getenv("RESUMEBOT_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+# Documents with fewer pages than this are extracted inline; the pool is not worth it
+PARALLEL_MIN_PAGES = int(os.getenv("RESUMEBOT_PDF_PARALLEL_MIN_PAGES", 8))
+# Number of pages handed to a worker in one task
+PAGES_PER_TASK = 4
+
+
+@dataclass
+class PageResult:
+    index: int          # Zero-based page number
+    text: str           # Extracted text ("" for image-only pages)
+    seconds: float      # Time spent extracting this page
+
+
+@dataclass
+class ExtractionResult:
+    pages: list = field(default_factory=list)   # PageResult objects in page order
+    total_pages: int = 0
+    elapsed: float = 0.0
+    stopped_reason: str = ""                     # "", "page_limit" or "time_budget"
+
+    @property
+    def text(self):
+        # Pages are separated by form feeds, so page boundaries survive in the cached text
+        return "\f".join(page.text for page in self.pages)
+
+    def summary(self):
+        """Returns a small dict suitable for display or storing in session state."""
+        return {
+            "pages_read": len(self.pages),
+            "total_pages": self.total_pages,
+            "elapsed": round(self.elapsed, 3),
+            "stopped_reason": self.stopped_reason,
+            "page_seconds": [round(page.seconds, 4) for page in self.pages],
+        }
+
+
+# ----------- WORKERS -----------
+def _extract_range(data, start, stop):
+    """Worker task: extracts pages [start, stop) and times each one."""
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    results = []
+    for index in range(start, stop):
+        began = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        results.append(PageResult(index, text, time.perf_counter() - began))
+    return results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Returns the shared process pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS)
+        return _pool
+
+
+# ----------- PUBLIC API -----------
+def iter_pages(data, max_pages=MAX_PAGES, time_budget=TIME_BUDGET_SECONDS, result=None):
+    """Yields PageResult objects in page order until the page or time budget runs out.
+
+    If an ExtractionResult is passed in, its total_pages and stopped_reason are filled in.
+    """
+    from pypdf import PdfReader
+    began = time.monotonic()
+    deadline = began + time_budget
+    reader = PdfReader(io.BytesIO(data))
+    total = len(reader.pages)
+    wanted = min(total, max_pages)
+    if result is not None:
+        result.total_pages = total
+        if wanted < total:
+            result.stopped_reason = "page_limit"
+
+    # Small documents: extract inline, one page at a time, checking the clock as we go
+    if wanted < PARALLEL_MIN_PAGES or WORKERS <= 1:
+        for index in range(wanted):
+            if time.monotonic() >= deadline:
+                if result is not None:
+                    result.stopped_reason = "time_budget"
+                return
+            page_began = time.perf_counter()
+            text = reader.pages[index].extract_text() or ""
+            yield PageResult(index, text, time.perf_counter() - page_began)
+        return
+
+    # Large documents: fan contiguous page ranges out to the pool and stream them back in order
+    pool = _get_pool()
+    futures = [pool.submit(_extract_range, data, start, min(start + PAGES_PER_TASK, wanted))
+               for start in range(0, wanted, PAGES_PER_TASK)]
+    try:
+        for future in futures:
+            remaining = deadline - time.monotonic()
+            try:
+                pages = future.result(timeout=max(remaining, 0))
+            except FutureTimeout:
+                if result is not None:
+                    result.stopped_reason = "time_budget"
+                return
+            yield from pages
+    finally:
+        # Drop queued work we no longer need; running tasks finish in the background
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf(data, max_pages=MAX_PAGES, time_budget=TIME_BUDGET_SECONDS):
+    """Extracts text from PDF bytes within the given budgets and returns an ExtractionResult."""
+    result = ExtractionResult()
+    began = time.monotonic()
+    for page in iter_pages(data, max_pages, time_budget, result):
+        result.pages.append(page)
+    result.elapsed = time.monotonic() - began
+    return result
@@ -0,0 +1,96 @@
+import os
+import streamlit as st
+from app import metrics
+from app.session import get_accountant
+
+# Comma-separated emails that see the hidden "Performance" page in the sidebar
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("RESUMEBOT_ADMIN_EMAILS", "").split(",") if e.strip()}
+
+
+def is_admin(email):
+    return bool(email) and email.lower() in ADMIN_EMAILS
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def stage_rows():
+    """One row per instrumented stage with call count and latency percentiles in milliseconds."""
+    rows = []
+    for (_, labels), histogram in sorted(metrics.histograms("stage_seconds").items()):
+        snap = histogram.snapshot()
+        rows.append({
+            "stage": dict(labels)["stage"],
+            "calls": snap["count"],
+            "total_s": round(snap["sum"], 3),
+            "mean_ms": _ms(snap["sum"] / snap["count"]) if snap["count"] else None,
+            "p50_ms": _ms(histogram.quantile(0.5)),
+            "p95_ms": _ms(histogram.quantile(0.95)),
+            "p99_ms": _ms(histogram.quantile(0.99)),
+            "max_ms": _ms(snap["max"]),
+        })
+    return rows
+
+
+def token_rows():
+    """Prompt/response token totals and per-call medians for each LLM task."""
+    totals = {}
+    for (name, labels), value in metrics.counters().items():
+        if name == "llm_tokens_total":
+            labels = dict(labels)
+            totals.setdefault(labels["task"], {})[f"{labels['kind']}_tokens"] = value
+    for (name, labels), histogram in metrics.histograms().items():
+        if name in ("llm_prompt_tokens", "llm_response_tokens"):
+            totals.setdefault(dict(labels)["task"], {})[f"{name[4:]}_p50"] = histogram.quantile(0.5)
+    return [{"task": task, **values} for task, values in sorted(totals.items())]
+
+
+@metrics.timed("page.performance")
+def performance():
+    st.header("📈 Performance")
+    st.caption("Timings and counters for this server process since it started.")
+
+    rows = stage_rows()
+    if rows:
+        st.subheader("⏱️ Stages")
+        st.dataframe(rows, hide_index=True)
+
+        # Latency distribution of one stage, straight from its histogram buckets
+        stage = st.selectbox("Stage histogram", [row["stage"] for row in rows])
+        histogram = metrics.histograms("stage_seconds")[("stage_seconds", (("stage", stage),))]
+        snap = histogram.snapshot()
+        labels = [f"≤{b * 1000:g} ms" if b != float("inf") else f">{snap['bounds'][-2] * 1000:g} ms"
+                  for b in snap["bounds"]]
+        st.bar_chart({"bucket": labels, "calls": snap["counts"]}, x="bucket", y="calls", sort=False)
+    else:
+        st.info("No timings recorded yet.")
+
+    tokens = token_rows()
+    if tokens:
+        st.subheader("🔤 LLM tokens")
+        st.dataframe(tokens, hide_index=True)
+
+    st.subheader("🧠 Session memory")
+    accountant = get_accountant()
+    stats = accountant.stats()
+    st.caption(f"{stats['sessions']} sessions holding {stats['total_bytes'] / 1024:.0f} KiB; "
+               f"blobs {stats['blob_bytes'] / 1024:.0f} of {stats['budget_bytes'] / 1024:.0f} KiB budget in memory.")
+    st.dataframe(accountant.report(), hide_index=True)
+
+    st.subheader("🧰 Pools, caches and queues")
+    for (name, labels), values in sorted(metrics.collect().items()):
+        title = name + "".join(f" ({v})" for _, v in labels)
+        with st.expander(title):
+            st.json(values)
+
+    st.subheader("📤 Export")
+    text = metrics.prometheus_text()
+    st.download_button("Download Prometheus metrics", text, file_name="resumebot.prom", mime="text/plain")
+    if metrics.METRICS_FILE:
+        st.caption(f"Also written every {metrics.EXPORT_INTERVAL:g} s to `{metrics.METRICS_FILE}`.")
+    else:
+        st.caption("Set RESUMEBOT_METRICS_FILE to have the metrics written to a file for scraping.")
+    if st.button("🧹 Reset timings"):
+        metrics.reset()
+        st.rerun()
@@ -0,0 +1,92 @@
+import os                                        # Active prompt versions from environment variables
+import string                                    # Template placeholder parsing
+import threading                                 # Registrations may come from any thread
+from dataclasses import dataclass, field
+from app.llm_cache import template_hash          # Same hash the response cache keys use
+
+# ----------- CONSTANTS -----------
+# Pin prompt versions, e.g. "feedback=1,questions=2"; unpinned prompts use their latest version
+PINNED_VERSIONS = {
+    name.strip(): int(version)
+    for name, _, version in (item.partition("=") for item in os.getenv("RESUMEBOT_PROMPT_VERSIONS", "").split(","))
+    if name.strip() and version.strip().isdigit()
+}
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A versioned prompt template, parsed and validated once when it is registered.
+
+    format() fills the placeholders with str.format semantics, the same output a
+    LangChain PromptTemplate produces, without building a template object per call.
+    """
+    name: str
+    version: int
+    template: str
+    variables: tuple = field(init=False)
+    hash: str = field(init=False)
+
+    def __post_init__(self):
+        names = []
+        for _, placeholder, _, _ in string.Formatter().parse(self.template):
+            if placeholder is None:
+                continue
+            if not placeholder.isidentifier():
+                raise ValueError(f"prompt {self.name} v{self.version}: unsupported placeholder {{{placeholder}}}")
+            if placeholder not in names:
+                names.append(placeholder)
+        object.__setattr__(self, "variables", tuple(names))
+        object.__setattr__(self, "hash", template_hash(self.template))
+
+    @property
+    def id(self):
+        return f"{self.name}@v{self.version}"
+
+    def format(self, **inputs):
+        """Returns the prompt text; raises KeyError naming any missing input."""
+        missing = [name for name in self.variables if name not in inputs]
+        if missing:
+            raise KeyError(f"prompt {self.id} is missing inputs: {', '.join(missing)}")
+        return self.template.format_map(inputs)
+
+
+# ----------- REGISTRY -----------
+_prompts = {}               # name -> {version: Prompt}
+_lock = threading.Lock()
+
+
+def register(name, version, template):
+    """Adds a prompt version; registering the same version with different text is an error."""
+    prompt = Prompt(name, version, template)
+    with _lock:
+        versions = _prompts.setdefault(name, {})
+        existing = versions.get(version)
+        if existing is not None and existing.template != template:
+            raise ValueError(f"prompt {prompt.id} is already registered with different text")
+        versions[version] = prompt
+    return prompt
+
+
+def get_prompt(name, version=None):
+    """Returns a registered prompt: the given version, else the pinned one, else the latest."""
+    with _lock:
+        versions = _prompts.get(name)
+        if not versions:
+            raise KeyError(f"no prompt named {name!r}")
+        version = version or PINNED_VERSIONS.get(name) or max(versions)
+        try:
+            return versions[version]
+        except KeyError:
+            raise KeyError(f"prompt {name!r} has no version {version}") from None
+
+
+# ----------- PROMPTS -----------
+# A changed prompt gets a new version rather than edited text, so cached responses and
+# logged results stay attributable to the exact text that produced them.
+register("questions", 1, "Based on the following resume, generate 10 relevant interview questions:\n{resume_text}")
+
+register("feedback", 1, """
+                    Question: {question}
+                    Candidate's Answer: {answer}
+                    Please provide professional feedback on relevance, clarity, and improvement.
+                    """)
@@ -0,0 +1,188 @@
+import hashlib                                   # SHA-256 digests of uploaded files
+import os                                        # Cache paths from environment variables
+import threading                                 # Sessions share one cache across threads
+import time                                      # Timestamps for the on-disk tier
+from collections import OrderedDict              # LRU ordering for the in-memory tier
+from app.db import get_pool                      # Pooled SQLite connections for the on-disk tier
+from app.pdf_extract import extract_pdf          # Budgeted, page-parallel PDF extraction
+from app import metrics                          # Cache counters in the performance panel
+
+# ----------- CONSTANTS -----------
+CACHE_DIR = os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache"))
+RESUME_CACHE_DB = os.path.join(CACHE_DIR, "resume_text.db")
+# Maximum number of bytes of extracted text kept in memory (default 32 MB)
+MEMORY_BUDGET_BYTES = int(os.getenv("RESUMEBOT_RESUME_CACHE_BYTES", 32 * 1024 * 1024))
+# Seconds text cut short by the time budget is reused before extraction is tried again
+PARTIAL_TTL = float(os.getenv("RESUMEBOT_PARTIAL_TEXT_TTL", 300))
+# Partial extractions kept at once (they are never written to disk)
+MAX_PARTIAL = 32
+
+RESUME_CACHE_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS resume_text (
+           digest TEXT PRIMARY KEY,
+           text TEXT,
+           size INTEGER,
+           created_at REAL,
+           last_used REAL)''',
+]
+
+
+def file_digest(data):
+    """Returns the SHA-256 hex digest used as the cache key for an uploaded file."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeTextCache:
+    """Two-tier (memory LRU + SQLite) cache of resume text keyed by file digest."""
+
+    def __init__(self, db_path=RESUME_CACHE_DB, memory_budget=MEMORY_BUDGET_BYTES):
+        self.db_path = db_path
+        self.memory_budget = memory_budget
+        self._memory = OrderedDict()   # digest -> text, most recently used last
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ----------- DISK TIER -----------
+    def _db(self):
+        """Returns the pooled connection source for the on-disk tier."""
+        return get_pool(self.db_path, migrations=RESUME_CACHE_MIGRATIONS)
+
+    def _disk_get(self, digest):
+        with self._db().connection() as conn:
+            row = conn.execute("SELECT text FROM resume_text WHERE digest=?", (digest,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE resume_text SET last_used=? WHERE digest=?", (time.time(), digest))
+        return row[0] if row else None
+
+    def _disk_put(self, digest, text, size):
+        now = time.time()
+        with self._db().connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO resume_text (digest, text, size, created_at, last_used) "
+                         "VALUES (?, ?, ?, ?, ?)", (digest, text, size, now, now))
+
+    # ----------- MEMORY TIER -----------
+    def _memory_put(self, digest, text, size):
+        if size > self.memory_budget:
+            return  # Never let a single huge document flush the whole tier
+        if digest in self._memory:
+            self._memory_bytes -= len(self._memory.pop(digest).encode("utf-8"))
+        self._memory[digest] = text
+        self._memory_bytes += size
+        # Evict least recently used entries until we are back under budget
+        while self._memory_bytes > self.memory_budget:
+            _, old_text = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_text.encode("utf-8"))
+            self.evictions += 1
+
+    # ----------- PUBLIC API -----------
+    def get(self, digest):
+        """Returns cached text for a digest, or None if neither tier has it."""
+        with self._lock:
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+                self.memory_hits += 1
+                return self._memory[digest]
+            text = self._disk_get(digest)
+            if text is not None:
+                self.disk_hits += 1
+                self._memory_put(digest, text, len(text.encode("utf-8")))
+                return text
+            self.misses += 1
+            return None
+
+    def put(self, digest, text):
+        """Stores extracted text in both tiers."""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self._memory_put(digest, text, size)
+            self._disk_put(digest, text, size)
+
+    def get_or_extract(self, data):
+        """Returns text for the given PDF bytes, extracting it only on a cache miss.
+
+        Text cut short by the time budget is returned but not cached, so a later call tries again.
+        """
+        digest = file_digest(data)
+        text = self.get(digest)
+        if text is None:
+            extraction = extract_pdf(data)
+            text = extraction.text
+            if extraction.stopped_reason != "time_budget":
+                self.put(digest, text)
+        return text
+
+    def stats(self):
+        """Returns hit/miss counters and current memory usage."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget": self.memory_budget,
+            }
+
+
+# ----------- SHARED INSTANCE -----------
+# Streamlit re-executes main.py on every rerun but keeps imported modules,
+# so a module-level cache is shared by every session in the process.
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache():
+    """Returns the process-wide resume text cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResumeTextCache()
+            metrics.register_collector("resume_cache", _cache.stats)
+        return _cache
+
+
+_partial = OrderedDict()           # digest -> (expires at, ExtractionResult cut short by the time budget)
+_partial_lock = threading.Lock()
+
+
+def load_pdf(data):
+    """Returns (text, extraction) for PDF bytes.
+
+    extraction is the ExtractionResult when the file was parsed and None on a cache hit.
+    Text cut short by the page limit is deterministic and is cached. Text cut short by
+    the time budget is kept in memory only, for PARTIAL_TTL seconds: reruns reuse it
+    (and its extraction, so the page shows the same warning) instead of spending the
+    whole budget again, and a later upload gets a fresh attempt.
+    """
+    cache = get_resume_cache()
+    digest = file_digest(data)
+    text = cache.get(digest)
+    if text is not None:
+        return text, None
+    now = time.monotonic()
+    with _partial_lock:
+        entry = _partial.get(digest)
+        if entry is not None and entry[0] > now:
+            return entry[1].text, entry[1]
+        _partial.pop(digest, None)
+    extraction = extract_pdf(data)
+    if extraction.stopped_reason != "time_budget":
+        cache.put(digest, extraction.text)
+    else:
+        with _partial_lock:
+            _partial[digest] = (time.monotonic() + PARTIAL_TTL, extraction)
+            while len(_partial) > MAX_PARTIAL:
+                _partial.popitem(last=False)
+    return extraction.text, extraction
+
+
+def load_resume(uploaded_file):
+    """Returns (text, extraction) for an uploaded PDF; see load_pdf()."""
+    return load_pdf(uploaded_file.getvalue())
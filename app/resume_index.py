@@ -0,0 +1,265 @@
+import hashlib                                   # Entry keys
+import os                                        # Index settings from environment variables
+import re                                        # Word shingles
+import threading                                 # Sessions share one index across threads
+import time                                      # LRU bookkeeping
+import unicodedata                               # Fold ligatures and full-width forms from PDFs
+import zlib                                      # Fast stable shingle hashes
+from dataclasses import dataclass
+from app.db import get_pool                      # Pooled SQLite connections
+from app import metrics                          # Index counters in the performance panel
+# NumPy is imported inside the methods that need it, so the login page does not load it
+
+# ----------- CONSTANTS -----------
+CACHE_DIR = os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache"))
+RESUME_INDEX_DB = os.path.join(CACHE_DIR, "resume_index.db")
+# Estimated Jaccard similarity of word shingles above which a prior question set is reused
+SIMILARITY_THRESHOLD = float(os.getenv("RESUMEBOT_SIMILAR_RESUME_THRESHOLD", 0.85))
+# Maximum number of indexed resumes; least recently used entries are evicted beyond it
+MAX_ENTRIES = int(os.getenv("RESUMEBOT_RESUME_INDEX_SIZE", 50000))
+
+# MinHash signature length, split into LSH bands of ROWS values each. A pair with similarity s
+# shares at least one band with probability 1 - (1 - s**ROWS)**BANDS: 0.92 at s=0.85 and
+# 0.98 at s=0.9, but only 0.03 at s=0.5, so few dissimilar resumes are ever compared.
+NUM_PERM = 64
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# Resumes with fewer words (e.g. scans with no text layer) are neither indexed nor matched:
+# their few shingles would make unrelated short texts look alike
+MIN_WORDS = 30
+_WORD = re.compile(r"\w+")
+
+RESUME_INDEX_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS resume_index (
+           key TEXT PRIMARY KEY,
+           model TEXT,
+           signature BLOB,
+           questions TEXT,
+           created_at REAL,
+           last_used REAL)''',
+    "CREATE INDEX IF NOT EXISTS idx_resume_index_last_used ON resume_index (last_used)",
+]
+
+
+@dataclass
+class SimilarResume:
+    """A prior upload close enough to reuse its questions."""
+    key: str
+    similarity: float
+    questions: str
+
+
+def words(text):
+    """Returns the lowercase words of resume text; spacing, punctuation and line breaks are ignored."""
+    return _WORD.findall(unicodedata.normalize("NFKC", text).lower())
+
+
+class ResumeIndex:
+    """MinHash/LSH index of resumes to the questions generated for them, persisted in SQLite.
+
+    Signatures live in one NumPy matrix and LSH band buckets in a dict, so a lookup
+    touches only the handful of resumes sharing a band with the query, regardless of
+    index size. Only signatures are kept in memory; question sets are read from disk
+    on a hit.
+    """
+
+    def __init__(self, db_path=RESUME_INDEX_DB, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        import numpy as np
+
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Fixed hash parameters, so signatures stored on disk stay comparable across restarts
+        rng = np.random.default_rng(20240601)
+        self._a = (rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1))[:, None]
+        self._b = rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)[:, None]
+        self._signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self._last_used = np.zeros(0)
+        self._keys = []                 # slot -> key (None for free slots)
+        self._models = []               # slot -> model name
+        self._slots = {}                # key -> slot
+        self._free = []
+        self._buckets = {}              # (band, band bytes) -> set of slots
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lookup_seconds = 0.0
+        self._load()
+
+    def _db(self):
+        return get_pool(self.db_path, migrations=RESUME_INDEX_MIGRATIONS)
+
+    # ----------- SIGNATURES -----------
+    def signature(self, text):
+        """Returns the MinHash signature (NUM_PERM uint32 values) of a resume's word shingles."""
+        import numpy as np
+
+        # Hash each word once, then combine SHINGLE_WORDS consecutive word hashes per shingle
+        hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words(text)), dtype=np.uint64)
+        if hashes.size >= SHINGLE_WORDS:
+            n = hashes.size - SHINGLE_WORDS + 1
+            combined = hashes[:n].copy()
+            for offset in range(1, SHINGLE_WORDS):
+                combined = (combined * np.uint64(1000003)) ^ hashes[offset:offset + n]
+            hashes = np.unique(combined & np.uint64(0xFFFFFFFF))
+        if not hashes.size:
+            return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+        # Multiply-shift hashing: (a * x + b) mod 2**64, keeping the high 32 bits
+        permuted = (self._a * hashes[None, :] + self._b) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def _bands(signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    # ----------- IN-MEMORY TABLES -----------
+    def _load(self):
+        import numpy as np
+
+        with self._db().connection() as conn:
+            # Trim the table too if max_entries was lowered since the last run
+            conn.execute("DELETE FROM resume_index WHERE key NOT IN "
+                         "(SELECT key FROM resume_index ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+            rows = conn.execute("SELECT key, model, signature, last_used FROM resume_index").fetchall()
+        for key, model, blob, last_used in rows:
+            self._insert_slot(key, model, np.frombuffer(blob, dtype=np.uint32), last_used)
+
+    def _insert_slot(self, key, model, signature, now):
+        import numpy as np
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._keys)
+            if slot >= len(self._signatures):
+                # Grow geometrically so incremental inserts stay amortized O(1)
+                capacity = max(64, 2 * len(self._signatures))
+                self._signatures = np.resize(self._signatures, (capacity, NUM_PERM))
+                self._last_used = np.resize(self._last_used, capacity)
+            self._keys.append(None)
+            self._models.append(None)
+        self._signatures[slot] = signature
+        self._last_used[slot] = now
+        self._keys[slot] = key
+        self._models[slot] = model
+        self._slots[key] = slot
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, set()).add(slot)
+        return slot
+
+    def _remove_slot(self, slot):
+        import numpy as np
+
+        for band in self._bands(self._signatures[slot]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._buckets[band]
+        del self._slots[self._keys[slot]]
+        self._keys[slot] = None
+        self._models[slot] = None
+        self._last_used[slot] = np.inf
+        self._free.append(slot)
+
+    def _evict_lru(self):
+        """Drops least recently used entries until the index is within max_entries."""
+        import numpy as np
+
+        evicted = []
+        while len(self._slots) > self.max_entries:
+            slot = int(np.argmin(self._last_used[:len(self._keys)]))
+            evicted.append(self._keys[slot])
+            self._remove_slot(slot)
+            self.evictions += 1
+        return evicted
+
+    # ----------- PUBLIC API -----------
+    def find(self, text, model):
+        """Returns the most similar indexed resume for this model at or above the threshold, else None."""
+        import numpy as np
+
+        if len(words(text)) < MIN_WORDS:
+            return None
+        began = time.perf_counter()
+        signature = self.signature(text)
+        with self._lock:
+            candidates = set()
+            for band in self._bands(signature):
+                candidates |= self._buckets.get(band, set())
+            candidates = [slot for slot in candidates if self._models[slot] == model]
+            best = None
+            if candidates:
+                similarities = (self._signatures[candidates] == signature).mean(axis=1)
+                index = int(np.argmax(similarities))
+                if similarities[index] >= self.threshold:
+                    best = candidates[index], float(similarities[index])
+            if best is None:
+                self.misses += 1
+                self.lookup_seconds += time.perf_counter() - began
+                return None
+            slot, similarity = best
+            key = self._keys[slot]
+            now = time.time()
+            self._last_used[slot] = now
+            self.hits += 1
+            self.lookup_seconds += time.perf_counter() - began
+        with self._db().connection() as conn:
+            row = conn.execute("SELECT questions FROM resume_index WHERE key=?", (key,)).fetchone()
+            conn.execute("UPDATE resume_index SET last_used=? WHERE key=?", (now, key))
+        return SimilarResume(key, similarity, row[0]) if row else None
+
+    def add(self, text, model, questions):
+        """Indexes a resume with the questions generated for it, evicting old entries beyond max_entries.
+
+        Returns the entry's key, or None if the text is too short to index.
+        """
+        if len(words(text)) < MIN_WORDS:
+            return None
+        key = hashlib.sha256(f"{model}\n{' '.join(words(text))}".encode("utf-8")).hexdigest()
+        signature = self.signature(text)
+        now = time.time()
+        with self._lock:
+            if key in self._slots:
+                self._last_used[self._slots[key]] = now
+            else:
+                self._insert_slot(key, model, signature, now)
+            evicted = self._evict_lru()
+        with self._db().connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO resume_index (key, model, signature, questions, created_at, last_used) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (key, model, signature.tobytes(), questions, now, now))
+            conn.executemany("DELETE FROM resume_index WHERE key=?", [(old,) for old in evicted])
+        return key
+
+    def stats(self):
+        """Returns hit/miss counters, size and mean lookup time."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._slots),
+                "max_entries": self.max_entries,
+                "buckets": len(self._buckets),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "mean_lookup_ms": self.lookup_seconds / lookups * 1000 if lookups else 0.0,
+                "signature_bytes": self._signatures.nbytes,
+            }
+
+
+# ----------- SHARED INSTANCE -----------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index():
+    """Returns the process-wide resume similarity index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ResumeIndex()
+            metrics.register_collector("resume_index", _index.stats)
+        return _index
@@ -0,0 +1,172 @@
+import math                                      # Running header threshold
+import os                                        # Token budget from environment variables
+import re                                        # Heading detection and tokenization
+import unicodedata                               # Normalize ligatures and odd spacing from PDFs
+from collections import Counter
+from dataclasses import dataclass, field
+
+# ----------- CONSTANTS -----------
+# Maximum resume tokens sent in the question-generation prompt
+PROMPT_TOKEN_BUDGET = int(os.getenv("RESUMEBOT_PROMPT_TOKENS", 1500))
+
+# Section name -> headings that start it (matched case-insensitively on a line of their own)
+SECTION_HEADINGS = {
+    "summary": ["summary", "profile", "objective", "about me", "professional summary", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies", "tech stack"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "education": ["education", "academic background", "qualifications", "academics"],
+    "certifications": ["certifications", "certificates", "courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "accomplishments"],
+}
+# Sections kept first when the resume does not fit the budget
+SECTION_PRIORITY = ["experience", "skills", "projects", "summary", "education",
+                    "certifications", "achievements", "header", "other"]
+
+_HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# Lines this close to the top or bottom of a page may be running headers or footers
+PAGE_EDGE_LINES = 2
+
+_PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+
+def count_tokens(text):
+    """Approximates the LLM token count (words and punctuation marks)."""
+    return len(_TOKEN.findall(text))
+
+
+def _page_edges(lines):
+    return lines[:PAGE_EDGE_LINES] + lines[-PAGE_EDGE_LINES:]
+
+
+def normalize(text):
+    """Cleans extracted PDF text: unicode forms, hyphenation, page numbers, running headers and whitespace.
+
+    Pages are separated by form feeds (see ExtractionResult.text). A short line at the
+    top or bottom of at least half the pages is a running header or footer and only its
+    first copy is kept; lines repeated elsewhere, like the same bullet under two jobs, stay.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)          # Re-join words hyphenated across lines
+    pages = []
+    for page in text.split("\f"):
+        lines = [" ".join(line.split()) for line in page.splitlines()]
+        pages.append([line for line in lines if line and not _PAGE_NUMBER.match(line)])
+    edges = Counter(line for lines in pages for line in set(_page_edges(lines)) if len(line) < 80)
+    running = {line for line, count in edges.items() if count >= max(2, math.ceil(len(pages) / 2))}
+    seen = set()
+    kept = []
+    for lines in pages:
+        for i, line in enumerate(lines):
+            if line in running and (i < PAGE_EDGE_LINES or i >= len(lines) - PAGE_EDGE_LINES):
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def _heading_of(line):
+    key = line.lower().strip(" :-•|")
+    return _HEADING_LOOKUP.get(key) if len(key) <= 40 else None
+
+
+def split_sections(text):
+    """Splits normalized resume text into {section name: text}, in document order.
+
+    Text before the first heading (name, contact details) is the "header" section;
+    unknown headings are folded into the section before them.
+    """
+    sections = {}
+    current = "header"
+    for line in text.splitlines():
+        name = _heading_of(line)
+        if name:
+            current = name if name not in sections else current
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+
+def _fit(pieces, max_tokens, sep):
+    kept, used = [], 0
+    for piece in pieces:
+        cost = count_tokens(piece)
+        if used + cost > max_tokens:
+            break
+        kept.append(piece)
+        used += cost
+    return sep.join(kept)
+
+
+def _trim(text, max_tokens):
+    """Keeps the leading lines of a section that fit in max_tokens.
+
+    If even the first line does not fit (e.g. a paragraph extracted as one line), its
+    leading sentences are kept instead, or failing that its leading words.
+    """
+    kept = _fit(text.splitlines(), max_tokens, "\n")
+    if kept or not text:
+        return kept
+    first = text.splitlines()[0]
+    return _fit(_SENTENCE_END.split(first), max_tokens, " ") or _fit(first.split(), max_tokens, " ")
+
+
+@dataclass
+class PreparedResume:
+    text: str                                        # What goes into the prompt
+    raw_tokens: int                                  # Tokens in the extracted text
+    prompt_tokens: int                               # Tokens in the prepared text
+    sections: dict = field(default_factory=dict)     # Section name -> tokens kept
+    dropped: list = field(default_factory=list)      # Sections left out entirely
+    trimmed: list = field(default_factory=list)      # Sections cut short
+
+    @property
+    def tokens_saved(self):
+        return self.raw_tokens - self.prompt_tokens
+
+    def report(self):
+        """Returns a small dict describing the savings for display or logging."""
+        return {
+            "raw_tokens": self.raw_tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "tokens_saved": self.tokens_saved,
+            "saved_percent": round(100 * self.tokens_saved / self.raw_tokens, 1) if self.raw_tokens else 0.0,
+            "sections": self.sections,
+            "dropped": self.dropped,
+            "trimmed": self.trimmed,
+        }
+
+
+def prepare_resume(raw_text, budget=PROMPT_TOKEN_BUDGET):
+    """Normalizes a resume and fits its most useful sections into the token budget."""
+    sections = split_sections(normalize(raw_text))
+    order = sorted(sections, key=lambda n: SECTION_PRIORITY.index(n) if n in SECTION_PRIORITY else len(SECTION_PRIORITY))
+
+    chosen, kept_tokens, dropped, trimmed = {}, {}, [], []
+    remaining = budget
+    for name in order:
+        body = sections[name]
+        cost = count_tokens(body) + 2                 # Plus the heading line
+        if cost <= remaining:
+            chosen[name] = body
+        elif remaining > 20:
+            chosen[name] = _trim(body, remaining - 2)
+            trimmed.append(name)
+        else:
+            dropped.append(name)
+            continue
+        kept_tokens[name] = count_tokens(chosen[name])
+        remaining -= kept_tokens[name] + 2
+
+    # Reassemble in the original document order, with plain headings the model can follow
+    parts = []
+    for name in sections:
+        if name in chosen and chosen[name]:
+            parts.append(chosen[name] if name == "header" else f"{name.upper()}\n{chosen[name]}")
+    text = "\n\n".join(parts)
+    return PreparedResume(text, count_tokens(raw_text), count_tokens(text), kept_tokens, dropped, trimmed)
@@ -0,0 +1,318 @@
+import hashlib                                   # Content-addressed blob keys
+import json                                      # Blob serialization
+import os                                        # Budgets from environment variables
+import sys                                       # Object sizes
+import threading                                 # Sessions share the store and accountant across threads
+import time                                      # Idle tracking
+import weakref                                   # Sessions are dropped with their browser tab, not by the accountant
+from dataclasses import dataclass, field, fields
+from app.db import get_pool                      # Pooled SQLite connections
+from app import metrics                          # Session memory in the performance panel
+
+# ----------- CONSTANTS -----------
+CACHE_DIR = os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache"))
+SESSION_BLOB_DB = os.path.join(CACHE_DIR, "session_blobs.db")
+# Bytes of session blobs kept in memory across all sessions; idle ones are evicted beyond it
+MEMORY_BUDGET_BYTES = int(os.getenv("RESUMEBOT_SESSION_MEMORY_BUDGET", 64 * 1024 * 1024))
+# Seconds without a rerun after which a session's blobs may be evicted
+IDLE_SECONDS = float(os.getenv("RESUMEBOT_SESSION_IDLE_SECONDS", 300))
+# Blobs unused for this many days are deleted from disk when the store opens
+BLOB_TTL_DAYS = float(os.getenv("RESUMEBOT_SESSION_BLOB_TTL_DAYS", 7))
+# Key of the Session object in st.session_state
+STATE_KEY = "session"
+
+SESSION_BLOB_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS session_blobs (
+           digest TEXT PRIMARY KEY,
+           value TEXT,
+           size INTEGER,
+           last_used REAL)''',
+    "CREATE INDEX IF NOT EXISTS idx_session_blobs_last_used ON session_blobs (last_used)",
+]
+
+
+def deep_size(value):
+    """Approximate bytes held by a value and the containers and strings inside it."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(v) for v in value)
+    return size
+
+
+# ----------- BLOB STORE -----------
+class BlobStore:
+    """Content-addressed store for large session values, persisted in SQLite with hot copies in memory.
+
+    Values are stored as JSON under the hash of their content, so sessions holding the
+    same question set share one copy. Evicting a value drops only the memory copy; the
+    next read loads it back from disk. Returned values are shared and must not be mutated.
+    """
+
+    def __init__(self, db_path=SESSION_BLOB_DB, ttl_days=BLOB_TTL_DAYS):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._memory = {}               # digest -> (value, size in bytes)
+        self.memory_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        with self._db().connection() as conn:
+            conn.execute("DELETE FROM session_blobs WHERE last_used < ?", (time.time() - ttl_days * 86400,))
+
+    def _db(self):
+        return get_pool(self.db_path, migrations=SESSION_BLOB_MIGRATIONS)
+
+    def _keep(self, digest, value, size):
+        if digest not in self._memory:
+            self._memory[digest] = (value, size)
+            self.memory_bytes += size
+
+    def put(self, value):
+        """Stores a JSON-serializable value; returns its digest."""
+        text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            if digest in self._memory:
+                return digest
+        with self._db().connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO session_blobs (digest, value, size, last_used) VALUES (?, ?, ?, ?)",
+                         (digest, text, len(text), time.time()))
+        with self._lock:
+            self._keep(digest, value, deep_size(value))
+        return digest
+
+    def get(self, digest):
+        """Returns the value stored under digest, loading it from disk if it was evicted; None if unknown."""
+        if digest is None:
+            return None
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                return entry[0]
+        with self._db().connection() as conn:
+            row = conn.execute("SELECT value FROM session_blobs WHERE digest=?", (digest,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE session_blobs SET last_used=? WHERE digest=?", (time.time(), digest))
+        value = json.loads(row[0])
+        with self._lock:
+            self.loads += 1
+            self._keep(digest, value, deep_size(value))
+        return value
+
+    def size(self, digest):
+        """Bytes the value under digest holds in memory (0 if it is not loaded)."""
+        with self._lock:
+            entry = self._memory.get(digest)
+            return entry[1] if entry else 0
+
+    def in_memory(self):
+        """Returns {digest: bytes} for every value currently held in memory."""
+        with self._lock:
+            return {digest: size for digest, (_, size) in self._memory.items()}
+
+    def evict(self, digest):
+        """Drops the memory copy of a value; returns the bytes freed."""
+        with self._lock:
+            entry = self._memory.pop(digest, None)
+            if entry is None:
+                return 0
+            self.memory_bytes -= entry[1]
+            self.evictions += 1
+            return entry[1]
+
+
+def _blob(ref):
+    """A Session attribute whose value lives in the blob store; the session keeps its digest in ref."""
+    def get(self):
+        return get_blob_store().get(getattr(self, ref))
+
+    def set(self, value):
+        setattr(self, ref, None if value is None else get_blob_store().put(value))
+
+    return property(get, set)
+
+
+# ----------- SESSION -----------
+@dataclass(slots=True, weakref_slot=True, eq=False)
+class Session:
+    """Everything the app keeps for one browser session.
+
+    Large values (question sets, job match rows, PDF timings) are kept in the blob
+    store and only their digests are held here; read and assign them through the
+    questions, job_match and pdf_extraction properties.
+    """
+    # Account
+    logged_in: bool = False
+    username: str = ""
+    email: str = ""
+    phone: str = ""
+    account_type: str = "User"
+    profile_image: str = None           # Id of the processed profile picture (see app/images.py)
+    # Registration waiting for its OTP; the password is already hashed
+    generated_otp: str = None
+    pending_user: tuple = None          # (username, password hash, email, phone)
+    # Dashboard
+    recorded_upload: str = None         # File id of the last upload written to the upload history
+    questions_for: str = None           # File id the questions belong to
+    questions_ref: str = None
+    questions_job: str = None
+    reused_questions: float = None      # Similarity of the resume whose questions were reused
+    fresh_questions_for: str = None
+    prompt_report: dict = None
+    pdf_extraction_ref: str = None
+    pdf_extraction_for: str = None      # File id pdf_extraction was measured for
+    job_match_key: str = None           # Digest of the file id and pasted descriptions job_match was scored for
+    job_match_ref: str = None
+    feedback_job: str = None
+    batch_job: str = None
+    voice_job: str = None
+    voice_audio_file: str = None
+    voice_answer: str = ""
+    # Settings and upload history pages
+    processed_image_upload: str = None
+    uploads_cursors: list = field(default_factory=lambda: [None])
+    # Memory accounting
+    last_seen: float = field(default_factory=time.time)
+    widget_bytes: int = 0               # Values of keyed widgets in st.session_state
+
+    questions = _blob("questions_ref")
+    job_match = _blob("job_match_ref")
+    pdf_extraction = _blob("pdf_extraction_ref")
+
+    def blob_refs(self):
+        return [ref for ref in (self.questions_ref, self.job_match_ref, self.pdf_extraction_ref) if ref]
+
+    def state_bytes(self):
+        """Bytes held by the session object itself, excluding blobs."""
+        return sys.getsizeof(self) + sum(deep_size(getattr(self, f.name)) for f in fields(self))
+
+
+# ----------- MEMORY ACCOUNTING -----------
+class MemoryAccountant:
+    """Tracks the memory held by live sessions and evicts idle blobs beyond a budget.
+
+    Sessions are held weakly, so a session disappears from the accounts as soon as
+    Streamlit drops its state. When the blobs in memory exceed the budget, blobs no
+    live session refers to go first, then those of the sessions idle the longest.
+    Blobs of sessions active within idle_seconds are never evicted.
+    """
+
+    def __init__(self, store, budget=MEMORY_BUDGET_BYTES, idle_seconds=IDLE_SECONDS):
+        self.store = store
+        self.budget = budget
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._sessions = weakref.WeakSet()
+        self.evicted_bytes = 0
+
+    def register(self, session):
+        with self._lock:
+            self._sessions.add(session)
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions)
+
+    def session_bytes(self, session):
+        """Bytes attributable to one session: its own state, widget values and the blobs it refers to."""
+        return session.state_bytes() + session.widget_bytes + sum(self.store.size(r) for r in session.blob_refs())
+
+    def report(self):
+        """One row per live session, largest first."""
+        now = time.time()
+        rows = []
+        for session in self.sessions():
+            blob_bytes = sum(self.store.size(r) for r in session.blob_refs())
+            state_bytes = session.state_bytes()
+            rows.append({
+                "user": session.email or "(logged out)",
+                "idle_s": round(now - session.last_seen, 1),
+                "state_bytes": state_bytes,
+                "widget_bytes": session.widget_bytes,
+                "blob_bytes": blob_bytes,
+                "total_bytes": state_bytes + session.widget_bytes + blob_bytes,
+            })
+        return sorted(rows, key=lambda row: row["total_bytes"], reverse=True)
+
+    def enforce_budget(self):
+        """Evicts idle blobs until the store is within budget; returns the bytes freed."""
+        if self.store.memory_bytes <= self.budget:
+            return 0
+        cutoff = time.time() - self.idle_seconds
+        last_seen = {}                  # digest -> most recent rerun of any session referring to it
+        for session in self.sessions():
+            for ref in session.blob_refs():
+                last_seen[ref] = max(last_seen.get(ref, 0.0), session.last_seen)
+        candidates = sorted((last_seen.get(digest, 0.0), digest) for digest in self.store.in_memory()
+                            if last_seen.get(digest, 0.0) < cutoff)
+        freed = 0
+        for _, digest in candidates:
+            if self.store.memory_bytes <= self.budget:
+                break
+            freed += self.store.evict(digest)
+        with self._lock:
+            self.evicted_bytes += freed
+        return freed
+
+    def stats(self):
+        """Session count, bytes per session and in total, and blob store counters."""
+        per_session = [self.session_bytes(session) for session in self.sessions()]
+        own = sum(session.state_bytes() + session.widget_bytes for session in self.sessions())
+        return {
+            "sessions": len(per_session),
+            "total_bytes": own + self.store.memory_bytes,
+            "max_session_bytes": max(per_session, default=0),
+            "mean_session_bytes": sum(per_session) / len(per_session) if per_session else 0,
+            "blob_bytes": self.store.memory_bytes,
+            "blob_entries": len(self.store.in_memory()),
+            "budget_bytes": self.budget,
+            "blob_loads": self.store.loads,
+            "blob_evictions": self.store.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+
+# ----------- SHARED INSTANCES -----------
+_store = None
+_accountant = None
+_shared_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Returns the process-wide session blob store."""
+    global _store
+    with _shared_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
+
+
+def get_accountant():
+    """Returns the process-wide session memory accountant."""
+    global _accountant
+    store = get_blob_store()
+    with _shared_lock:
+        if _accountant is None:
+            _accountant = MemoryAccountant(store)
+            metrics.register_collector("sessions", _accountant.stats)
+        return _accountant
+
+
+def get_session():
+    """Returns this browser session's Session, creating it on the first run.
+
+    Each call marks the session active and lets the accountant enforce the memory budget.
+    """
+    import streamlit as st
+
+    session = st.session_state.get(STATE_KEY)
+    if session is None:
+        session = st.session_state[STATE_KEY] = Session()
+    session.last_seen = time.time()
+    session.widget_bytes = sum(deep_size(value) for key, value in st.session_state.items() if key != STATE_KEY)
+    accountant = get_accountant()
+    accountant.register(session)
+    accountant.enforce_budget()
+    return session
@@ -1,6 +1,10 @@
 import streamlit as st
+from app import db, images, metrics
+from app.session import get_session
 
+@metrics.timed("page.settings")
 def settings():
+    session = get_session()
     st.header("⚙️ Settings")
 
     # Profile Image Section
@@ -8,23 +12,30 @@ def settings():
         st.subheader("🖼️ Change Profile Image")
     uploaded_file = st.file_uploader("Upload New Profile Image", type=["png", "jpg", "jpeg"])
     if uploaded_file:
-        st.session_state.profile_image = uploaded_file
-        st.success("✅ Profile image updated!")
+        # Process each upload once; session state keeps only the image id, not the file
+        if session.processed_image_upload != uploaded_file.file_id:
+            try:
+                image_id = images.process_image(uploaded_file.getvalue())
+            except Exception:
+                st.error("❌ Could not read that image.")
+            else:
+                session.profile_image = image_id
+                db.set_profile_picture(session.email, image_id)
+                session.processed_image_upload = uploaded_file.file_id
+                st.success("✅ Profile image updated!")
 
-    try:
-        st.image(st.session_state.profile_image, width=120)
-    except:
-        st.image("https://cdn-icons-png.flaticon.com/512/3135/3135715.png", width=120)
+    st.image(images.image_src(session.profile_image, "profile"), width=120)
 
     # Phone Number Update Section
     with st.container():
         st.subheader("📱 Update Phone Number")
-        new_phone = st.text_input("Enter new phone number", value=st.session_state.phone, max_chars=15)
+        new_phone = st.text_input("Enter new phone number", value=session.phone, max_chars=15)
         update_phone_col1, update_phone_col2 = st.columns([3,1])
         with update_phone_col2:
             if st.button("Update Phone"):
                 if new_phone.strip():
-                    st.session_state.phone = new_phone.strip()
+                    db.update_phone(session.email, new_phone.strip())
+                    session.phone = new_phone.strip()
                     st.success("✅ Phone number updated!")
                 else:
                     st.warning("⚠️ Please enter a valid phone number.")
@@ -41,12 +52,12 @@ def settings():
             submitted = st.form_submit_button("Apply Changes")
 
             if submitted:
-                if current_password != st.session_state.password:
+                if not db.validate_user(session.email, current_password):
                     st.error("❌ Current password is incorrect.")
                 elif new_password != confirm_password:
                     st.error("❌ New passwords do not match.")
                 elif not new_password.strip():
                     st.warning("⚠️ New password cannot be empty.")
                 else:
-                    st.session_state.password = new_password
+                    db.update_password(session.email, new_password)
                     st.success("✅ Password updated successfully.")
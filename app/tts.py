@@ -0,0 +1,327 @@
+import hashlib                                   # Content-addressed clip keys
+import importlib.util                            # Is pyttsx3 installed?
+import json                                      # Stable key payloads
+import multiprocessing                           # Spawned synthesis processes
+import os                                        # Settings from environment variables
+import re                                        # Question numbering to strip before speaking
+import threading                                 # Store and in-flight table are shared across sessions
+import time                                      # Synthesis latency, LRU timestamps
+import wave                                      # Fake backend output
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from app.db import get_pool                      # Pooled SQLite connections for the clip index
+from app import metrics                          # Synthesis timings and store counters
+
+# ----------- CONSTANTS -----------
+CACHE_DIR = os.getenv("RESUMEBOT_CACHE_DIR", os.path.join("data", "cache"))
+AUDIO_DIR = os.getenv("RESUMEBOT_TTS_DIR", os.path.join(CACHE_DIR, "tts"))
+TTS_DB = os.path.join(CACHE_DIR, "tts_audio.db")
+# Total size of stored clips before least recently played ones are deleted (default 256 MB)
+MAX_BYTES = int(os.getenv("RESUMEBOT_TTS_CACHE_BYTES", 256 * 1024 * 1024))
+# "pyttsx3" (offline system voices) or "fake" (silent clips, for tests and benchmarks)
+BACKEND = os.getenv("RESUMEBOT_TTS_BACKEND", "pyttsx3")
+# Synthesis workers shared by all sessions (processes for pyttsx3, threads otherwise)
+WORKERS = int(os.getenv("RESUMEBOT_TTS_WORKERS", 2))
+# Failed clips remembered so the dashboard stops waiting for them
+MAX_ERRORS = 500
+
+TTS_MIGRATIONS = [
+    '''CREATE TABLE IF NOT EXISTS tts_audio (
+           key TEXT PRIMARY KEY,
+           text TEXT,
+           size INTEGER,
+           created_at REAL,
+           last_used REAL)''',
+    "CREATE INDEX IF NOT EXISTS idx_tts_audio_last_used ON tts_audio (last_used)",
+]
+
+_NUMBERING = re.compile(r"^\s*(?:[-*•]|q?\d+\s*[.):]|question\s+\d+\s*[.):])\s*", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class VoiceSettings:
+    """Voice parameters that change the audio, and therefore the clip key."""
+    voice: str = os.getenv("RESUMEBOT_TTS_VOICE", "")            # Engine voice id; empty for the default voice
+    rate: int = int(os.getenv("RESUMEBOT_TTS_RATE", 175))        # Words per minute
+    volume: float = float(os.getenv("RESUMEBOT_TTS_VOLUME", 1.0))
+
+
+def enabled(backend=BACKEND):
+    """True when the configured backend can run here."""
+    return backend in SYNTHESIZERS and (backend != "pyttsx3" or importlib.util.find_spec("pyttsx3") is not None)
+
+
+def speech_text(question):
+    """The words spoken for a question: list numbering, markdown emphasis and extra spacing removed."""
+    return " ".join(_NUMBERING.sub("", question.replace("**", "")).split())
+
+
+def clip_key(text, settings, backend=BACKEND):
+    """Content address of a clip: the spoken text plus everything that changes how it sounds."""
+    payload = json.dumps([backend, speech_text(text), settings.voice, settings.rate, settings.volume])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+# ----------- SYNTHESIS BACKENDS -----------
+# Each backend takes (text, output path, VoiceSettings) and writes a WAV file.
+_engine = None
+
+
+def _synthesize_pyttsx3(text, path, settings):
+    # pyttsx3 engines are not thread safe, so each worker process keeps its own
+    global _engine
+    import pyttsx3
+    if _engine is None:
+        _engine = pyttsx3.init()
+    if settings.voice:
+        _engine.setProperty("voice", settings.voice)
+    _engine.setProperty("rate", settings.rate)
+    _engine.setProperty("volume", settings.volume)
+    _engine.save_to_file(text, path)
+    _engine.runAndWait()
+
+
+def _synthesize_fake(text, path, settings):
+    # Silent 8 kHz clip lasting as long as the words would take to say, after a simulated delay
+    time.sleep(float(os.getenv("RESUMEBOT_FAKE_TTS_LATENCY", 0.2)))
+    seconds = max(1, len(text.split())) * 60 / max(1, settings.rate)
+    with wave.open(path, "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(8000)
+        clip.writeframes(b"\0\0" * int(8000 * seconds))
+
+
+SYNTHESIZERS = {
+    "pyttsx3": _synthesize_pyttsx3,
+    "fake": _synthesize_fake,
+}
+# Backends that must run in worker processes rather than threads
+PROCESS_BACKENDS = {"pyttsx3"}
+
+
+def _synthesize(backend, text, path, settings):
+    """Runs in a worker: writes the clip to a temporary file and returns its duration in seconds."""
+    began = time.perf_counter()
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        SYNTHESIZERS[backend](text, partial, settings)
+        if not os.path.exists(partial) or not os.path.getsize(partial):
+            raise RuntimeError("the speech engine wrote no audio")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return time.perf_counter() - began
+
+
+# ----------- AUDIO STORE -----------
+class AudioStore:
+    """Content-addressed WAV files with a SQLite index and a total size cap.
+
+    Clips are named by their key, so a question asked again, or the same question
+    generated for another user, maps to the file that already exists. Beyond
+    max_bytes the least recently played clips are deleted.
+    """
+
+    def __init__(self, directory=AUDIO_DIR, db_path=TTS_DB, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> size, least recently used first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        with self._db().connection() as conn:
+            rows = conn.execute("SELECT key, size FROM tts_audio ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if os.path.exists(self.path(key)):
+                self._entries[key] = size
+                self.bytes += size
+        self._evict()
+
+    def _db(self):
+        return get_pool(self.db_path, migrations=TTS_MIGRATIONS)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        """Returns the clip's WAV bytes, or None if it is not stored."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.bytes -= self._entries.pop(key, 0)
+            return None
+        with self._db().connection() as conn:
+            conn.execute("UPDATE tts_audio SET last_used=? WHERE key=?", (time.time(), key))
+        return data
+
+    def add(self, key, text):
+        """Indexes a clip a worker has written to path(key), then enforces the size cap."""
+        size = os.path.getsize(self.path(key))
+        now = time.time()
+        with self._db().connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO tts_audio (key, text, size, created_at, last_used) "
+                         "VALUES (?, ?, ?, ?, ?)", (key, text, size, now, now))
+        with self._lock:
+            self.bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+        self._evict()
+
+    def _evict(self):
+        evicted = []
+        with self._lock:
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                key, size = self._entries.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+                evicted.append(key)
+        for key in evicted:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            with self._db().connection() as conn:
+                conn.executemany("DELETE FROM tts_audio WHERE key=?", [(key,) for key in evicted])
+
+    def stats(self):
+        with self._lock:
+            plays = self.hits + self.misses
+            return {"clips": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / plays if plays else 0.0,
+                    "evictions": self.evictions}
+
+
+# ----------- WORKER POOL -----------
+class SpeechRenderer:
+    """Renders question audio on a background worker pool into the shared AudioStore.
+
+    render() returns immediately. A clip that is already stored or being synthesized
+    is never synthesized again, however many sessions ask for it.
+    """
+
+    def __init__(self, store=None, backend=BACKEND, settings=None, workers=WORKERS):
+        self.store = store or AudioStore()
+        self.backend = backend
+        self.settings = settings or VoiceSettings()
+        if backend in PROCESS_BACKENDS:
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self._lock = threading.Lock()
+        self._pending = {}              # key -> Future of the synthesis in progress
+        self._errors = OrderedDict()    # key -> error message of the last failed synthesis
+        self.synthesized = 0
+        self.deduplicated = 0
+
+    def key(self, text):
+        return clip_key(text, self.settings, self.backend)
+
+    def render(self, questions):
+        """Queues synthesis of every question that has no clip yet; returns the number queued."""
+        queued = 0
+        for question in questions:
+            text = speech_text(question)
+            if not text:
+                continue
+            key = self.key(text)
+            with self._lock:
+                if key in self._pending or key in self.store:
+                    self.deduplicated += 1
+                    continue
+                self._errors.pop(key, None)
+                future = self._executor.submit(_synthesize, self.backend, text, self.store.path(key), self.settings)
+                self._pending[key] = future
+            future.add_done_callback(lambda f, key=key, text=text: self._finished(key, text, f))
+            queued += 1
+        return queued
+
+    def _finished(self, key, text, future):
+        try:
+            seconds = future.result()
+            self.store.add(key, text)
+        except Exception as exc:
+            with self._lock:
+                self._errors[key] = str(exc) or type(exc).__name__
+                while len(self._errors) > MAX_ERRORS:
+                    self._errors.popitem(last=False)
+        else:
+            metrics.observe("stage_seconds", seconds, stage="tts.synthesize")
+            with self._lock:
+                self.synthesized += 1
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def status(self, question):
+        """ "ready", "pending" or "error" for a question's clip; queues it if it is missing (e.g. evicted)."""
+        key = self.key(question)
+        if key in self.store:
+            return "ready"
+        with self._lock:
+            if key in self._errors:
+                return "error"
+        self.render([question])
+        return "pending"
+
+    def audio(self, question):
+        """Returns the WAV bytes of a question's clip, or None if it is not ready."""
+        return self.store.get(self.key(question))
+
+    def wait(self, timeout=None):
+        """Blocks until no synthesis is in progress; True if everything finished in time."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending.values())
+            if not pending:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def stats(self):
+        stats = self.store.stats()
+        with self._lock:
+            stats.update(pending=len(self._pending), synthesized=self.synthesized,
+                         deduplicated=self.deduplicated, errors=len(self._errors))
+        return stats
+
+
+# ----------- SHARED INSTANCE -----------
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """Returns the process-wide speech renderer."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = SpeechRenderer()
+            metrics.register_collector("tts", _renderer.stats, backend=_renderer.backend)
+        return _renderer
+
+
+def render(questions):
+    """Queues audio for a question set in the background, if text-to-speech is available."""
+    if enabled():
+        get_renderer().render(questions)
@@ -1,21 +1,46 @@
 import streamlit as st
+from app import db, metrics
+from app.session import get_session
 
+PAGE_SIZE = 10  # Number of uploads shown per page
+
+@metrics.timed("page.uploads")
 def uploads():
     # Display the header for the upload history section
     st.header("🕓 Recent Upload History")
-    
+
+    # Cursor pagination: a stack of "before id" cursors, one per page visited so far
+    session = get_session()
+    cursors = session.uploads_cursors
+
     # Create an expandable section to show or hide the upload history
-    with st.expander("📁 View Uploads"):
-        # Check if there is any upload history stored in session state
-        if st.session_state.upload_history:
-            # Iterate over the upload history in reverse order (most recent first)
-            for i, item in enumerate(reversed(st.session_state.upload_history), 1):
+    with st.expander("📁 View Uploads", expanded=True):
+        # Load only the current page from the database, most recent first
+        rows = db.list_uploads(session.email, before_id=cursors[-1], limit=PAGE_SIZE)
+        if rows:
+            total = db.count_uploads(session.email)
+            offset = (len(cursors) - 1) * PAGE_SIZE
+            for i, (_, filename, uploaded_at) in enumerate(rows, offset + 1):
                 # Display each uploaded file's name and timestamp
-                st.write(f"{i}. 📄 {item['filename']} - ⏱️ {item['timestamp']}")
-            
+                st.write(f"{i}. 📄 {filename} - ⏱️ {uploaded_at}")
+
+            # Page navigation
+            prev_col, info_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if len(cursors) > 1 and st.button("⬅️ Newer"):
+                    cursors.pop()
+                    st.rerun()
+            with info_col:
+                st.caption(f"Showing {offset + 1}-{offset + len(rows)} of {total}")
+            with next_col:
+                if offset + len(rows) < total and st.button("Older ➡️"):
+                    cursors.append(rows[-1][0])
+                    st.rerun()
+
             # Provide a button to clear the upload history
             if st.button("🧹 Clear History"):
-                st.session_state.upload_history.clear()  # Clear the list
+                db.clear_uploads(session.email)
+                session.uploads_cursors = [None]
                 st.success("✅ Upload history cleared.")  # Show success message
         else:
             # Show a message when there are no uploads yet
@@ -0,0 +1,173 @@
+import importlib.util                            # Are the offline recognizers installed?
+import io                                        # Uploaded audio arrives as bytes
+import os                                        # Settings from environment variables
+import threading                                 # Job table is shared across sessions
+import time                                      # Transcription latency
+import uuid                                      # Job ids stored in session state
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ----------- CONSTANTS -----------
+# Recognizer used when the caller does not pick one ("google" needs network; "sphinx"/"vosk" are offline)
+DEFAULT_RECOGNIZER = os.getenv("RESUMEBOT_RECOGNIZER", "google")
+# Audio is transcribed in chunks of this many seconds so partial text appears early
+CHUNK_SECONDS = float(os.getenv("RESUMEBOT_VOICE_CHUNK_SECONDS", 5))
+# Each chunk also covers this much of the previous one, so a word cut at a boundary is heard whole once
+CHUNK_OVERLAP_SECONDS = float(os.getenv("RESUMEBOT_VOICE_CHUNK_OVERLAP_SECONDS", 1))
+# Microphone capture limits
+LISTEN_TIMEOUT = 5
+PHRASE_TIME_LIMIT = 60
+# Worker threads shared by all sessions, and how many finished jobs we keep around
+WORKERS = int(os.getenv("RESUMEBOT_VOICE_WORKERS", 4))
+MAX_JOBS = 200
+
+
+# ----------- RECOGNIZER BACKENDS -----------
+# Each backend takes (sr.Recognizer, sr.AudioData) and returns text.
+def _recognize_google(recognizer, audio):
+    return recognizer.recognize_google(audio)
+
+
+def _recognize_sphinx(recognizer, audio):
+    return recognizer.recognize_sphinx(audio)      # Offline, needs pocketsphinx
+
+
+def _recognize_vosk(recognizer, audio):
+    import json
+    return json.loads(recognizer.recognize_vosk(audio)).get("text", "")  # Offline, needs vosk + a model
+
+
+RECOGNIZERS = {
+    "google": _recognize_google,
+    "sphinx": _recognize_sphinx,
+    "vosk": _recognize_vosk,
+}
+
+
+# Packages a recognizer needs beyond SpeechRecognition; it is only offered when they are installed
+REQUIRED_PACKAGES = {
+    "sphinx": "pocketsphinx",
+    "vosk": "vosk",
+}
+
+
+def register_recognizer(name, backend):
+    """Adds or replaces a recognizer backend, e.g. a fake one in tests."""
+    RECOGNIZERS[name] = backend
+
+
+def available_recognizers():
+    """Names of the recognizers that can run here, in registration order."""
+    return [name for name in RECOGNIZERS
+            if name not in REQUIRED_PACKAGES or importlib.util.find_spec(REQUIRED_PACKAGES[name]) is not None]
+
+
+# ----------- JOBS -----------
+class TranscriptionJob:
+    """State of one background transcription; read by the UI on each rerun."""
+
+    def __init__(self, source, recognizer):
+        self.id = uuid.uuid4().hex
+        self.source = source            # "microphone" or "file"
+        self.recognizer = recognizer
+        self.status = "queued"          # queued -> listening -> transcribing -> done | error
+        self.chunks = []                # Text of each transcribed chunk, in order
+        self.error = None
+        self.submitted_at = time.time()
+        self.latency = None             # Seconds from the start of transcription to the last chunk
+
+    @property
+    def text(self):
+        return " ".join(chunk for chunk in self.chunks if chunk)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="voice")
+
+
+def _add_job(job):
+    with _jobs_lock:
+        _jobs[job.id] = job
+        # Forget the oldest finished jobs once the table is full
+        for old_id in [i for i, j in _jobs.items() if j.finished][:max(0, len(_jobs) - MAX_JOBS)]:
+            del _jobs[old_id]
+
+
+def get_job(job_id):
+    """Returns a transcription job by id, or None if it is unknown or was forgotten."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _without_repeat(previous, text):
+    """Drops the leading words of text that repeat the end of previous (heard twice in the overlap)."""
+    before, words = previous.lower().split(), text.split()
+    for n in range(min(len(before), len(words)), 0, -1):
+        if before[-n:] == [w.lower() for w in words[:n]]:
+            return " ".join(words[n:])
+    return text
+
+
+def _transcribe(job, recognizer, audio):
+    """Transcribes captured audio in overlapping chunks, publishing partial text as it goes."""
+    import speech_recognition as sr
+    backend = RECOGNIZERS[job.recognizer]
+    job.status = "transcribing"
+    began = time.perf_counter()
+    duration_ms = len(audio.frame_data) / (audio.sample_rate * audio.sample_width) * 1000
+    step = int(CHUNK_SECONDS * 1000)
+    overlap = min(int(CHUNK_OVERLAP_SECONDS * 1000), step // 2)
+    for start in range(0, max(int(duration_ms), 1), step):
+        segment = audio.get_segment(max(0, start - overlap), min(start + step, duration_ms))
+        try:
+            job.chunks.append(_without_repeat(job.text, backend(recognizer, segment)))
+        except sr.UnknownValueError:
+            job.chunks.append("")       # Silence or unintelligible audio in this chunk
+    job.latency = time.perf_counter() - began
+    job.status = "done"
+
+
+def _run_microphone(job):
+    import speech_recognition as sr
+    try:
+        recognizer = sr.Recognizer()
+        job.status = "listening"
+        with sr.Microphone() as source:
+            audio = recognizer.listen(source, timeout=LISTEN_TIMEOUT, phrase_time_limit=PHRASE_TIME_LIMIT)
+        _transcribe(job, recognizer, audio)
+    except Exception as exc:
+        job.error = str(exc) or type(exc).__name__
+        job.status = "error"
+
+
+def _run_file(job, data):
+    import speech_recognition as sr
+    try:
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            audio = recognizer.record(source)
+        _transcribe(job, recognizer, audio)
+    except Exception as exc:
+        job.error = str(exc) or type(exc).__name__
+        job.status = "error"
+
+
+def start_microphone(recognizer=DEFAULT_RECOGNIZER):
+    """Starts listening on the server's microphone in the background and returns the job."""
+    job = TranscriptionJob("microphone", recognizer)
+    _add_job(job)
+    _executor.submit(_run_microphone, job)
+    return job
+
+
+def start_file(data, recognizer=DEFAULT_RECOGNIZER):
+    """Starts transcribing an uploaded WAV/AIFF/FLAC file in the background and returns the job."""
+    job = TranscriptionJob("file", recognizer)
+    _add_job(job)
+    _executor.submit(_run_file, job, data)
+    return job
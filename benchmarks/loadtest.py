@@ -0,0 +1,376 @@
+"""Multi-session load test: N concurrent candidates through the full ResumeBot flow.
+
+Every simulated session registers through login() (form, OTP, verify), logs in,
+uploads a synthetic resume, waits for the generated questions and requests
+feedback. Sessions run on threads in one process, like Streamlit's own
+sessions, against the fake LLM, and share the process-wide pools, caches and
+job queue. Reports throughput, p50/p99 per step, sqlite lock waits (writers
+waiting while another connection holds the write lock), connection-pool waits
+and DB helper latency, and process memory growth. The scratch directory is
+deleted when the run ends.
+
+    python benchmarks/loadtest.py --sessions 50 --concurrency 50 --llm-latency 0.5
+    python benchmarks/loadtest.py --sessions 200 --concurrency 50 --unique-resumes 20 --output load.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="sessions to simulate in total")
+    parser.add_argument("--concurrency", type=int, default=None, help="sessions running at once (default: all)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which sessions are started")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM round trip in seconds")
+    parser.add_argument("--unique-resumes", type=int, default=None,
+                        help="distinct resumes shared by the sessions (default: one per session)")
+    parser.add_argument("--pages", type=int, default=2, help="pages per synthetic resume")
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    return parser.parse_args()
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    # The fake model reads its latency when it is created, so set it before the app is imported
+    os.environ["RESUMEBOT_FAKE_LLM_LATENCY"] = str(ARGS.llm_latency)
+
+# Importing the suite isolates databases and caches in a scratch directory and selects the fake LLM
+from suite import HARNESS, REPO_ROOT, WORKDIR, git_revision, new_app, run_dashboard_flow, summarize, timed  # noqa: E402
+from synthetic import make_resume_pdf  # noqa: E402
+from app.session import STATE_KEY  # noqa: E402
+
+PASSWORD = "load-test-password"
+
+
+# ----------- SQLITE LOCK WAITS -----------
+# SQLite's busy handler (busy_timeout) waits inside the library, where the time cannot be
+# measured. For this test only, the app's connections wait in Python instead, on the same
+# sleep schedule and up to the same limit, so each wait can be timed.
+BUSY_DELAYS = (0.001, 0.002, 0.005, 0.01, 0.015, 0.02, 0.025, 0.025, 0.025, 0.05, 0.05, 0.1)
+BUSY_TIMEOUT = 5.0
+
+_lock_waits = {}                # database name -> [statements that waited, seconds waited]
+_lock_waits_lock = threading.Lock()
+
+
+class LockTimingConnection(sqlite3.Connection):
+    """Retries statements that fail with SQLITE_BUSY and records the time spent waiting.
+
+    Only a statement that opens its transaction is retried, after rolling back the
+    implicit BEGIN; that is where writers meet the lock in WAL mode.
+    """
+    db_name = ""
+
+    def _retry(self, call, *args):
+        began, attempt = None, 0
+        while True:
+            opens_transaction = not self.in_transaction
+            try:
+                result = call(*args)
+            except sqlite3.OperationalError as exc:
+                if not opens_transaction or (exc.sqlite_errorcode & 0xFF) != sqlite3.SQLITE_BUSY:
+                    raise
+                now = time.perf_counter()
+                began = began or now
+                if now - began >= BUSY_TIMEOUT:
+                    self._record(now - began)
+                    raise
+                if self.in_transaction:
+                    self.rollback()
+                time.sleep(BUSY_DELAYS[min(attempt, len(BUSY_DELAYS) - 1)])
+                attempt += 1
+                continue
+            if began is not None:
+                self._record(time.perf_counter() - began)
+            return result
+
+    def _record(self, seconds):
+        with _lock_waits_lock:
+            waits = _lock_waits.setdefault(self.db_name, [0, 0.0])
+            waits[0] += 1
+            waits[1] += seconds
+
+    def execute(self, sql, parameters=()):
+        return self._retry(super().execute, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self._retry(super().executemany, sql, parameters)
+
+    def executescript(self, script):
+        return self._retry(super().executescript, script)
+
+
+def time_lock_waits():
+    """Makes every new pooled connection a LockTimingConnection with busy_timeout off."""
+    from app import db
+
+    def open_connection(pool):
+        conn = sqlite3.connect(pool.path, check_same_thread=False, cached_statements=256,
+                               factory=LockTimingConnection)
+        conn.db_name = os.path.splitext(os.path.basename(pool.path))[0]
+        for pragma in db.PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("PRAGMA busy_timeout=0")
+        return conn
+
+    db.ConnectionPool._open = open_connection
+
+
+def lock_wait_stats():
+    with _lock_waits_lock:
+        return {name: list(waits) for name, waits in _lock_waits.items()}
+
+
+# ----------- MEMORY -----------
+def rss_bytes():
+    """Current resident set size (Linux), falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ----------- CONCURRENT APPTESTS -----------
+def share_app_test_runtime():
+    """Lets several AppTest sessions run at once on different threads.
+
+    Each AppTest run installs a mock Runtime singleton and removes it when it
+    finishes, which breaks any run still in progress on another thread. Keep
+    handing out the most recently installed one instead. Likewise, each run
+    patches the config for its duration and overlapping patches restore each
+    other out of order, so apply that patch once for the whole process. The
+    compiled script is shared too, as in a real server: compiling it on many
+    threads at once trips a CPython 3.11 AST bug.
+    """
+    import contextlib
+    from streamlit import config
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner, util
+
+    config.get_option = util.build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    latest = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            latest["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" not in latest:
+            raise RuntimeError("Runtime hasn't been created!")
+        return latest["runtime"]
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in latest
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    # Session threads touch session state outside a script run, which logs a warning each time
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage())
+
+
+# ----------- ONE SESSION -----------
+def _form_input(app, form, label):
+    return next(t for t in app.text_input if t.label == label and t.form_id == form)
+
+
+def _button(app, label):
+    return next(b for b in app.button if b.label == label)
+
+
+def register(app, index, steps):
+    """Fills the register form, reads the simulated OTP and verifies it."""
+    email = f"load{index}@example.com"
+    _form_input(app, "register_form", "👤 Username").input(f"load{index}")
+    _form_input(app, "register_form", "📧 Email").input(email)
+    _form_input(app, "register_form", "📱 Phone Number").input(f"9{index:09d}")
+    _form_input(app, "register_form", "🔐 Password").input(PASSWORD)
+    _form_input(app, "register_form", "🔁 Confirm Password").input(PASSWORD)
+    steps["register_send_otp"].append(timed(_button(app, "Send OTP").click().run)[0])
+    otp = app.session_state[STATE_KEY].generated_otp
+
+    otp_box = next(t for t in app.text_input if t.label.startswith("📨"))
+    otp_box.input(otp)
+    steps["register_verify"].append(timed(_button(app, "Verify & Register").click().run)[0])
+    return email
+
+
+def log_in(app, email, steps):
+    _form_input(app, "login_form", "📧 Email").input(email)
+    _form_input(app, "login_form", "🔑 Password").input(PASSWORD)
+    # Includes the first dashboard render triggered by the login rerun
+    steps["login"].append(timed(_button(app, "Login").click().run)[0])
+    if not app.session_state[STATE_KEY].logged_in:
+        raise RuntimeError(f"login failed for {email}")
+
+
+def run_session(index, pdf):
+    """Runs one candidate through the whole flow; returns per-step timings in seconds."""
+    steps = {name: [] for name in ("first_render", "register_send_otp", "register_verify", "login")}
+    began = time.perf_counter()
+    app = new_app(HARNESS, bench_pdf=pdf, bench_pdf_name=f"resume{index}.pdf")
+    steps["first_render"].append(timed(app.run)[0])
+    email = register(app, index, steps)
+    log_in(app, email, steps)
+    run_dashboard_flow(app, steps=steps)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    steps["session_total"] = [time.perf_counter() - began]
+    return steps
+
+
+# ----------- LOAD RUN -----------
+def pool_stats():
+    from app import metrics
+    return {dict(labels)["db"]: values for (name, labels), values in metrics.collect().items() if name == "db_pool"}
+
+
+def db_stage_latency():
+    """p50/p99 of every DB helper from the in-process stage histograms."""
+    from app import metrics
+    result = {}
+    for (_, labels), histogram in sorted(metrics.histograms("stage_seconds").items()):
+        stage = dict(labels)["stage"]
+        if stage.startswith("db."):
+            result[stage] = {"n": histogram.count,
+                             "p50_ms": histogram.quantile(0.5) * 1000,
+                             "p99_ms": histogram.quantile(0.99) * 1000}
+    return result
+
+
+def run_load(sessions, concurrency, ramp_up, unique_resumes, pages):
+    from app import metrics
+    resumes = [make_resume_pdf(seed=20000 + i, pages=pages) for i in range(unique_resumes)]
+    share_app_test_runtime()
+    time_lock_waits()
+
+    # Warm up once so imports and the shared LLM client do not count against the first sessions
+    run_session(-1, resumes[0])
+    metrics.reset()
+    pools_before = pool_stats()
+    locks_before = lock_wait_stats()
+    rss_before = rss_bytes()
+
+    steps, errors = {}, []
+    lock = threading.Lock()
+
+    def worker(index):
+        if ramp_up:
+            time.sleep(ramp_up * index / sessions)
+        try:
+            result = run_session(index, resumes[index % unique_resumes])
+        except Exception as exc:
+            with lock:
+                where = traceback.extract_tb(exc.__traceback__)[-1]
+                errors.append(f"session {index}: {type(exc).__name__}: {exc} (line {where.lineno}: {where.line})")
+            return
+        with lock:
+            for name, values in result.items():
+                steps.setdefault(name, []).extend(values)
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="session") as executor:
+        list(executor.map(worker, range(sessions)))
+    wall = time.perf_counter() - began
+
+    pools_after = pool_stats()
+    locks_after = lock_wait_stats()
+    completed = len(steps.get("session_total", []))
+    reruns = sum(len(v) for k, v in steps.items() if not k.endswith(("_ready", "_total")))
+    return {
+        "sessions": sessions,
+        "completed": completed,
+        "errors": errors,
+        "wall_seconds": wall,
+        "throughput": {"sessions_per_sec": completed / wall, "reruns_per_sec": reruns / wall},
+        "steps": {name: summarize(values) for name, values in steps.items()},
+        "sqlite": {
+            "lock_waits": {db: {"waits": locks_after.get(db, [0, 0.0])[0] - locks_before.get(db, [0, 0.0])[0],
+                                "wait_seconds": locks_after.get(db, [0, 0.0])[1] - locks_before.get(db, [0, 0.0])[1]}
+                           for db in pools_after},
+            "pool_waits": {db: {"waits": after["waits"] - pools_before.get(db, {}).get("waits", 0),
+                                "wait_seconds": after["wait_seconds"] - pools_before.get(db, {}).get("wait_seconds", 0),
+                                "open_connections": after["open"]}
+                           for db, after in pools_after.items()},
+            "helpers": db_stage_latency(),
+        },
+        "memory": {
+            "rss_before_bytes": rss_before,
+            "rss_after_bytes": rss_bytes(),
+            "rss_growth_per_session_bytes": (rss_bytes() - rss_before) / max(1, completed),
+            "peak_rss_bytes": peak_rss_bytes(),
+        },
+    }
+
+
+def print_report(report):
+    print(f"\n{report['completed']}/{report['sessions']} sessions in {report['wall_seconds']:.1f} s "
+          f"({report['throughput']['sessions_per_sec']:.2f} sessions/s, "
+          f"{report['throughput']['reruns_per_sec']:.1f} reruns/s)")
+    print(f"{'step':<22}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, s in report["steps"].items():
+        if s["n"]:
+            print(f"{name:<22}{s['n']:>6}{s['p50_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+    for db, waits in report["sqlite"]["pool_waits"].items():
+        locks = report["sqlite"]["lock_waits"][db]
+        print(f"sqlite {db}: {locks['waits']:.0f} lock waits, {locks['wait_seconds'] * 1000:.1f} ms locked out; "
+              f"{waits['waits']:.0f} pool waits, {waits['wait_seconds'] * 1000:.1f} ms waiting, "
+              f"{waits['open_connections']:.0f} connections")
+    for stage, s in report["sqlite"]["helpers"].items():
+        print(f"  {stage:<24}{s['n']:>6} calls  p50 {s['p50_ms']:.2f} ms  p99 {s['p99_ms']:.2f} ms")
+    memory = report["memory"]
+    print(f"RSS {memory['rss_before_bytes'] / 2 ** 20:.0f} -> {memory['rss_after_bytes'] / 2 ** 20:.0f} MiB "
+          f"({memory['rss_growth_per_session_bytes'] / 1024:.0f} KiB per session)")
+    for error in report["errors"][:10]:
+        print(f"  ✗ {error}")
+
+
+def main():
+    args = ARGS
+    concurrency = args.concurrency or args.sessions
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "workdir": WORKDIR,
+        "config": {"sessions": args.sessions, "concurrency": concurrency, "ramp_up": args.ramp_up,
+                   "llm_latency": args.llm_latency, "unique_resumes": args.unique_resumes or args.sessions,
+                   "pages": args.pages},
+    }
+    try:
+        report.update(run_load(args.sessions, concurrency, args.ramp_up, args.unique_resumes or args.sessions,
+                               args.pages))
+    finally:
+        # Question audio is still being rendered into the scratch directory in the background
+        from app import tts
+        tts.get_renderer().wait(timeout=60)
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+    print_report(report)
+    if args.output:
+        output = args.output if os.path.isabs(args.output) else os.path.join(REPO_ROOT, args.output)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {output}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
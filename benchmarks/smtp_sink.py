@@ -0,0 +1,136 @@
+"""Local stand-in SMTP server that accepts and records mail, for outbox tests and benchmarks.
+
+Speaks plain SMTP (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT).
+connect_delay and login_delay simulate the TLS handshake and login a real
+provider costs per connection; fail_rate answers MAIL with a temporary 451 error.
+
+    python benchmarks/smtp_sink.py --port 8025 --connect-delay 0.2
+    EMAIL_SENDER=bot@example.com RESUMEBOT_SMTP_HOST=localhost RESUMEBOT_SMTP_PORT=8025 \\
+        RESUMEBOT_SMTP_SSL=0 python -m streamlit run main.py
+"""
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, connect_delay=0.0, login_delay=0.0, fail_rate=0.0, seed=0):
+        super().__init__((host, port), _Handler)
+        self.connect_delay = connect_delay
+        self.login_delay = login_delay
+        self.fail_rate = fail_rate
+        self._random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.messages = []          # (recipients, raw message) in arrival order
+        self.connections = 0
+        self.logins = 0
+        self.rejected = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        """Serves on a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def should_fail(self):
+        with self.lock:
+            fail = self.fail_rate and self._random.random() < self.fail_rate
+            self.rejected += bool(fail)
+            return fail
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(server.connect_delay)
+        self.reply("220 sink ESMTP ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-sink")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 sink")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    for prompt in ("VXNlcm5hbWU6", "UGFzc3dvcmQ6"):   # "Username:", "Password:"
+                        self.reply(f"334 {prompt}")
+                        self.rfile.readline()
+                time.sleep(server.login_delay)
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL":
+                recipients = []
+                if server.should_fail():
+                    self.reply("451 Temporary failure, try again later")
+                else:
+                    self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[-1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                with server.lock:
+                    server.messages.append((recipients, b"".join(lines)))
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds before the greeting")
+    parser.add_argument("--login-delay", type=float, default=0.0, help="seconds to accept a login")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of messages refused with 451")
+    args = parser.parse_args()
+    sink = SMTPSink(args.host, args.port, args.connect_delay, args.login_delay, args.fail_rate).start()
+    print(f"SMTP sink listening on {args.host}:{sink.port}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"{sink.connections} connections, {sink.logins} logins, {len(sink.messages)} messages, "
+                  f"{sink.rejected} refused")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
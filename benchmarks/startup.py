@@ -0,0 +1,119 @@
+"""Cold-start benchmark: import time and first render of the login page.
+
+Each measurement runs in a fresh Python process so nothing is already imported.
+Pass --compare REV to run the same measurements against an older git revision
+(for example the commit before lazy imports) and print both side by side.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --compare HEAD~1 --output bench_startup.json
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Time importing main.py's module-level dependencies without executing the Streamlit script
+IMPORT_PROBE = r"""
+import ast, json, sys, time
+sys.path.insert(0, {root!r})
+source = open({main!r}, encoding="utf-8").read()
+imports = [node for node in ast.parse(source).body if isinstance(node, (ast.Import, ast.ImportFrom))]
+code = compile(ast.Module(body=imports, type_ignores=[]), "main_imports", "exec")
+began = time.perf_counter()
+exec(code, {{}})
+elapsed = time.perf_counter() - began
+print(json.dumps({{"import_seconds": elapsed, "modules_loaded": len(sys.modules)}}))
+"""
+
+# Time the first full script run for a logged-out user (the login page)
+RENDER_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+began = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness_loaded = time.perf_counter()
+app = AppTest.from_file({main!r}, default_timeout=60)
+app.run()
+done = time.perf_counter()
+print(json.dumps({{
+    "first_render_seconds": done - harness_loaded,
+    "harness_import_seconds": harness_loaded - began,
+    "exceptions": [str(e.value) for e in app.exception],
+    "modules_loaded": len(sys.modules),
+}}))
+"""
+
+
+def run_probe(template, root, repeat):
+    """Runs a probe script `repeat` times in fresh interpreters and returns the parsed results."""
+    main = os.path.join(root, "main.py")
+    env = dict(os.environ, GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "benchmark-key"))
+    results = []
+    for _ in range(repeat):
+        # Run from a scratch directory so the login page's sqlite files do not touch the repo
+        with tempfile.TemporaryDirectory() as workdir:
+            proc = subprocess.run([sys.executable, "-c", template.format(root=root, main=main)],
+                                  cwd=workdir, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1:] or ["probe failed"]}
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def summarize(results, field):
+    if isinstance(results, dict):
+        return results
+    values = [r[field] for r in results]
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+        "runs": len(values),
+        "modules_loaded": results[-1]["modules_loaded"],
+        "exceptions": results[-1].get("exceptions", []),
+    }
+
+
+def measure(root, repeat):
+    return {
+        "import": summarize(run_probe(IMPORT_PROBE, root, repeat), "import_seconds"),
+        "login_first_render": summarize(run_probe(RENDER_PROBE, root, repeat), "first_render_seconds"),
+    }
+
+
+def export_revision(rev, target):
+    """Extracts the tree at a git revision into a directory."""
+    archive = subprocess.run(["git", "-C", REPO_ROOT, "archive", rev], capture_output=True, check=True)
+    with tarfile.open(fileobj=io.BytesIO(archive.stdout)) as tar:
+        tar.extractall(target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh-process runs per measurement")
+    parser.add_argument("--compare", metavar="REV", help="also measure this git revision")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    report = {"current": measure(REPO_ROOT, args.repeat)}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as old_root:
+            export_revision(args.compare, old_root)
+            report[args.compare] = measure(old_root, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+"""Headless benchmark suite for ResumeBot using a fake LLM and synthetic resumes.
+
+Measures PDF extraction throughput, resume similarity index lookups, batch
+resume-vs-job-description scoring, model routing and timeout fallback, question audio
+rendering, OTP email delivery through the outbox, per-rerun latency of login(), the
+interview dashboard and uploads(), latency of the sqlite helpers in app/login.py, and
+memory per session. Everything runs in a scratch directory, deleted at the end, with the fake model
+(app/fake_llm.py), so results are deterministic and no API key is needed.
+
+    python benchmarks/suite.py --output bench_results.json
+    python benchmarks/suite.py --baseline bench_results.json   # compare against an earlier run
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+MAIN = os.path.join(REPO_ROOT, "main.py")
+HARNESS = os.path.join(BENCH_DIR, "dashboard_harness.py")
+
+# Isolate every database, cache and image the app writes, and use the fake model.
+# This must happen before any app module is imported, since they read settings at import time.
+WORKDIR = tempfile.mkdtemp(prefix="resumebot-bench-")
+os.environ.update({
+    "RESUMEBOT_FAKE_LLM": "1",
+    "RESUMEBOT_FAKE_LLM_LATENCY": os.environ.get("RESUMEBOT_FAKE_LLM_LATENCY", "0.05"),
+    "RESUMEBOT_DB": os.path.join(WORKDIR, "resume_bot.db"),
+    "RESUMEBOT_CACHE_DIR": os.path.join(WORKDIR, "cache"),
+    "RESUMEBOT_IMAGE_DIR": os.path.join(WORKDIR, "images"),
+    "RESUMEBOT_OFFLINE": "1",
+    "RESUMEBOT_JD_DIR": os.path.join(REPO_ROOT, "assets", "job_descriptions"),
+    "RESUMEBOT_LLM_RATE": "0",
+    "RESUMEBOT_TTS_BACKEND": "fake",
+    "RESUMEBOT_FAKE_TTS_LATENCY": os.environ.get("RESUMEBOT_FAKE_TTS_LATENCY", "0.1"),
+    "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "benchmark-key"),
+})
+os.chdir(WORKDIR)
+sys.path[:0] = [REPO_ROOT, BENCH_DIR]
+
+from synthetic import make_resume_pdf, resume_lines  # noqa: E402
+
+
+# ----------- HELPERS -----------
+def summarize(values):
+    """Latency summary in milliseconds."""
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "n": len(values),
+        "mean_ms": statistics.fmean(values) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def timed(fn, *args, **kwargs):
+    began = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - began, result
+
+
+def new_app(script=HARNESS, **state):
+    """Returns a Streamlit AppTest with the given session state preset."""
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(script, default_timeout=120)
+    for key, value in state.items():
+        app.session_state[key] = value
+    return app
+
+
+def logged_in_state(index, pdf=None):
+    from app.session import STATE_KEY, Session
+    state = {STATE_KEY: Session(logged_in=True, username=f"bench{index}", email=f"bench{index}@example.com",
+                                phone="+910000000000")}
+    if pdf is not None:
+        state.update(bench_pdf=pdf, bench_pdf_name=f"resume{index}.pdf")
+    return state
+
+
+def _state(app, key, default=None):
+    """Reads a field of the app's Session (see app/session.py)."""
+    from app.session import STATE_KEY
+    try:
+        return getattr(app.session_state[STATE_KEY], key)
+    except KeyError:
+        return default
+
+
+def wait_for_job(app, state_key, timings, poll=0.02, timeout=60):
+    """Reruns the script until the background job referenced by state_key has finished."""
+    from app import jobs
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get_job(_state(app, state_key))
+        if job is not None and job.finished:
+            return job
+        time.sleep(poll)
+        timings.append(timed(app.run)[0])
+    raise TimeoutError(f"job {state_key} did not finish")
+
+
+def run_dashboard_flow(app, answer="I led the migration of our reporting pipeline to Kafka.", steps=None):
+    """Drives one session through upload -> questions -> answer -> feedback and records step latencies."""
+    steps = steps if steps is not None else {}
+    steps.setdefault("upload_rerun", []).append(timed(app.run)[0])
+
+    # Questions are generated in the background; reruns poll until they are in
+    poll_timings = steps.setdefault("poll_rerun", [])
+    began = time.perf_counter()
+    while _state(app, "questions") is None:
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+        time.sleep(0.02)
+        poll_timings.append(timed(app.run)[0])
+    steps.setdefault("questions_ready", []).append(time.perf_counter() - began)
+
+    # The answer box is in a form, so typing does not rerun anything until feedback is requested
+    next(t for t in app.text_area if t.label.startswith("✍️")).input(answer)
+    button = next(b for b in app.button if b.label == "🚀 Get Feedback")
+    began = time.perf_counter()
+    steps.setdefault("feedback_click_rerun", []).append(timed(button.click().run)[0])
+    wait_for_job(app, "feedback_job", poll_timings)
+    steps.setdefault("feedback_ready", []).append(time.perf_counter() - began)
+    return steps
+
+
+# ----------- BENCHMARKS -----------
+def bench_pdf_extraction(page_counts, repeat):
+    from app.pdf_extract import extract_pdf
+    from app.resume_cache import ResumeTextCache
+    results = []
+    for pages in page_counts:
+        data = make_resume_pdf(seed=pages, pages=pages)
+        durations = [timed(extract_pdf, data, max_pages=10 ** 6, time_budget=10 ** 6)[0] for _ in range(repeat)]
+        best = min(durations)
+        cache = ResumeTextCache(os.path.join(WORKDIR, "cache", f"bench_resume_{pages}.db"))
+        cache.get_or_extract(data)
+        cached = [timed(cache.get_or_extract, data)[0] for _ in range(repeat)]
+        results.append({
+            "pages": pages,
+            "bytes": len(data),
+            "extract": summarize(durations),
+            "pages_per_sec": pages / best,
+            "mb_per_sec": len(data) / best / 1e6,
+            "cached_lookup": summarize(cached),
+        })
+    return results
+
+
+def bench_resume_index(size, lookups):
+    """Insert and near-duplicate lookup latency of the resume similarity index at a given size."""
+    from app.resume_index import ResumeIndex
+    index = ResumeIndex(os.path.join(WORKDIR, "cache", f"bench_index_{size}.db"), max_entries=size)
+    texts = ["\n".join(resume_lines(30000 + i, 60)) for i in range(size)]
+    inserts = [timed(index.add, text, "bench", f"questions {i}")[0] for i, text in enumerate(texts)]
+
+    # Lightly edited copies of indexed resumes should hit; unseen resumes should miss
+    hits, misses = [], []
+    found = 0
+    for i in range(lookups):
+        lines = texts[i * size // lookups].split("\n")
+        lines.insert(len(lines) // 2, "- Mentored two junior engineers.")
+        elapsed, match = timed(index.find, "\n".join(lines), "bench")
+        hits.append(elapsed)
+        found += match is not None
+        misses.append(timed(index.find, "\n".join(resume_lines(90000 + i, 60)), "bench")[0])
+    return {"entries": size, "insert": summarize(inserts), "near_duplicate_lookup": summarize(hits),
+            "unseen_lookup": summarize(misses), "recall": found / lookups}
+
+
+def bench_job_match(resumes, repeat):
+    """Scoring a stack of resumes against the job description library in one batch."""
+    from app.jd_match import JobLibrary
+    library = JobLibrary()
+    texts = ["\n".join(resume_lines(40000 + i, 60)) for i in range(resumes)]
+    batch = [timed(library.score, texts)[0] for _ in range(repeat)]
+    single = [timed(library.score, [text])[0] for text in texts[:200]]
+    return {"resumes": resumes, "job_descriptions": len(library.jds), "batch": summarize(batch),
+            "resumes_per_sec": resumes / statistics.median(batch), "single_resume": summarize(single)}
+
+
+def bench_llm_router(calls, primary_latency=0.2, fast_latency=0.05):
+    """Feedback latency on the primary model alone vs. routed, and the cost of a timeout fallback."""
+    from app.fake_llm import FakeLLM
+    from app.llm import get_feedback, recent_latencies, stream_feedback
+    from app.llm_client import ResilientLLM, TokenBucket
+    from app.llm_router import ModelRouter
+
+    limiter = TokenBucket(rate=0)
+
+    def wrapped(name, latency):
+        return ResilientLLM(FakeLLM(model=name, latency=latency), limiter)
+
+    primary = wrapped("bench-primary", primary_latency)
+    single = [timed(get_feedback, primary, f"question {i}", "answer", bypass_cache=True)[0] for i in range(calls)]
+    router = ModelRouter([wrapped("bench-primary", primary_latency), wrapped("bench-fast", fast_latency)])
+    routed = [timed(get_feedback, router, f"question {i}", "answer", bypass_cache=True)[0] for i in range(calls)]
+    models = [entry["model"] for entry in recent_latencies("feedback")[-calls:]]
+
+    hanging = ModelRouter([wrapped("bench-hang", 5.0), wrapped("bench-fast", fast_latency)], timeout=primary_latency)
+    fallback = [timed(lambda i=i: "".join(stream_feedback(hanging, f"q{i}", "a", bypass_cache=True)))[0]
+                for i in range(min(calls, 5))]
+    return {
+        "feedback_single_model": summarize(single),
+        "feedback_routed": summarize(routed),
+        "routed_to_fast_share": models.count("bench-fast") / len(models),
+        "stream_timeout_fallback": summarize(fallback),
+        "fallbacks": hanging.stats()["fallbacks"],
+    }
+
+
+def bench_tts(users, question_sets=5, questions=10):
+    """Question audio for many users sharing a few question sets: synthesis count, time to ready, playback."""
+    from app.tts import AudioStore, SpeechRenderer
+
+    sets = [[f"{q + 1}. Tell me about project {s}-{q} on your resume?" for q in range(questions)]
+            for s in range(question_sets)]
+    store = AudioStore(os.path.join(WORKDIR, "tts_bench"), os.path.join(WORKDIR, "tts_bench.db"))
+    renderer = SpeechRenderer(store, backend="fake", workers=4)
+    began = time.perf_counter()
+    enqueue = [timed(renderer.render, sets[user % question_sets])[0] for user in range(users)]
+    renderer.wait(timeout=120)
+    ready = time.perf_counter() - began
+    # Later users get the question numbered differently; the spoken text, and so the clip, is the same
+    renumbered = [f"Q{q + 1}: {text.split('. ', 1)[1]}" for q, text in enumerate(sets[0])]
+    play = [timed(renderer.audio, question)[0] for question in renumbered * 5]
+    stats = renderer.stats()
+    return {
+        "users": users,
+        "unique_questions": question_sets * questions,
+        "synthesized": stats["synthesized"],
+        "deduplicated": stats["deduplicated"],
+        "render_enqueue": summarize(enqueue),
+        "all_ready_s": ready,
+        "cached_playback": summarize(play),
+        "synthesis_ms_estimate": float(os.environ["RESUMEBOT_FAKE_TTS_LATENCY"]) * 1000,
+    }
+
+
+def bench_outbox(messages, connect_delay=0.05):
+    """OTP delivery through the outbox vs. one SMTP connection and login per message, against a local sink."""
+    import smtplib
+    from email.message import EmailMessage
+    from app.outbox import Outbox, SMTPSettings
+    from smtp_sink import SMTPSink
+
+    sink = SMTPSink(connect_delay=connect_delay, login_delay=connect_delay).start()
+    settings = SMTPSettings(host="127.0.0.1", port=sink.port, use_ssl=False, username="bot@example.com",
+                            password="secret", sender="bot@example.com")
+
+    def send_directly(i):
+        message = EmailMessage()
+        message["Subject"], message["From"], message["To"] = "OTP", settings.sender, f"user{i}@example.com"
+        message.set_content(f"Your OTP is: {100000 + i}")
+        with smtplib.SMTP(settings.host, settings.port) as smtp:
+            smtp.login(settings.username, settings.password)
+            smtp.send_message(message)
+
+    direct = [timed(send_directly, i)[0] for i in range(min(messages, 50))]
+    direct_connections = sink.connections
+
+    sink.fail_rate = 0.05
+    outbox = Outbox(settings, retry_base=0.05, poll_interval=0.05).start()
+    began = time.perf_counter()
+    enqueue = [timed(outbox.send_otp, f"user{i}@example.com", str(100000 + i))[0] for i in range(messages)]
+    delivered = outbox.wait_until_empty(timeout=120)
+    wall = time.perf_counter() - began
+    stats = outbox.stats()
+    outbox.stop()
+    sink.stop()
+    from app import metrics
+    delivery = metrics.histograms("outbox_delivery_seconds")
+    histogram = next(iter(delivery.values())) if delivery else None
+    return {
+        "direct_per_message": summarize(direct),
+        "direct_connections": direct_connections,
+        "outbox_enqueue": summarize(enqueue),
+        "outbox_delivery_p50_ms": histogram.quantile(0.5) * 1000 if histogram else None,
+        "outbox_delivery_p99_ms": histogram.quantile(0.99) * 1000 if histogram else None,
+        "outbox_messages_per_sec": messages / wall,
+        "outbox_all_delivered": delivered,
+        "outbox_connections": stats["connections_opened"],
+        "outbox_retries": stats["retries"],
+    }
+
+
+def bench_db(iterations):
+    from app import db, login
+    results = {name: [] for name in ("add_user", "email_exists", "validate_user", "update_phone",
+                                     "record_upload", "list_uploads")}
+    for i in range(iterations):
+        email = f"dbbench{i}@example.com"
+        results["add_user"].append(timed(login.add_user, f"user{i}", "secret", email, "+91")[0])
+        results["email_exists"].append(timed(login.email_exists, email)[0])
+        results["validate_user"].append(timed(login.validate_user, email, "secret")[0])
+        results["update_phone"].append(timed(db.update_phone, email, f"+91{i}")[0])
+        results["record_upload"].append(timed(db.record_upload, email, f"hash{i}", "resume.pdf")[0])
+        results["list_uploads"].append(timed(db.list_uploads, email)[0])
+    return {name: summarize(values) for name, values in results.items()}
+
+
+def bench_login(repeat):
+    first, rerun = [], []
+    for _ in range(repeat):
+        app = new_app(MAIN)
+        first.append(timed(app.run)[0])
+        rerun.append(timed(app.run)[0])
+    return {"first_render": summarize(first), "rerun": summarize(rerun)}
+
+
+def bench_dashboard(sessions, pages):
+    """Full dashboard reruns per step, plus the body time of each fragment (what a panel rerun costs)."""
+    from app import metrics
+    metrics.reset()
+    steps = {}
+    for i in range(sessions):
+        app = new_app(**logged_in_state(i, make_resume_pdf(seed=1000 + i, pages=pages)))
+        run_dashboard_flow(app, steps=steps)
+    results = {step: summarize(values) for step, values in steps.items()}
+    for (_, labels), histogram in sorted(metrics.histograms("stage_seconds").items()):
+        stage = dict(labels)["stage"]
+        if stage.startswith(("fragment.", "page.dashboard")):
+            results[stage] = {"n": histogram.count, "p50_ms": histogram.quantile(0.5) * 1000,
+                              "p99_ms": histogram.quantile(0.99) * 1000}
+    return results
+
+
+def bench_uploads(repeat):
+    from app import db
+    email = "benchuploads@example.com"  # Matches logged_in_state("uploads")
+    for i in range(200):
+        db.record_upload(email, f"h{i}", f"resume{i}.pdf")
+    timings = []
+    app = new_app(MAIN, **logged_in_state("uploads"))
+    app.run()
+    app.sidebar.radio[0].set_value("📁 Recent Uploads")
+    for _ in range(repeat):
+        timings.append(timed(app.run)[0])
+    return {"rerun": summarize(timings)}
+
+
+def bench_memory(sessions, pages):
+    """Python heap growth per live session after the full dashboard flow."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    apps = []
+    for i in range(sessions):
+        app = new_app(**logged_in_state(5000 + i, make_resume_pdf(seed=5000 + i, pages=pages)))
+        run_dashboard_flow(app)
+        apps.append(app)
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    from app.session import get_accountant
+    stats = get_accountant().stats()
+    return {"sessions": sessions, "bytes_per_session": (after - before) / sessions, "peak_bytes": peak - before,
+            "accounted_bytes_per_session": stats["mean_session_bytes"], "shared_blob_bytes": stats["blob_bytes"]}
+
+
+# ----------- REPORTING -----------
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", REPO_ROOT, "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(data, prefix=""):
+    """Flattens nested results into {"a.b.c": number} for comparisons."""
+    items = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            items.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for value in data:
+            label = f"{value.get('pages')}p" if isinstance(value, dict) and "pages" in value else str(data.index(value))
+            items.update(flatten(value, f"{prefix}{label}."))
+    elif isinstance(data, (int, float)):
+        items[prefix.rstrip(".")] = data
+    return items
+
+
+def compare(current, baseline):
+    """Prints metrics that moved by more than 10% against a baseline run."""
+    old = flatten(baseline["results"])
+    new = flatten(current["results"])
+    print(f"\nCompared with {baseline.get('revision')}:")
+    for key in sorted(new):
+        if key in old and old[key] and (key.endswith("_ms") or key.endswith("_per_sec") or "bytes_per" in key):
+            ratio = new[key] / old[key]
+            if abs(ratio - 1) > 0.10:
+                better = ratio > 1 if key.endswith("_per_sec") else ratio < 1
+                print(f"  {'✓' if better else '✗'} {key}: {old[key]:.2f} -> {new[key]:.2f} ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 50], help="PDF page counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sessions", type=int, default=5, help="dashboard sessions to drive")
+    parser.add_argument("--db-iterations", type=int, default=200)
+    parser.add_argument("--index-size", type=int, default=10000, help="resumes in the similarity index benchmark")
+    parser.add_argument("--match-resumes", type=int, default=1000, help="resumes in the job match benchmark")
+    parser.add_argument("--router-calls", type=int, default=50, help="feedback calls in the model router benchmark")
+    parser.add_argument("--tts-users", type=int, default=100, help="users requesting question audio")
+    parser.add_argument("--emails", type=int, default=500, help="OTP emails in the outbox benchmark")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+    output = os.path.join(REPO_ROOT, args.output) if not os.path.isabs(args.output) else args.output
+    baseline = None
+    if args.baseline:
+        # Read the baseline first: it may be the same file this run overwrites
+        baseline_path = args.baseline if os.path.isabs(args.baseline) else os.path.join(REPO_ROOT, args.baseline)
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    try:
+        results = {
+            "pdf_extraction": bench_pdf_extraction(args.pages, args.repeat),
+            "db": bench_db(args.db_iterations),
+            "resume_index": bench_resume_index(args.index_size, lookups=200),
+            "job_match": bench_job_match(args.match_resumes, args.repeat),
+            "llm_router": bench_llm_router(args.router_calls),
+            "tts": bench_tts(args.tts_users),
+            "outbox": bench_outbox(args.emails),
+            "login": bench_login(args.repeat),
+            "dashboard": bench_dashboard(args.sessions, pages=2),
+            "uploads": bench_uploads(args.repeat),
+            "memory": bench_memory(args.sessions, pages=2),
+        }
+    finally:
+        # Question audio is still being rendered into the scratch directory in the background
+        from app import tts
+        tts.get_renderer().wait(timeout=60)
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fake_llm_latency": float(os.environ["RESUMEBOT_FAKE_LLM_LATENCY"]),
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        compare(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
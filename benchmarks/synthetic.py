@@ -0,0 +1,73 @@
+"""Deterministic synthetic resumes and PDFs for benchmarks (no third-party PDF writer needed)."""
+import random
+
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "Karthik", "Priya", "Arjun", "Divya", "Vikram", "Lakshmi", "Sanjay"]
+LAST_NAMES = ["Kumar", "Iyer", "Nair", "Reddy", "Sharma", "Menon", "Rao", "Pillai", "Das", "Gupta"]
+ROLES = ["Software Engineer", "Data Analyst", "Backend Developer", "ML Engineer", "DevOps Engineer",
+         "Frontend Developer", "QA Engineer", "Product Analyst"]
+COMPANIES = ["Infosys", "TCS", "Zoho", "Freshworks", "Wipro", "Flipkart", "Swiggy", "Razorpay", "HCL"]
+SKILLS = ["Python", "SQL", "Streamlit", "Django", "Flask", "React", "Docker", "Kubernetes", "AWS", "GCP",
+          "Pandas", "NumPy", "TensorFlow", "PyTorch", "Git", "Linux", "Java", "Spring", "Kafka", "Redis",
+          "PostgreSQL", "MongoDB", "REST APIs", "CI/CD", "Terraform", "Tableau", "Power BI", "Scikit-learn"]
+VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Automated", "Maintained", "Launched", "Scaled"]
+THINGS = ["a payments service", "the reporting pipeline", "an internal dashboard", "search ranking",
+          "the CI pipeline", "a recommendation model", "customer onboarding flows", "the data warehouse"]
+DEGREES = ["B.E. Computer Science", "B.Tech Information Technology", "M.Sc Data Science", "MCA"]
+
+
+def resume_lines(seed, target_lines=40):
+    """Returns the lines of a synthetic resume; the same seed always gives the same resume."""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.split()[0].lower()}{seed}@example.com | +91 9{rng.randrange(10**8, 10**9)}", "",
+             "Summary",
+             f"{rng.choice(ROLES)} with {rng.randint(1, 12)} years of experience in "
+             f"{', '.join(rng.sample(SKILLS, 3))}.", "",
+             "Skills", ", ".join(rng.sample(SKILLS, rng.randint(6, 12))), "",
+             "Experience"]
+    while len(lines) < target_lines - 4:
+        lines.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({rng.randint(2012, 2020)}-{rng.randint(2021, 2025)})")
+        for _ in range(rng.randint(2, 4)):
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(THINGS)} using {rng.choice(SKILLS)}, "
+                         f"improving throughput by {rng.randint(10, 80)}%.")
+    lines += ["", "Education", f"{rng.choice(DEGREES)}, {rng.randint(2008, 2020)}"]
+    return lines
+
+
+def resume_text(seed, target_lines=40):
+    return "\n".join(resume_lines(seed, target_lines))
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def make_pdf(pages):
+    """Builds a PDF from a list of pages, each a list of text lines, using the built-in Helvetica font."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        stream = b"BT /F1 10 Tf 14 TL 50 790 Td " + b" ".join(b"(" + _escape(line) + b") Tj T*" for line in lines) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def make_resume_pdf(seed, pages=1, lines_per_page=50):
+    """Returns PDF bytes of a synthetic resume spanning the given number of pages."""
+    lines = resume_lines(seed, target_lines=pages * lines_per_page)
+    return make_pdf([lines[i:i + lines_per_page] for i in range(0, pages * lines_per_page, lines_per_page)])
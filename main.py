@@ -1,14 +1,10 @@
 # Import core libraries
 import streamlit as st                                     # Web framework for UI
-from datetime import datetime                              # To timestamp uploads
 import os                                                  # For environment variables
+import hashlib                                             # Job match cache keys
 from dotenv import load_dotenv                             # Load .env file
-from pypdf import PdfReader                                # PDF parsing library
-from langchain.chains import LLMChain                      # LangChain chain handler for LLM workflows
-from langchain_google_genai import ChatGoogleGenerativeAI  # Google Gemini LLM wrapper
-from pydantic import SecretStr                             # Secure string wrapper for sensitive info
-from langchain.prompts import PromptTemplate               # Template prompt for LLM inputs
-import speech_recognition as sr                            # Speech-to-text for voice input
+# Heavy libraries (langchain, pypdf, speech_recognition, Pillow) are imported lazily
+# inside the functions that need them, so the login page renders without loading them.
 
 # Import custom app pages (modules) from 'app' folder
 # main.py
@@ -16,6 +12,16 @@ from app.login import login
 from app.profile import profile
 from app.uploads import uploads
 from app.settings import settings
+from app.performance import performance, is_admin
+from app.resume_cache import load_resume, file_digest
+from app import db
+from app.images import image_data_uri
+from app import voice, jobs, metrics, outbox, tts
+from app.session import get_session
+from app.resume_prep import prepare_resume
+from app.resume_index import get_resume_index
+from app.jd_match import get_job_library, parse_job_descriptions
+from app.llm import stream_questions, stream_feedback, grade_answers, model_name
 
 
 # Set the Streamlit app page configuration with a title and favicon
@@ -23,6 +29,11 @@ st.set_page_config(page_title="ResumeBot - AI Interview Coach", page_icon="🤖"
 
 # Load environment variables from a .env file
 load_dotenv()
+
+# Write stage timings to RESUMEBOT_METRICS_FILE in Prometheus format, if configured (one thread per process)
+metrics.start_exporter()
+# Deliver queued OTP emails in the background, if EMAIL_SENDER is configured (threads start once per process)
+outbox.start()
 # Get the API key from environment variables
 
 # Read API key from Streamlit secrets
@@ -31,39 +42,33 @@ load_dotenv()
 def get_google_api_key():
     try:
         return st.secrets["GOOGLE_API_KEY"]
-    except KeyError:
+    except (KeyError, FileNotFoundError):
         api_key = os.getenv("GOOGLE_API_KEY")
         if api_key:
             return api_key
         else:
             raise ValueError("❌ GOOGLE_API_KEY not found in secrets or environment variables.")
 
-api_key = get_google_api_key()
-
-# Step 2: Initialize the Google Gemini AI model with the API key
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=api_key)
-
+# Step 2: Initialize the Google Gemini AI models with the API key.
+# The clients are created on first use and shared by every session in the process. Each is wrapped
+# so identical in-flight requests are coalesced, calls are rate limited and quota errors retried,
+# and a router picks the model per task (RESUMEBOT_LLM_MODELS) and falls back on timeouts.
+# Set RESUMEBOT_FAKE_LLM=1 to use local fake models instead (tests, benchmarks, offline demos).
+@st.cache_resource
+def get_llm():
+    from app.llm_client import create_llm
+    llm = create_llm(get_google_api_key)
+    metrics.register_collector("llm_client", llm.stats, model=llm.model)
+    for name in llm.models:
+        metrics.register_collector("llm_route", lambda name=name: llm.route_stats(name), model=name)
+    return llm
 
-# Define default session state values to persist across user sessions
-default_session = {
-    "logged_in": False,
-    "username": "",
-    "email": "",
-    "phone": "",
-    "account_type": "User",
-    "password": "",
-    "profile_image": "https://cdn-icons-png.flaticon.com/512/3135/3135715.png",
-    "upload_history": [],   # Stores metadata of uploaded resumes
-    "questions": None,      # Generated interview questions storage
-    "voice_answer": ""      # Voice input text
-}
 
-# Initialize session state keys if not already set (avoid overwriting existing data)
-for k, v in default_session.items():
-    st.session_state.setdefault(k, v)
+# Typed per-session state (see app/session.py); large values live in a shared blob store
+session = get_session()
 
 # If user is not logged in, show login page and halt further execution
-if not st.session_state.logged_in:
+if not session.logged_in:
     login()
     st.stop()
 
@@ -74,94 +79,312 @@ with st.sidebar:
         <img src="{}" width="100">
         <h4 style="margin-top: 10px; text-decoration: underline;">{}</h4>
     </div>
-    """.format(st.session_state.profile_image, st.session_state.username), unsafe_allow_html=True)
+    """.format(image_data_uri(session.profile_image, "sidebar"), session.username),
+        unsafe_allow_html=True)
 
-    page = st.radio("🌐 Navigation", ["🏠 Dashboard", "🧑‍💼 Profile", "📁 Recent Uploads", "⚙️ Settings"])
+    pages = ["🏠 Dashboard", "🧑‍💼 Profile", "📁 Recent Uploads", "⚙️ Settings"]
+    if is_admin(session.email):
+        pages.append("📈 Performance")  # Hidden from everyone not listed in RESUMEBOT_ADMIN_EMAILS
+    page = st.radio("🌐 Navigation", pages)
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
     if st.button("🚪 Logout"):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
+        st.session_state.clear()
         st.rerun()
 
+# Voice panel: starts background transcription jobs and polls them while they run,
+# so the page stays responsive and partial text appears as each chunk is recognized.
+# Recording, uploading and switching recognizers rerun only this panel.
+@st.fragment
+@metrics.timed("fragment.voice")
+def voice_panel():
+    session = get_session()
+    recognizers = voice.available_recognizers()
+    recognizer = st.selectbox("🗣️ Recognizer", recognizers,
+                              index=recognizers.index(voice.DEFAULT_RECOGNIZER)
+                              if voice.DEFAULT_RECOGNIZER in recognizers else 0)
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        if st.button("🎤 Record"):
+            session.voice_job = voice.start_microphone(recognizer).id
+    with col2:
+        audio_file = st.file_uploader("…or upload a recording (WAV/AIFF/FLAC)", type=["wav", "aiff", "aif", "flac"])
+        if audio_file and session.voice_audio_file != audio_file.file_id:
+            session.voice_audio_file = audio_file.file_id
+            session.voice_job = voice.start_file(audio_file.getvalue(), recognizer).id
+
+    job = voice.get_job(session.voice_job)
+
+    # Re-run only this panel every half second while a job is in progress
+    @st.fragment(run_every=0.5 if job and not job.finished else None)
+    def show_progress():
+        current = voice.get_job(session.voice_job)
+        if current is None:
+            st.write(session.voice_answer)
+        elif not current.finished:
+            st.info("Listening..." if current.status == "listening" else f"Transcribing... {current.text}")
+        else:
+            session.voice_job = None
+            if current.status == "error" or not current.text:
+                st.error(f"Voice not recognized. {current.error or ''}")
+            else:
+                session.voice_answer = current.text
+                st.success(f"You said: {current.text} ({current.latency:.1f} s)")
+                st.rerun()  # Full rerun so the answer panel shows that the voice answer will be used
+
+    show_progress()
+
+# Shows the streamed output of a running background job, polling it without rerunning the
+# whole page, and triggers one full rerun when it finishes so the page can use the result
+def poll_job(job_id, waiting_message="⏳ Working..."):
+    @st.fragment(run_every=0.5)
+    def poll():
+        job = jobs.get_job(job_id)
+        if job is None or job.finished:
+            st.rerun()
+        st.markdown(job.partial or waiting_message)
+
+    poll()
+
+# Questions are split once per question set, not on every rerun
+@st.cache_data(max_entries=1000, show_spinner=False)
+def split_questions(text):
+    return [q for q in text.split("\n") if q.strip()]
+
+# Question list and selection; picking another question reruns only this panel
+@st.fragment
+@metrics.timed("fragment.questions")
+def questions_panel(questions, file_id):
+    session = get_session()
+    st.subheader("🎯 Interview Questions:")
+    if session.reused_questions:
+        st.caption(f"♻️ Reused the questions of a {session.reused_questions:.0%} similar resume.")
+        if st.button("🔄 Generate Fresh Questions"):
+            session.fresh_questions_for = file_id
+            session.questions = None
+            session.questions_job = None
+            session.reused_questions = None
+            st.rerun()
+    st.write(questions)
+    # The answer panel reads the selection from session state when feedback is requested
+    st.selectbox("👉 Select a question to answer:", questions, key="selected_question")
+    question_audio(st.session_state.get("selected_question"))
+
+# Plays the selected question's clip, rendered in the background when the question set was created.
+# Only while a clip is still being synthesized does this poll, and it reruns the page once it is ready.
+def question_audio(question):
+    if not question or not tts.enabled():
+        return
+    status = tts.get_renderer().status(question)
+
+    @st.fragment(run_every=0.5 if status == "pending" else None)
+    def player():
+        audio = tts.get_renderer().audio(question)
+        if audio is not None:
+            if status == "pending":
+                st.rerun()  # Stop polling
+            st.audio(audio, format="audio/wav")
+        elif tts.get_renderer().status(question) == "error":
+            st.caption("🔇 No audio for this question.")
+        else:
+            st.caption("🔊 Preparing audio...")
+
+    player()
+
+# Answer editor and feedback; typing costs nothing (it is a form) and submitting reruns only this panel
+@st.fragment
+@metrics.timed("fragment.answer")
+def answer_panel(llm):
+    session = get_session()
+    with st.form("answer_form"):
+        user_answer = st.text_area("✍️ OR Type your Answer:")
+        if session.voice_answer:
+            st.caption("🎙️ Your recorded voice answer is sent when there is one.")
+        submitted = st.form_submit_button("🚀 Get Feedback")
+
+    # Button to generate AI feedback on user's answer (double clicks join the same job)
+    if submitted:
+        # Use voice answer if provided, else fallback to typed answer
+        final_answer = session.voice_answer or user_answer
+        selected_question = st.session_state.get("selected_question")
+        if final_answer and selected_question:
+            job = jobs.submit("feedback", jobs.job_key("feedback", model_name(llm), selected_question, final_answer),
+                              stream_feedback, llm, selected_question, final_answer)
+            session.feedback_job = job.id
+        else:
+            st.warning("Provide an answer by text or voice.")
+
+    feedback_job = jobs.get_job(session.feedback_job)
+    if feedback_job:
+        st.subheader("📋 Feedback:")
+        if not feedback_job.finished:
+            # Show feedback token by token instead of waiting for the whole answer
+            poll_job(feedback_job.id)
+        elif feedback_job.status == "error":
+            st.error(f"❌ Could not get feedback: {feedback_job.error}")
+        else:
+            st.write(feedback_job.result)
+
+# Batch mode: answer every question, then grade them all with concurrent LLM calls
+@st.fragment
+@metrics.timed("fragment.batch")
+def batch_panel(questions, llm):
+    session = get_session()
+    st.markdown("### 📝 OR Answer All Questions")
+    with st.form("batch_answers_form"):
+        batch_answers = [st.text_area(question, key=f"batch_answer_{i}") for i, question in enumerate(questions)]
+        grade_all = st.form_submit_button("🚀 Grade All Answers")
+
+    if grade_all:
+        pairs = [(q, a) for q, a in zip(questions, batch_answers) if a.strip()]
+        if pairs:
+            job = jobs.submit("batch_feedback", jobs.job_key("batch_feedback", model_name(llm), *sum(pairs, ())),
+                              grade_answers, llm, pairs)
+            session.batch_job = job.id
+        else:
+            st.warning("Answer at least one question to get feedback.")
+
+    batch_job = jobs.get_job(session.batch_job)
+    if batch_job and not batch_job.finished:
+        poll_job(batch_job.id, "⏳ Grading your answers...")
+    elif batch_job and batch_job.status == "error":
+        st.error(f"❌ Could not grade answers: {batch_job.error}")
+
+    for result in (batch_job.result if batch_job and batch_job.status == "done" else None) or []:
+        with st.expander(f"📋 {result['question']}"):
+            st.markdown(f"**Your answer:** {result['answer']}")
+            if result["error"]:
+                st.error(f"❌ Could not grade this answer: {result['error']}")
+            else:
+                st.write(result["feedback"])
+
+# Job match panel: ranks the job description library (plus any pasted descriptions)
+# against the resume in one vectorized batch; results are kept per file and pasted text
+@st.fragment
+@metrics.timed("fragment.job_match")
+def job_match_panel(file_id, resume_text):
+    session = get_session()
+    with st.expander("💼 Job Match"):
+        pasted = st.text_area("Paste job descriptions to compare (separate several with a line of ---)",
+                              key="job_match_pasted")
+        key = hashlib.sha256(f"{file_id}\n{pasted}".encode("utf-8")).hexdigest()
+        if session.job_match_key != key:
+            with metrics.span("job_match"):
+                jds, matrix = get_job_library().score([resume_text], extra=parse_job_descriptions(pasted, "pasted"))
+                session.job_match = [
+                    {"role": jds[j].title, "score": round(score), "matched skills": ", ".join(matched),
+                     "missing skills": ", ".join(missing)}
+                    for j, score, matched, missing in matrix.ranked(0)]
+            session.job_match_key = key
+        if session.job_match:
+            st.dataframe(session.job_match, hide_index=True)
+        else:
+            st.info("No job descriptions found. Paste one above or add files to the job description folder.")
+
 # Dashboard function: handles uploading resume, generating questions,
 # answering questions by text or voice, and getting AI feedback
+@metrics.timed("page.dashboard")
 def show_interview_dashboard():
+    session = get_session()
     st.title("🤖 ResumeBot - AI Interview Coach")
     st.write("Upload your resume and practice answering interview questions with text or voice!")
 
     # File uploader widget for PDF resumes
     uploaded_file = st.file_uploader("📄 Upload your resume (PDF)", type="pdf")
     if uploaded_file:
-        # Parse uploaded PDF and extract text from all pages
-        pdf_reader = PdfReader(uploaded_file)
-        resume_text = "".join([page.extract_text() for page in pdf_reader.pages if page.extract_text()])
-
-        # Append file metadata to upload history in session state
-        st.session_state.upload_history.append({
-            "filename": uploaded_file.name,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-
-        # Generate interview questions once per resume upload
-        if st.session_state.questions is None:
-            prompt = PromptTemplate(
-                input_variables=["resume_text"],
-                template="Based on the following resume, generate 10 relevant interview questions:\n{resume_text}"
-            )
-            chain = LLMChain(llm=llm, prompt=prompt)
-            st.session_state.questions = chain.run(resume_text=resume_text)
-
-        st.subheader("🎯 Interview Questions:")
-        # Split questions by newlines and filter out empty lines
-        questions = [q for q in st.session_state.questions.split("\n") if q.strip()]
-        st.write(questions)
-
-        # Allow user to select question and answer via text area
-        selected_question = st.selectbox("👉 Select a question to answer:", questions)
-        user_answer = st.text_area("✍️ Type your Answer:")
-
-        # Voice answer section: record and convert speech to text
-        st.markdown("### 🎙️ OR Record your Voice Answer")
-        col1, col2 = st.columns([1, 5])
-
-        with col1:
-            if st.button("🎤 Record"):
-                recognizer = sr.Recognizer()
-                with sr.Microphone() as source:
-                    st.info("Listening...")
-                    try:
-                        audio = recognizer.listen(source, timeout=5)
-                        text = recognizer.recognize_google(audio)
-                        st.success(f"You said: {text}")
-                        st.session_state.voice_answer = text
-                    except:
-                        st.error("Voice not recognized.")
-
-        with col2:
-            st.write(st.session_state.get("voice_answer", ""))
+        llm = get_llm()
 
-        # Use voice answer if provided, else fallback to typed answer
-        final_answer = st.session_state.get("voice_answer") or user_answer
-
-        # Button to generate AI feedback on user's answer
-        if st.button("🚀 Get Feedback"):
-            if final_answer:
-                feedback_prompt = PromptTemplate(
-                    input_variables=["question", "answer"],
-                    template="""
-                    Question: {question}
-                    Candidate's Answer: {answer}
-                    Please provide professional feedback on relevance, clarity, and improvement.
-                    """
-                )
-                feedback_chain = LLMChain(llm=llm, prompt=feedback_prompt)
-                feedback = feedback_chain.run(question=selected_question, answer=final_answer)
-                st.subheader("📋 Feedback:")
-                st.write(feedback)
-            else:
-                st.warning("Provide an answer by text or voice.")
+        # Extract text from all pages; reruns and re-uploads of the same file hit the cache
+        with metrics.span("pdf_extraction"):
+            resume_text, extraction = load_resume(uploaded_file)
+        if extraction is not None:
+            session.pdf_extraction = extraction.summary()
+            session.pdf_extraction_for = uploaded_file.file_id
+        elif session.pdf_extraction_for != uploaded_file.file_id:
+            # Text came from the cache: the timings held belong to another file
+            session.pdf_extraction = None
+            session.pdf_extraction_for = uploaded_file.file_id
+
+        # Tell the user when only part of a large PDF could be read
+        summary = session.pdf_extraction
+        if summary and summary["stopped_reason"]:
+            st.warning(f"⚠️ Read {summary['pages_read']} of {summary['total_pages']} pages "
+                       f"({summary['stopped_reason'].replace('_', ' ')} reached).")
+        if summary:
+            with st.expander("⏱️ PDF extraction timings"):
+                st.write(f"{summary['pages_read']} pages in {summary['elapsed']} s")
+                st.write({f"Page {i + 1}": f"{s} s" for i, s in enumerate(summary["page_seconds"])})
+
+        # Record the upload once per file (not on every rerun); the database ignores repeats
+        if session.recorded_upload != uploaded_file.file_id:
+            db.record_upload(session.email, file_digest(uploaded_file.getvalue()), uploaded_file.name)
+            session.recorded_upload = uploaded_file.file_id
+
+        job_match_panel(uploaded_file.file_id, resume_text)
+
+        # Generate interview questions once per resume, as a background job that survives reruns
+        if session.questions_for != uploaded_file.file_id:
+            session.questions_for = uploaded_file.file_id
+            session.questions = None
+            session.questions_job = None
+            session.reused_questions = None
+            session.prompt_report = None
+        # A near-duplicate of an earlier resume reuses its questions instead of calling the model
+        if (session.questions is None and session.questions_job is None
+                and session.fresh_questions_for != uploaded_file.file_id):
+            similar = get_resume_index().find(resume_text, model_name(llm))
+            if similar is not None:
+                session.questions = similar.questions
+                session.reused_questions = similar.similarity
+                session.prompt_report = None    # No prompt was sent for these questions
+                tts.render(split_questions(similar.questions))
+        if session.questions is None:
+            job = jobs.get_job(session.questions_job)
+            if job is None:
+                # Send only the normalized, most relevant sections that fit the prompt token budget
+                prepared = prepare_resume(resume_text)
+                session.prompt_report = prepared.report()
+                key_parts = ["questions", model_name(llm), prepared.text]
+                # "Generate Fresh Questions" must neither hit the response cache nor join another job
+                fresh = session.fresh_questions_for == uploaded_file.file_id
+                if fresh:
+                    key_parts += ["fresh", os.urandom(8).hex()]
+                job = jobs.submit("questions", jobs.job_key(*key_parts),
+                                  stream_questions, llm, prepared.text, bypass_cache=fresh)
+                session.questions_job = job.id
+
+            if job.status == "error":
+                st.error(f"❌ Could not generate questions: {job.error}")
+                if st.button("🔄 Try Again"):
+                    session.questions_job = None
+                    st.rerun()
+                return
+            if not job.finished:
+                # Stream the questions in as they arrive; the rest of the page waits for them
+                st.subheader("🎯 Interview Questions:")
+                poll_job(job.id)
+                return
+            session.questions = job.result
+            get_resume_index().add(resume_text, model_name(llm), job.result)
+            # Speak the questions ahead of time; clips shared with earlier users are not rendered again
+            tts.render(split_questions(job.result))
+
+        report = session.prompt_report
+        if report:
+            st.caption(f"🧮 Resume prompt: {report['prompt_tokens']} tokens "
+                       f"({report['tokens_saved']} saved, {report['saved_percent']}% smaller)")
+
+        # Each panel below is a fragment: interacting with it reruns only that panel
+        questions = split_questions(session.questions)
+        questions_panel(questions, uploaded_file.file_id)
+
+        # Voice answer section: record or upload audio, transcribed in the background
+        st.markdown("### 🎙️ Record your Voice Answer")
+        voice_panel()
+
+        answer_panel(llm)
+        batch_panel(questions, llm)
 
 # Route to selected page based on sidebar navigation
 if page == "🏠 Dashboard":
@@ -172,6 +395,8 @@ elif page == "📁 Recent Uploads":
     uploads()
 elif page == "⚙️ Settings":
     settings()
+elif page == "📈 Performance":
+    performance()
 
 # Sticky footer at the bottom of the app page
 st.markdown("""